@@ -0,0 +1,116 @@
+"""Benchmark the financial coordinator graph end to end on a replayed model.
+
+Every agent replays its responses from a replay file (default: the scripted
+AAPL session in tests/fixtures) after --latency seconds, so a session runs
+the real coordinator -> AgentTool -> sub-agent orchestration, callbacks
+and session service without Gemini. Reported per concurrency level:
+
+  sessions/s      completed sessions per wall second
+  overhead/sess   session wall time minus its model latency (our code + ADK)
+  overhead/event  the same per event yielded by the runner
+  KiB/session     memory retained by the session service per session, and
+                  peak memory per concurrent session (tracemalloc pass)
+
+    python -m benchmarks.bench_agent_graph --concurrency 1,10,100 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import tracemalloc
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), os.pardir, "tests", "fixtures", "advisor_session.jsonl"
+)
+
+
+async def run_sessions(runner, sessions, concurrency):
+    from google.genai import types
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(i):
+        async with semaphore:
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=f"user{i}"
+            )
+            events = 0
+            start = time.perf_counter()
+            async for _ in runner.run_async(
+                user_id=session.user_id,
+                session_id=session.id,
+                new_message=types.UserContent(parts=[types.Part(text="Analyze AAPL")]),
+            ):
+                events += 1
+            return time.perf_counter() - start, events
+
+    return await asyncio.gather(*(run_one(i) for i in range(sessions)))
+
+
+def model_calls(agent):
+    calls = agent.canonical_model.calls
+    for tool in agent.tools:
+        if hasattr(tool, "agent") and hasattr(tool.agent, "canonical_model"):
+            calls += tool.agent.canonical_model.calls
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", default="1,10,100")
+    parser.add_argument("--sessions", type=int, default=50,
+                        help="sessions per level (at least the concurrency)")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per model call")
+    parser.add_argument("--replay", default=FIXTURE)
+    parser.add_argument("--no-telemetry", action="store_true")
+    args = parser.parse_args()
+
+    # The agent modules pick their model at import time.
+    os.environ.update({
+        "ADVISOR_MODEL": "replay",
+        "ADVISOR_REPLAY_FILE": args.replay,
+        "ADVISOR_STUB_LATENCY": str(args.latency),
+        "AGENT_TELEMETRY": "0" if args.no_telemetry else os.environ.get("AGENT_TELEMETRY", "1"),
+    })
+    from google.adk.runners import InMemoryRunner
+
+    from financial_advisor.agent import root_agent
+    from financial_advisor.response_cache import MemoryBackend, ResponseCache
+    from financial_advisor.sub_agents.data_analyst import cache as data_analyst_cache
+
+    # Every session asks for the same ticker; keep the data analyst on the model.
+    data_analyst_cache.response_cache = ResponseCache(MemoryBackend(max_entries=0))
+
+    print(f"{args.latency * 1000:.0f} ms per model call, telemetry "
+          f"{'off' if args.no_telemetry else 'on'}")
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        sessions = max(args.sessions, concurrency)
+        runner = InMemoryRunner(agent=root_agent)
+        calls_before = model_calls(root_agent)
+        start = time.perf_counter()
+        results = asyncio.run(run_sessions(runner, sessions, concurrency))
+        seconds = time.perf_counter() - start
+        calls = (model_calls(root_agent) - calls_before) / sessions
+        overhead = [wall - calls * args.latency for wall, _ in results]
+        events = statistics.mean(n for _, n in results)
+
+        tracemalloc.start()
+        runner = InMemoryRunner(agent=root_agent)
+        before = tracemalloc.get_traced_memory()[0]
+        asyncio.run(run_sessions(runner, sessions, concurrency))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"concurrency={concurrency:<4} {sessions / seconds:8.1f} sessions/s "
+              f"{calls:4.1f} calls and {events:4.1f} events/session  "
+              f"overhead/sess p50 {statistics.median(overhead) * 1000:7.1f} ms "
+              f"max {max(overhead) * 1000:7.1f} ms  "
+              f"overhead/event {statistics.median(overhead) / events * 1000:6.2f} ms  "
+              f"retained {(current - before) / sessions / 1024:6.1f} KiB/session  "
+              f"peak {(peak - before) / concurrency / 1024:7.1f} KiB/concurrent session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark batch watchlist analysis against a stubbed model backend.
+
+Every model call is served by `StubLlm` after --latency seconds, so the
+numbers show how well the batch overlaps model latency (and what our own
+orchestration costs), not Gemini speed. Each ticker makes four model calls
+(data, trading, execution, risk).
+
+    python -m benchmarks.bench_batch_analysis --tickers 40 --latency 0.2 --concurrency 1,4,16
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from financial_advisor import batch
+from financial_advisor.response_cache import ResponseCache
+from financial_advisor.stub_model import StubLlm
+from financial_advisor.sub_agents.data_analyst import cache as data_analyst_cache
+
+
+async def run_batch(tickers, concurrency, latency, rpm):
+    # Start cold so every data analysis reaches the model.
+    data_analyst_cache.response_cache = ResponseCache()
+    model = StubLlm(latency=latency)
+    first_result = None
+    latencies = []
+    start = time.perf_counter()
+    async for result in batch.analyze_batch(
+        tickers, concurrency=concurrency, requests_per_minute=rpm, model=model
+    ):
+        if result.error:
+            raise result.error
+        first_result = first_result or time.perf_counter() - start
+        latencies.append(result.seconds)
+    return time.perf_counter() - start, first_result, latencies, model.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per model call")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--rpm", type=int, default=None, help="model requests per minute")
+    args = parser.parse_args()
+
+    tickers = [f"T{i:03d}" for i in range(args.tickers)]
+    print(f"{args.tickers} tickers, {args.latency * 1000:.0f} ms per model call"
+          + (f", {args.rpm} requests/min" if args.rpm else ""))
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        seconds, first, latencies, calls = asyncio.run(
+            run_batch(tickers, concurrency, args.latency, args.rpm)
+        )
+        print(f"concurrency={concurrency:<4} {seconds:7.2f}s "
+              f"{len(latencies) / seconds:7.2f} tickers/s {calls / seconds:7.1f} calls/s "
+              f"first result {first:5.2f}s  per-ticker p50 {statistics.median(latencies):5.2f}s "
+              f"max {max(latencies):5.2f}s")
+
+
+if __name__ == "__main__":
+    main()
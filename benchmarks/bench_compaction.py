@@ -0,0 +1,110 @@
+"""Benchmark coordinator prompt size with and without report compaction.
+
+One session analyses --tickers tickers in a row, one user turn each; per
+turn the coordinator calls the four sub-agents, each answering with a
+synthetic markdown report of --report-words words (StubLlm, no network).
+Prompt tokens are counted by StubLlm (whitespace words) and collected by
+the telemetry recorder, so the numbers compare prompt growth, not Gemini
+tokenization.
+
+    python -m benchmarks.bench_compaction --tickers 1,5,20 --report-words 1500
+"""
+
+import argparse
+import asyncio
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from financial_advisor import compaction, prompt, telemetry
+from financial_advisor.stub_model import StubLlm
+from financial_advisor.sub_agents.data_analyst import data_analyst_agent
+from financial_advisor.sub_agents.execution_analyst import execution_analyst_agent
+from financial_advisor.sub_agents.risk_analyst import risk_analyst_agent
+from financial_advisor.sub_agents.trading_analyst import trading_analyst_agent
+
+SUB_AGENTS = (data_analyst_agent, trading_analyst_agent, execution_analyst_agent, risk_analyst_agent)
+
+
+def synthetic_report(title, words):
+    sentences = [
+        "Support sits near $182.50 and resistance near $199.80 on the daily chart.",
+        "Strategy: accumulate on pullbacks toward the 200-day moving average with a 7% stop.",
+        "Concentration risk rises if the position exceeds 10% of the portfolio.",
+        "Revenue grew 6% year over year while services margins expanded again.",
+        "Analysts see limited downside volatility outside of earnings weeks.",
+        "Execution should favour limit orders in three tranches over two weeks.",
+    ]
+    lines, count, section = [f"# {title}"], 0, 0
+    while count < words:
+        if count % 120 == 0:
+            section += 1
+            lines.append(f"## {'Strategies' if section % 3 == 0 else 'Analysis'} {section}")
+        sentence = sentences[(count // 12) % len(sentences)]
+        lines.append(f"- {sentence}")
+        count += len(sentence.split())
+    return "\n".join(lines)
+
+
+def build_coordinator(tickers, report_words, compact):
+    tools = []
+    for agent in SUB_AGENTS:
+        stub = StubLlm(responses=[synthetic_report(agent.name, report_words)])
+        tools.append(AgentTool(agent=agent.clone(update={
+            "model": stub, "before_agent_callback": None, "after_agent_callback": None,
+        })))
+    script = []
+    for ticker in tickers:
+        script += [
+            types.Part(function_call=types.FunctionCall(
+                name=agent.name, args={"request": f"Analyze {ticker}"}
+            ))
+            for agent in SUB_AGENTS
+        ] + ["Here is the summary of all four steps."]
+    coordinator = LlmAgent(
+        name="financial_coordinator",
+        model=StubLlm(responses=script),
+        instruction=prompt.FINANCIAL_COORDINATOR_PROMPT,
+        tools=tools,
+    )
+    return compaction.compact_reports(coordinator) if compact else coordinator
+
+
+async def run_session(tickers, report_words, compact):
+    recorder = telemetry.Recorder()
+    names = [f"T{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(tickers)]
+    coordinator = telemetry.instrument(build_coordinator(names, report_words, compact), recorder)
+    runner = InMemoryRunner(agent=coordinator)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="u")
+    for ticker in names:
+        async for _ in runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=types.UserContent(parts=[types.Part(text=f"Analyze {ticker}")]),
+        ):
+            pass
+    prompts = [r.prompt_tokens for r in recorder.records
+               if r.kind == "model" and r.agent == coordinator.name]
+    return prompts[-1], max(prompts), sum(prompts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", default="1,5,20")
+    parser.add_argument("--report-words", type=int, default=1500)
+    args = parser.parse_args()
+
+    print(f"coordinator prompt tokens, {args.report_words}-word reports")
+    for tickers in (int(t) for t in args.tickers.split(",")):
+        full = asyncio.run(run_session(tickers, args.report_words, compact=False))
+        compact = asyncio.run(run_session(tickers, args.report_words, compact=True))
+        print(f"tickers={tickers:<3} last call {full[0]:>8,} -> {compact[0]:>7,}  "
+              f"max {full[1]:>8,} -> {compact[1]:>7,}  "
+              f"session total {full[2]:>10,} -> {compact[2]:>9,} "
+              f"({1 - compact[2] / full[2]:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
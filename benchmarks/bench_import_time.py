@@ -0,0 +1,65 @@
+"""Benchmark cold-start import time of every deployment/run_*.py entry point.
+
+Each entry point is executed (without starting uvicorn) in a fresh
+interpreter under `python -X importtime`. The report shows the summed
+import time, the process wall time and the slowest top-level imports.
+With --budget-ms the exit status is 1 if any entry point exceeds it.
+
+    python -m benchmarks.bench_import_time --top 5
+"""
+
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def import_profile(path):
+    """Returns (wall seconds, [(module, self us, cumulative us, depth)]) for one cold run."""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import runpy; runpy.run_path({os.path.abspath(path)!r})"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    wall = time.perf_counter() - start
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to list")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    over = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "deployment", "run_*.py"))):
+        wall, modules = import_profile(path)
+        total_ms = sum(m[1] for m in modules) / 1000
+        name = os.path.basename(path)
+        print(f"{name:<28} imports {total_ms:7.0f} ms  wall {wall * 1000:7.0f} ms  "
+              f"modules {len(modules):>5}")
+        top = sorted((m for m in modules if m[3] == 0), key=lambda m: -m[2])[: args.top]
+        for module, _, cumulative, _ in top:
+            print(f"    {cumulative / 1000:7.0f} ms  {module}")
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            over.append(name)
+    if over:
+        print(f"over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
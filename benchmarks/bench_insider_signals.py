@@ -0,0 +1,89 @@
+"""Benchmark insider signal scoring over a multi-year trade history.
+
+Synthetic buys are loaded into a ColumnarTradeStore (as the scanner would
+append them, then compacted) and read back as columns. Reported:
+
+  full rescore     rolling_signals over the whole history
+  point in time    score_tickers for one as-of date
+  loop baseline    a per-row Python window scan over --baseline-tickers tickers
+  incremental      InsiderSignalEngine.update per scanner-sized batch
+
+    python -m benchmarks.bench_insider_signals --rows 1000000 --years 5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.bench_trade_store import make_rows
+from financial_advisor import insider_signals
+from financial_advisor.connectors.trade_store import ColumnarTradeStore
+
+
+def loop_signals(rows, window_days):
+    """Trades and distinct insiders per (ticker, day) with plain Python."""
+    by_ticker = defaultdict(list)
+    for row in rows:
+        by_ticker[row["ticker"]].append(row)
+    signals = {}
+    for ticker, trades in by_ticker.items():
+        trades.sort(key=lambda r: r["transaction_date"])
+        for trade in trades:
+            day = trade["transaction_date"]
+            window = [t for t in trades if 0 <= (day - t["transaction_date"]).days < window_days]
+            signals[ticker, day] = (len(window), len({t["insider_name"] for t in window}))
+    return signals
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--window", type=int, default=insider_signals.DEFAULT_WINDOW_DAYS)
+    parser.add_argument("--baseline-tickers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=100, help="rows per incremental update")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, days=args.years * 365)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ColumnarTradeStore(os.path.join(tmp, "store"))
+        for offset in range(0, len(rows), 50_000):
+            store.append(rows[offset:offset + 50_000])
+        store.compact()
+
+        seconds, columns = timed(store.read)
+        print(f"store read       {seconds:8.2f} s  rows={len(columns['ticker'])}")
+        seconds, history = timed(lambda: insider_signals.rolling_signals(columns, args.window))
+        clusters = int(history["cluster"].sum())
+        print(f"full rescore     {seconds:8.2f} s  ticker-days={len(history['ticker'])} "
+              f"clusters={clusters}")
+        seconds, signals = timed(
+            lambda: insider_signals.score_tickers(columns, window_days=args.window)
+        )
+        print(f"point in time    {seconds:8.2f} s  tickers={len(signals)}")
+
+    sample = [row for row in rows if row["ticker"] < f"T{args.baseline_tickers:03d}"]
+    loop_seconds, _ = timed(lambda: loop_signals(sample, args.window))
+    numpy_seconds, _ = timed(lambda: insider_signals.rolling_signals(sample, args.window))
+    print(f"loop baseline    {loop_seconds:8.2f} s  vs {numpy_seconds:.2f} s vectorized "
+          f"on {len(sample)} rows")
+
+    ordered = sorted(rows[-50_000:], key=lambda r: r["transaction_date"])
+    engine = insider_signals.InsiderSignalEngine(window_days=args.window)
+    engine.update(ordered[: len(ordered) // 2])
+    batches = [ordered[i:i + args.batch] for i in range(len(ordered) // 2, len(ordered), args.batch)]
+    seconds, _ = timed(lambda: [engine.update(batch) for batch in batches])
+    print(f"incremental      {seconds / len(batches) * 1000:8.2f} ms per {args.batch}-row batch "
+          f"(window holds {len(engine)} buys)")
+
+
+if __name__ == "__main__":
+    main()
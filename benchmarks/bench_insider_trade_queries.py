@@ -0,0 +1,153 @@
+"""Benchmark the insider_trades read API over a large synthetic table.
+
+Loads --rows synthetic trades into insider_trades (a SQLite file by
+default, or any --url such as a local MySQL), first without the secondary
+indexes, and times each query of `insider_trade_queries` before and after
+the indexes are built. The deep-page rows compare fetching page --depth of
+a year of top buys with the keyset cursor against LIMIT/OFFSET.
+
+    python -m benchmarks.bench_insider_trade_queries --rows 10000000
+    python -m benchmarks.bench_insider_trade_queries --url mysql+mysqlconnector://root:pw@localhost/bench
+"""
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, select, text
+
+from financial_advisor.connectors import gcp_sql_connector, insider_trade_queries
+from financial_advisor.connectors.insider_trade_queries import (
+    insider_history,
+    latest_buys,
+    top_buys,
+)
+
+START = datetime.date(2016, 1, 1)
+DAYS = 10 * 365
+TICKERS = 5_000
+INSIDERS = 200_000
+PAGE = 50
+
+
+def load(engine, rows, chunk, seed=5):
+    rng = np.random.default_rng(seed)
+    table = gcp_sql_connector.insider_trades_table
+    start = np.datetime64(START)
+    with engine.begin() as connection:
+        for offset in range(0, rows, chunk):
+            n = min(chunk, rows - offset)
+            # Zipf-like tickers and insiders: a few names get most filings.
+            tickers = np.minimum(rng.zipf(1.3, n), TICKERS)
+            insiders = np.minimum(rng.zipf(1.2, n), INSIDERS)
+            days = (start + rng.integers(0, DAYS, n)).astype(object)
+            shares = np.arange(offset, offset + n) + 1  # keeps idx_unique_trade unique
+            prices = np.round(rng.uniform(1, 500, n), 2)
+            connection.execute(table.insert(), [
+                {
+                    "ticker": f"T{tickers[i]:04d}",
+                    "insider_name": f"Insider {insiders[i]}",
+                    "relationship": "Dir",
+                    "transaction_date": days[i],
+                    "transaction_type": "Buy",
+                    "transaction_value": int(shares[i] % 10_000 * prices[i]),
+                    "shares": int(shares[i]),
+                    "price_per_share": float(prices[i]),
+                }
+                for i in range(n)
+            ])
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def queries(rng):
+    ticker = f"T{rng.randrange(1, 50):04d}"
+    insider = f"Insider {rng.randrange(1, 500)}"
+    day = START + datetime.timedelta(days=rng.randrange(DAYS - 30))
+    return {
+        "latest buys": lambda engine: latest_buys(engine, ticker, limit=PAGE),
+        "top buys, 30 days": lambda engine: top_buys(
+            engine, day, day + datetime.timedelta(days=29), limit=PAGE
+        ),
+        "insider history": lambda engine: insider_history(engine, insider, limit=PAGE),
+    }
+
+
+def deep_page(engine, depth):
+    """(keyset seconds, offset seconds) for page `depth` of a year of top buys."""
+    start, end = START, START + datetime.timedelta(days=364)
+    cursor = None
+    for _ in range(depth - 1):
+        cursor = top_buys(engine, start, end, limit=PAGE, cursor=cursor).cursor
+    keyset = best_of(lambda: top_buys(engine, start, end, limit=PAGE, cursor=cursor))
+
+    c = gcp_sql_connector.insider_trades_table.c
+    query = (
+        select(*(c[name] for name in insider_trade_queries.TRADE_COLUMNS))
+        .where(c.transaction_type == "Buy", c.transaction_date.between(start, end))
+        .order_by(c.transaction_value.desc(), c.id.desc())
+        .offset((depth - 1) * PAGE)
+        .limit(PAGE)
+    )
+
+    def offset():
+        with engine.connect() as connection:
+            connection.execute(query).all()
+
+    return keyset, best_of(offset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--depth", type=int, default=200, help="page number for the deep-page test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.url or f"sqlite:///{os.path.join(tmp, 'trades.db')}")
+        table = gcp_sql_connector.insider_trades_table
+        table.drop(engine, checkfirst=True)
+        table.create(engine)
+        indexes = sorted(table.indexes, key=lambda index: index.name)
+        for index in indexes:
+            index.drop(engine)
+
+        seconds = best_of(lambda: load(engine, args.rows, args.chunk), repeat=1)
+        print(f"loaded {args.rows:,} rows in {seconds:.1f}s")
+
+        timings = {}
+        for label in ("no index", "indexed"):
+            if label == "indexed":
+                for index in indexes:
+                    seconds = best_of(lambda: index.create(engine), repeat=1)
+                    print(f"created {index.name} in {seconds:.1f}s")
+                with engine.begin() as connection:
+                    if engine.dialect.name == "sqlite":
+                        connection.execute(text("ANALYZE"))
+            for name, query in queries(random.Random(7)).items():
+                timings.setdefault(name, {})[label] = best_of(lambda: query(engine))
+            keyset, offset = deep_page(engine, args.depth)
+            timings.setdefault(f"page {args.depth}, keyset", {})[label] = keyset
+            timings.setdefault(f"page {args.depth}, offset", {})[label] = offset
+
+        for name, by_label in timings.items():
+            print(f"{name:<22} no index {by_label['no index'] * 1000:9.1f} ms   "
+                  f"indexed {by_label['indexed'] * 1000:9.1f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
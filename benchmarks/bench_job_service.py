@@ -0,0 +1,95 @@
+"""Load test the async job service against a blocking request handler.
+
+--requests clients POST at once to an in-process app (httpx ASGI transport,
+no sockets). Each job runs a stub-model agent whose single model call
+takes --latency seconds. The blocking baseline is the old runner shape: a
+sync `def` handler that holds its request (and one of Starlette's 40
+threadpool slots) until the agent is done. Reported per run:
+
+  accept p50/p99   time until POST / answered
+  done             wall time until every job finished
+  jobs/s           finished jobs per wall second
+
+    python -m benchmarks.bench_job_service --requests 100,500 --workers 8,32 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from google.adk.agents import LlmAgent
+
+from financial_advisor import service
+from financial_advisor.stub_model import StubLlm
+
+
+def stub_agent(latency):
+    return LlmAgent(
+        name="data_analyst_agent",
+        model=StubLlm(responses=["AAPL looks fine."], latency=latency),
+        instruction="Analyze.",
+        output_key="market_data_analysis_output",
+    )
+
+
+def blocking_app(latency):
+    run = service.agent_job(stub_agent(latency))
+    app = FastAPI()
+
+    @app.post("/")
+    def run_agent(prompt: str):
+        job = service.Job("blocking")
+        return {"result": asyncio.run(run(job, prompt))}
+
+    return app
+
+
+async def load(app, requests, poll):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def one(i):
+            start = time.perf_counter()
+            response = await client.post("/", params={"prompt": f"Analyze T{i}"})
+            accepted = time.perf_counter() - start
+            if poll:
+                job_id = response.json()["job_id"]
+                while (await client.get(f"/jobs/{job_id}", params={"wait": 30})).json()["status"] not in (
+                    service.SUCCEEDED, service.FAILED
+                ):
+                    pass
+            return accepted
+
+        start = time.perf_counter()
+        accepted = await asyncio.gather(*(one(i) for i in range(requests)))
+        return sorted(accepted), time.perf_counter() - start
+
+
+def report(label, requests, accepted, seconds):
+    print(f"{label:<22} requests={requests:<5} accept p50 {statistics.median(accepted) * 1000:8.1f} ms "
+          f"p99 {accepted[int(len(accepted) * 0.99) - 1] * 1000:8.1f} ms  "
+          f"done {seconds:6.2f} s  {requests / seconds:7.1f} jobs/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", default="100,500")
+    parser.add_argument("--workers", default="8,32")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per model call")
+    args = parser.parse_args()
+
+    for requests in (int(n) for n in args.requests.split(",")):
+        accepted, seconds = asyncio.run(load(blocking_app(args.latency), requests, poll=False))
+        report("blocking handler", requests, accepted, seconds)
+        for workers in (int(n) for n in args.workers.split(",")):
+            app = service.create_app("data_analyst", service.agent_job(stub_agent(args.latency)),
+                                     workers=workers)
+            accepted, seconds = asyncio.run(load(app, requests, poll=True))
+            report(f"job queue, {workers} workers", requests, accepted, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Benchmark portfolio snapshot writes, downsampling and P&L range queries.
+
+Seeds the steady state of one year of minute snapshots after downsampling:
+daily buckets older than 90 days, hourly buckets up to 7 days old and minute
+buckets after that (--minute-days of them, plus one expiring day that the
+timed `downsample` rolls up). Runs against a temporary SQLite file by
+default; pass --url to point at a local MySQL stand-in.
+
+    python -m benchmarks.bench_portfolio_snapshots --positions 500 --days 365
+"""
+
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+
+from financial_advisor.connectors import gcp_sql_connector, portfolio_snapshots
+from financial_advisor.connectors.ibkr_connector import PositionRow
+
+MINUTE, HOUR, DAY = portfolio_snapshots.MINUTE, portfolio_snapshots.HOUR, portfolio_snapshots.DAY
+
+
+def bucket_times(start, end, width):
+    return np.arange(start - start % width, end, width, dtype=np.int64)
+
+
+def seed(engine, account, positions, times, width, rng, chunk=50_000):
+    """Bulk-inserts `width` buckets at `times` for every position."""
+    con_ids = np.arange(1, positions + 1)
+    pnl = rng.normal(0, 50, size=(len(times), positions)).cumsum(axis=0)
+    rows = []
+    totals = []
+    for i, taken_at in enumerate(times.tolist()):
+        for j, con_id in enumerate(con_ids.tolist()):
+            rows.append({
+                "account_name": account, "bucket_seconds": width, "taken_at": taken_at,
+                "con_id": con_id, "symbol": f"S{con_id}", "quantity": 100.0,
+                "market_price": 100.0, "market_value": 10_000.0 + pnl[i, j],
+                "unrealized_pnl": pnl[i, j], "realized_pnl": 0.0,
+            })
+        totals.append({
+            "account_name": account, "bucket_seconds": width, "taken_at": taken_at,
+            "positions": positions, "market_value": 10_000.0 * positions + pnl[i].sum(),
+            "unrealized_pnl": pnl[i].sum(), "realized_pnl": 0.0,
+        })
+        if len(rows) >= chunk:
+            with engine.begin() as connection:
+                connection.execute(insert(gcp_sql_connector.portfolio_snapshots_table), rows)
+            rows = []
+    with engine.begin() as connection:
+        if rows:
+            connection.execute(insert(gcp_sql_connector.portfolio_snapshots_table), rows)
+        if totals:
+            connection.execute(insert(gcp_sql_connector.portfolio_pnl_snapshots_table), totals)
+    return len(times) * positions
+
+
+def timed(label, func, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+    print(f"{label:<34} {min(runs) * 1000:10.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="SQLAlchemy URL (default: temp SQLite file)")
+    parser.add_argument("--positions", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--minute-days", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="report best of N")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.url
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    engine = create_engine(url)
+    gcp_sql_connector.create_portfolio_snapshots_table(engine)
+
+    rng = np.random.default_rng(7)
+    account = "DU1"
+    now = portfolio_snapshots.to_epoch(datetime.datetime(2025, 6, 30))
+    hour_from = now - int(portfolio_snapshots.RETENTION[MINUTE].total_seconds())
+    day_from = now - int(portfolio_snapshots.RETENTION[HOUR].total_seconds())
+    year_ago = now - args.days * DAY
+
+    start = time.perf_counter()
+    stored = seed(engine, account, args.positions, bucket_times(year_ago, day_from, DAY), DAY, rng)
+    stored += seed(engine, account, args.positions,
+                   bucket_times(day_from, hour_from - DAY, HOUR), HOUR, rng)
+    # One day of minutes past the retention window, rolled up by `downsample` below.
+    expiring = seed(engine, account, args.positions,
+                    bucket_times(hour_from - DAY, hour_from, MINUTE), MINUTE, rng)
+    stored += seed(engine, account, args.positions,
+                   bucket_times(now - args.minute_days * DAY, now, MINUTE), MINUTE, rng)
+    raw = args.days * 24 * 60 * args.positions
+    print(f"seeded {stored + expiring:,} snapshot rows in {time.perf_counter() - start:.1f}s "
+          f"(raw minute history: {raw:,} rows)")
+
+    stats = timed("downsample 1 day of minutes",
+                  lambda: portfolio_snapshots.downsample(engine, now=now), 1)
+    print(f"  rolled {stats.rolled_up:,} rows into {stats.written:,} coarse rows")
+
+    book = [PositionRow(account, i, f"S{i}", 100.0, 100.0, 10_000.0, 95.0, 500.0, 0.0)
+            for i in range(1, args.positions + 1)]
+    minutes = iter(range(now, now + 10_000 * MINUTE, MINUTE))
+    timed(f"record_snapshot ({args.positions} positions)",
+          lambda: portfolio_snapshots.record_snapshot(engine, book, taken_at=next(minutes)),
+          args.repeat)
+
+    curve = timed("pnl_curve 1 year (mixed)",
+                  lambda: portfolio_snapshots.pnl_curve(engine, account, year_ago, now),
+                  args.repeat)
+    print(f"  {len(curve['taken_at']):,} points")
+    curve = timed("pnl_curve 1 year (daily)",
+                  lambda: portfolio_snapshots.pnl_curve(engine, account, year_ago, now, DAY),
+                  args.repeat)
+    print(f"  {len(curve['taken_at']):,} points")
+    timed("pnl_curve last 24h",
+          lambda: portfolio_snapshots.pnl_curve(engine, account, now - DAY, now), args.repeat)
+    timed("position_history 1 year",
+          lambda: portfolio_snapshots.position_history(engine, account, 1, year_ago, now),
+          args.repeat)
+
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
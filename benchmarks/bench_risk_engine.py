@@ -0,0 +1,98 @@
+"""Benchmark the portfolio risk engine on a synthetic factor-model portfolio.
+
+Daily returns for --positions positions over --years years are drawn from
+a one-factor model (market beta plus idiosyncratic noise). Reported per
+portfolio size:
+
+  analyze          risk_engine.analyze (VaR/CVaR, betas, covariance, ...)
+  summary          RiskMetrics.summary (rankings and correlated pairs)
+  loop baseline    covariance and betas with per-pair Python loops over
+                   --baseline-positions positions, scaled to the full size
+
+    python -m benchmarks.bench_risk_engine --positions 100,1000 --years 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from financial_advisor import risk_engine
+
+
+def make_returns(positions, days, seed=11):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.011, days)
+    betas = rng.uniform(0.3, 1.8, positions)
+    returns = np.outer(market, betas) + rng.normal(0, 0.015, (days, positions))
+    values = rng.lognormal(10, 1, positions) * np.where(rng.random(positions) < 0.1, -1, 1)
+    return values, returns, market
+
+
+def loop_baseline(returns, market):
+    """Pairwise covariance and betas with plain Python loops over columns."""
+    days, positions = returns.shape
+    columns = [returns[:, i].tolist() for i in range(positions)]
+    means = [sum(column) / days for column in columns]
+    market = market.tolist()
+    market_mean = sum(market) / days
+    market_variance = sum((m - market_mean) ** 2 for m in market)
+    covariance = [[0.0] * positions for _ in range(positions)]
+    for i in range(positions):
+        for j in range(i, positions):
+            value = sum(
+                (a - means[i]) * (b - means[j]) for a, b in zip(columns[i], columns[j])
+            ) / (days - 1)
+            covariance[i][j] = covariance[j][i] = value
+    betas = [
+        sum((a - means[i]) * (m - market_mean) for a, m in zip(columns[i], market))
+        / market_variance
+        for i in range(positions)
+    ]
+    return covariance, betas
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--positions", default="100,1000")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--confidence", type=float, default=0.99)
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument("--baseline-positions", type=int, default=50)
+    args = parser.parse_args()
+
+    days = args.years * risk_engine.TRADING_DAYS
+    for positions in (int(n) for n in args.positions.split(",")):
+        values, returns, market = make_returns(positions, days)
+        seconds, metrics = best_of(lambda: risk_engine.analyze(
+            values, returns, market_returns=market,
+            confidence=args.confidence, horizon_days=args.horizon,
+        ))
+        summary_seconds, summary = best_of(metrics.summary)
+
+        sample = min(args.baseline_positions, positions)
+        baseline, _ = best_of(lambda: loop_baseline(returns[:, :sample], market), repeat=1)
+        # The pairwise loop grows with the square of the position count.
+        baseline *= (positions / sample) ** 2
+
+        print(f"{positions:>6} positions x {days} days")
+        print(f"  analyze        {seconds * 1000:9.1f} ms")
+        print(f"  summary        {summary_seconds * 1000:9.1f} ms")
+        print(f"  loop baseline  {baseline * 1000:9.1f} ms (estimated from {sample} positions)")
+        print(f"  {args.confidence:.0%} {args.horizon}-day VaR {summary['historical_var_pct']}% "
+              f"(parametric {summary['parametric_var_pct']}%), "
+              f"beta {summary['portfolio_beta']}, "
+              f"effective positions {summary['effective_positions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark the fast tinytable tokenizer against BeautifulSoup.
+
+Pages are built from the saved fixture in tests/fixtures by repeating its
+rows, which mirrors OpenInsider screens with a large `cnt`.
+
+    python -m benchmarks.bench_scraper_parse --rows 100,1000 --pages 50
+"""
+
+import argparse
+import pathlib
+import re
+import time
+
+from financial_advisor.connectors import web_scraper_connector
+
+FIXTURES = pathlib.Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+
+def build_page(template, rows):
+    """Repeats the fixture's body rows until the page holds `rows` trades."""
+    body = re.search(r"<tbody>(.*)</tbody>", template, re.DOTALL).group(1)
+    row_html = re.findall(r"<tr\b.*?</tr>", body, re.DOTALL)
+    repeated = "\n".join(row_html[i % len(row_html)] for i in range(rows))
+    return template.replace(body, repeated).encode("UTF-8")
+
+
+def timed(parse, pages):
+    start = time.perf_counter()
+    for page in pages:
+        result = parse(page)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="100,1000", help="rows per page")
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    for fixture in sorted(FIXTURES.glob("openinsider_*.html")):
+        template = fixture.read_text(encoding="UTF-8")
+        for rows in (int(r) for r in args.rows.split(",")):
+            pages = [build_page(template, rows)] * args.pages
+            bs4_seconds, bs4_trades = timed(
+                web_scraper_connector.parse_insider_trades_bs4, pages
+            )
+            fast_seconds, fast_trades = timed(
+                web_scraper_connector.parse_insider_trades_fast, pages
+            )
+            assert fast_trades == bs4_trades, "parsers disagree"
+            print(
+                f"{fixture.name} rows={rows:<5} pages={args.pages} "
+                f"bs4={bs4_seconds / args.pages * 1000:8.2f} ms/page "
+                f"fast={fast_seconds / args.pages * 1000:8.2f} ms/page "
+                f"speedup={bs4_seconds / fast_seconds:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark the semantic result cache on a synthetic stream of advisor requests.
+
+Requests draw a ticker from --tickers symbols, a risk attitude, a period and
+one of several paraphrased execution preferences, so repeated questions
+rarely match word for word. Reported per cache size: hit rate, evictions,
+and lookup/store latency of the NumPy index.
+
+    python -m benchmarks.bench_semantic_cache --requests 20000 --max-entries 256,4096
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from financial_advisor.semantic_cache import SemanticCache, normalize_request
+
+PREFERENCES = (
+    ("limit orders, low cost", "Limit orders and low costs", "prefer limit orders; keep costs low"),
+    ("", "none", "no preference"),
+    ("execute quickly with market orders", "market orders, fast execution"),
+)
+PERIODS = ("long term", "long-term", "short term", "5 years")
+
+
+def requests(count, tickers, seed=7):
+    rng = random.Random(seed)
+    symbols = [f"T{i:04d}" for i in range(tickers)]
+    for _ in range(count):
+        # Popular tickers are asked about far more often (Zipf-like).
+        ticker = symbols[min(int(rng.paretovariate(1.2)) - 1, tickers - 1)]
+        group = rng.choice(PREFERENCES)
+        yield normalize_request(
+            ticker,
+            rng.choice(("conservative", "moderate", "aggressive")),
+            rng.choice(PERIODS),
+            rng.choice(group),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--max-entries", default="256,4096")
+    args = parser.parse_args()
+
+    for max_entries in (int(n) for n in args.max_entries.split(",")):
+        cache = SemanticCache(max_entries=max_entries)
+        lookups, stores = [], []
+        for request in requests(args.requests, args.tickers):
+            start = time.perf_counter()
+            hit = cache.lookup(request)
+            lookups.append(time.perf_counter() - start)
+            if hit is None:
+                start = time.perf_counter()
+                cache.store(request, {"ticker": request.ticker})
+                stores.append(time.perf_counter() - start)
+        print(f"max_entries={max_entries:<6} hit rate {cache.hit_rate():6.1%}  "
+              f"entries {len(cache):>5}  evictions {cache.metrics['evictions']:>6}  "
+              f"lookup p50 {statistics.median(lookups) * 1e6:6.1f} us "
+              f"p99 {sorted(lookups)[int(len(lookups) * 0.99)] * 1e6:6.1f} us  "
+              f"store p50 {statistics.median(stores) * 1e6:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark per-row vs. batched insider-trade upserts.
+
+Runs against a local SQLite file by default; pass --url to point at a local
+MySQL stand-in (e.g. mysql+mysqlconnector://root:pw@127.0.0.1/bench).
+--latency-ms adds an artificial delay per round-trip to mimic the Cloud SQL
+link, which is where batching pays off.
+
+    python -m benchmarks.bench_sql_upserts --rows 2000 --latency-ms 2
+"""
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, text
+
+from financial_advisor.connectors import gcp_sql_connector
+
+
+def make_trades(count, seed=7):
+    rng = random.Random(seed)
+    start = datetime.date(2024, 1, 1)
+    trades = []
+    for i in range(count):
+        shares = rng.randint(100, 500_000)
+        price = round(rng.uniform(1, 900), 2)
+        trades.append({
+            "ticker": f"T{i % 400:03d}",
+            "insider_name": f"Insider {i}",
+            "relationship": rng.choice(["CEO", "CFO", "Dir", "10%"]),
+            "transaction_date": start + datetime.timedelta(days=i % 365),
+            "transaction_type": "Buy",
+            "transaction_value": int(shares * price),
+            "shares": shares,
+            "price_per_share": price,
+        })
+    return trades
+
+
+def per_row_upsert(engine, trades):
+    """The pre-batching behaviour: one statement and round-trip per row."""
+    stmt = gcp_sql_connector._upsert_statement(
+        engine.dialect.name,
+        "insider_trades",
+        gcp_sql_connector.INSIDER_TRADE_COLUMNS,
+        gcp_sql_connector.INSIDER_TRADE_KEY,
+        1,
+    )
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for trade in trades:
+            connection.execute(stmt, {f"{k}_0": v for k, v in trade.items()})
+    return time.perf_counter() - start
+
+
+def add_latency(engine, latency_ms):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _sleep(*_):
+        time.sleep(latency_ms / 1000)
+
+
+def reset(engine):
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM insider_trades"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="SQLAlchemy URL (default: temp SQLite file)")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--batch-sizes", default="50,200,500,1000")
+    parser.add_argument("--repeat", type=int, default=3, help="report best of N")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.url
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    engine = create_engine(url)
+    if args.latency_ms:
+        add_latency(engine, args.latency_ms)
+    gcp_sql_connector.create_insider_trades_table(engine)
+    trades = make_trades(args.rows)
+
+    runs = []
+    for _ in range(args.repeat):
+        reset(engine)
+        runs.append(per_row_upsert(engine, trades))
+    seconds = min(runs)
+    print(f"per-row        {len(trades):>7} rows {seconds:8.3f}s "
+          f"{len(trades) / seconds:>10,.0f} rows/sec")
+
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        runs = []
+        for _ in range(args.repeat):
+            reset(engine)
+            runs.append(
+                gcp_sql_connector.upsert_insider_trades(engine, trades, batch_size)
+            )
+        stats = min(runs, key=lambda s: s.seconds)
+        print(f"batch={batch_size:<7} {stats.rows:>7} rows {stats.seconds:8.3f}s "
+              f"{stats.rows_per_second:>10,.0f} rows/sec ({stats.batches} round-trips)")
+
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
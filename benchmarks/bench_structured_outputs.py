@@ -0,0 +1,114 @@
+"""Benchmark parsing structured outputs against extracting from markdown.
+
+Per document, times what a consumer pays to turn a trading or risk answer
+into usable data:
+
+  validate   TradingStrategies / RiskAssessment.model_validate_json on the
+             JSON the model returns in structured-output mode
+  rows       .rows() on the validated model (what the DB writer stores)
+  markdown   compaction.summarize_report on an equivalent markdown report,
+             which only yields unstructured sentences
+
+    python -m benchmarks.bench_structured_outputs --strategies 1,4,16 --repeat 2000
+"""
+
+import argparse
+import json
+import time
+
+from financial_advisor import compaction, schemas
+
+
+def strategies_doc(count):
+    return {
+        "ticker": "AAPL",
+        "risk_attitude": "moderate",
+        "investment_period": "long-term",
+        "strategies": [
+            {
+                "name": f"Pullback buy {i}",
+                "direction": "long",
+                "entry_price": 185.0 + i,
+                "entry_condition": "Daily close above the 50-day moving average after a pullback.",
+                "stop_loss": 172.0 + i,
+                "take_profit": 211.0 + i,
+                "position_size_pct": 5,
+                "time_horizon": "2-6 months",
+                "rationale": "Trend intact and earnings momentum positive; buy weakness.",
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def assessment_doc(count):
+    return {
+        "ticker": "AAPL",
+        "risk_attitude": "moderate",
+        "overall_score": 4,
+        "aligned_with_risk_attitude": True,
+        "scores": [
+            {
+                "category": f"category {i}",
+                "score": 1 + i % 10,
+                "rationale": "Beta near 1.2 and earnings in three weeks.",
+                "mitigation": "Hard stops and reduced size into the event.",
+            }
+            for i in range(count)
+        ],
+        "summary": "Moderate risk, in line with the stated profile.",
+    }
+
+
+def strategies_markdown(doc):
+    lines = [f"# {doc['ticker']} strategies ({doc['risk_attitude']})", "## Proposed Strategies"]
+    for s in doc["strategies"]:
+        lines += [
+            f"### {s['name']}",
+            f"- Entry at ${s['entry_price']:.2f}: {s['entry_condition']}",
+            f"- Stop loss at ${s['stop_loss']:.2f}, target ${s['take_profit']:.2f}.",
+            f"- Size {s['position_size_pct']}% of the portfolio over {s['time_horizon']}.",
+            f"- {s['rationale']}",
+        ]
+    return "\n".join(lines)
+
+
+def assessment_markdown(doc):
+    lines = [f"# {doc['ticker']} risk assessment", doc["summary"], "## Risks"]
+    for s in doc["scores"]:
+        lines.append(f"- {s['category']} risk {s['score']}/10: {s['rationale']} {s['mitigation']}")
+    return "\n".join(lines)
+
+
+def per_doc_us(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strategies", default="1,4,16", help="strategies / risk scores per document")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("µs per document")
+    for count in (int(c) for c in args.strategies.split(",")):
+        for label, model, doc, markdown in (
+            ("trading", schemas.TradingStrategies, strategies_doc(count), strategies_markdown),
+            ("risk", schemas.RiskAssessment, assessment_doc(count), assessment_markdown),
+        ):
+            payload = json.dumps(doc)
+            report = markdown(doc)
+            parsed = model.model_validate_json(payload)
+            validate = per_doc_us(lambda: model.model_validate_json(payload), args.repeat)
+            rows = per_doc_us(parsed.rows, args.repeat)
+            extract = per_doc_us(lambda: compaction.summarize_report(report), args.repeat)
+            print(f"{label:<8} items={count:<3} json {len(payload):>6,} B  "
+                  f"validate {validate:8.1f}  rows {rows:6.1f}  "
+                  f"markdown {len(report):>6,} B  summarize_report {extract:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
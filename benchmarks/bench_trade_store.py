@@ -0,0 +1,105 @@
+"""Compare ticker / date-range reads from the columnar store and SQL.
+
+Loads the same synthetic trades into a SQLite insider_trades table and a
+ColumnarTradeStore (appended in scanner-sized chunks, then compacted), and
+times the same filters against both.
+
+    python -m benchmarks.bench_trade_store --rows 200000
+"""
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+from financial_advisor.connectors import gcp_sql_connector
+from financial_advisor.connectors.trade_store import ColumnarTradeStore
+
+
+def make_rows(count, tickers=400, days=3 * 365, seed=11):
+    rng = random.Random(seed)
+    start = datetime.date(2022, 1, 1)
+    rows = []
+    for i in range(count):
+        shares = rng.randint(100, 200_000)
+        price = round(rng.uniform(1, 500), 2)
+        rows.append({
+            "ticker": f"T{rng.randrange(tickers):03d}",
+            "insider_name": f"Insider {i % 5000}",
+            "relationship": rng.choice(["CEO", "CFO", "Dir", "10%"]),
+            "transaction_date": start + datetime.timedelta(days=rng.randrange(days)),
+            "transaction_type": "Buy",
+            "transaction_value": int(shares * price),
+            "shares": shares,
+            "price_per_share": price,
+            "ownership_change": rng.uniform(0, 50),
+        })
+    return rows
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk", type=int, default=2_000, help="rows per append")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = make_rows(args.rows)
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'trades.db')}")
+        gcp_sql_connector.create_insider_trades_table(engine)
+        gcp_sql_connector.upsert_insider_trades(engine, rows)
+
+        store = ColumnarTradeStore(os.path.join(tmp, "store"))
+        for offset in range(0, len(rows), args.chunk):
+            store.append(rows[offset:offset + args.chunk])
+        seconds, removed = best_of(store.compact, repeat=1)
+        print(f"compaction {seconds:.2f}s ({removed} duplicates removed)")
+
+        start, end = datetime.date(2023, 3, 1), datetime.date(2023, 5, 31)
+        queries = {
+            "ticker": (
+                lambda: store.read(ticker="T042"),
+                ("SELECT * FROM insider_trades WHERE ticker = :ticker", {"ticker": "T042"}),
+            ),
+            "date range": (
+                lambda: store.read(start=start, end=end),
+                ("SELECT * FROM insider_trades WHERE transaction_date "
+                 "BETWEEN :start AND :end", {"start": start, "end": end}),
+            ),
+            "ticker + range": (
+                lambda: store.read(ticker="T042", start=start, end=end),
+                ("SELECT * FROM insider_trades WHERE ticker = :ticker AND "
+                 "transaction_date BETWEEN :start AND :end",
+                 {"ticker": "T042", "start": start, "end": end}),
+            ),
+        }
+        for name, (store_query, (sql, params)) in queries.items():
+            store_seconds, columns = best_of(store_query)
+
+            def sql_query():
+                with engine.connect() as connection:
+                    return connection.execute(text(sql), params).all()
+
+            sql_seconds, result = best_of(sql_query)
+            print(
+                f"{name:<15} rows={len(columns['ticker']):>6} "
+                f"store={store_seconds * 1000:8.2f} ms  sqlite={sql_seconds * 1000:8.2f} ms"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
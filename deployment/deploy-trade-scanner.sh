@@ -0,0 +1,27 @@
+#!/bin/bash
+set -e
+
+# Deploys the trade scanner image (see build-images.sh) to Cloud Run in
+# daemon mode. Its scheduler runs in-process between requests, so the CPU
+# stays allocated (--no-cpu-throttling) and exactly one instance is kept
+# running: more would scan the same screens in parallel.
+
+PROJECT_ID="$1"
+REGION="${2:-us-central1}"
+
+if [ -z "$PROJECT_ID" ]; then
+    echo "Error: PROJECT_ID is not set."
+    exit 1
+fi
+
+gcloud run deploy trade-scanner-agent \
+    --project "${PROJECT_ID}" \
+    --region "${REGION}" \
+    --image "gcr.io/${PROJECT_ID}/trade-scanner-agent" \
+    --no-cpu-throttling \
+    --min-instances 1 \
+    --max-instances 1 \
+    --set-env-vars SCANNER_DAEMON=1 \
+    --no-allow-unauthenticated
+
+echo "trade-scanner-agent deployed."
@@ -1,17 +1,14 @@
 import uvicorn
-from fastapi import FastAPI
+from financial_advisor.service import create_app
 from financial_advisor.sub_agents.portfolio_manager.agent import PortfolioManagerAgent
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI()
+agent = PortfolioManagerAgent()
 
-@app.post("/")
-def run_agent():
-    agent = PortfolioManagerAgent()
-    result = agent.update_portfolio()
-    return {"result": result}
+# One IBKR sync at a time; triggers arriving while one waits join it.
+app = create_app(agent.name, agent.update_portfolio, takes_prompt=False, workers=1, coalesce=True)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
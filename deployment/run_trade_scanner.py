@@ -1,17 +1,24 @@
+import os
+import sys
+
 import uvicorn
-from fastapi import FastAPI
+from financial_advisor import scanner_daemon
+from financial_advisor.service import create_app
 from financial_advisor.sub_agents.trade_scanner_agent import TradeScannerAgent
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI()
+# Shared across jobs so the ingestion watermark is loaded once.
+agent = TradeScannerAgent()
 
-@app.post("/")
-def run_agent():
-    agent = TradeScannerAgent()
-    result = agent.scan_and_store_trades()
-    return {"result": result}
+if "--daemon" in sys.argv or os.environ.get("SCANNER_DAEMON") == "1":
+    # Long-running mode: scans on an adaptive schedule; POST / scans now.
+    daemon = scanner_daemon.ScannerDaemon(scan=scanner_daemon.agent_scan(agent))
+    app = scanner_daemon.create_app(daemon)
+else:
+    # One scan at a time; triggers arriving while one waits join it.
+    app = create_app(agent.name, agent.scan_and_store_trades, takes_prompt=False, workers=1, coalesce=True)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -1,16 +1,11 @@
 import uvicorn
-from fastapi import FastAPI
+from financial_advisor.service import agent_job, create_app
 from financial_advisor.sub_agents.trading_analyst.agent import trading_analyst_agent
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI()
-
-@app.post("/")
-def run_agent(prompt: str):
-    result = trading_analyst_agent.run(prompt=prompt)
-    return {"result": result}
+app = create_app("trading_analyst", agent_job(trading_analyst_agent))
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -14,4 +14,12 @@
 
 """Financial coordinator: provide reasonable investment strategies"""
 
-from . import agent
+import importlib
+
+
+def __getattr__(name):
+    # `agent` builds every LlmAgent and pulls in ADK and genai; import it on
+    # first use so services that only need the connectors start fast.
+    if name == "agent":
+        return importlib.import_module(f"{__name__}.agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
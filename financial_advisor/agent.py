@@ -14,17 +14,23 @@
 
 """Financial coordinator: provide reasonable investment strategies"""
 
+import os
+
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool
 
-from . import prompt
+from . import compaction, prompt, prompt_cache, schemas, semantic_cache, stub_model, telemetry
 from .sub_agents.data_analyst import data_analyst_agent
 from .sub_agents.execution_analyst import execution_analyst_agent
-from .sub_agents.risk_analyst import risk_analyst_agent
-from .sub_agents.trading_analyst import trading_analyst_agent
+from .sub_agents.risk_analyst import risk_analyst_agent, structured_risk_analyst_agent
+from .sub_agents.trading_analyst import (
+    structured_trading_analyst_agent,
+    trading_analyst_agent,
+)
 from .sub_agents.portfolio_manager.agent import PortfolioManagerAgent
 
-MODEL = "gemini-2.5-pro"
+MODEL = stub_model.model_for("financial_coordinator", "gemini-2.5-pro")
+STRUCTURED = schemas.enabled()
 
 
 financial_coordinator = LlmAgent(
@@ -40,11 +46,31 @@ financial_coordinator = LlmAgent(
     output_key="financial_coordinator_output",
     tools=[
         AgentTool(agent=data_analyst_agent),
-        AgentTool(agent=trading_analyst_agent),
+        AgentTool(agent=structured_trading_analyst_agent if STRUCTURED else trading_analyst_agent),
         AgentTool(agent=execution_analyst_agent),
-        AgentTool(agent=risk_analyst_agent),
+        AgentTool(agent=structured_risk_analyst_agent if STRUCTURED else risk_analyst_agent),
         AgentTool(agent=PortfolioManagerAgent()),
     ],
 )
 
+if compaction.enabled():
+    compaction.compact_reports(financial_coordinator)
+
+if semantic_cache.enabled():
+    serve_cached_result, store_result = semantic_cache.agent_callbacks(
+        semantic_cache.default_cache, financial_coordinator.output_key
+    )
+    telemetry.add_callback(financial_coordinator, "before_agent_callback", serve_cached_result)
+    telemetry.add_callback(financial_coordinator, "after_agent_callback", store_result)
+
+if telemetry.enabled():
+    telemetry.instrument(financial_coordinator)
+    telemetry.configure_tracing()
+
+if os.environ.get(stub_model.RECORD_FILE_ENV):
+    stub_model.record_responses(financial_coordinator, os.environ[stub_model.RECORD_FILE_ENV])
+
+if prompt_cache.enabled():
+    prompt_cache.default_cache.setup(financial_coordinator)
+
 root_agent = financial_coordinator
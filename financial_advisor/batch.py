@@ -0,0 +1,189 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batch analysis of a watchlist with bounded concurrency and model quotas"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import deque, namedtuple
+
+from google.adk.agents import LlmAgent
+
+from . import pipeline, semantic_cache, telemetry
+from .sub_agents.data_analyst.cache import normalize_ticker
+
+DEFAULT_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", 4))
+# Model requests allowed per minute across a batch; unset means no limit.
+MODEL_REQUESTS_PER_MINUTE = int(os.environ.get("MODEL_REQUESTS_PER_MINUTE", 0)) or None
+
+TickerResult = namedtuple(
+    "TickerResult", ["ticker", "outputs", "seconds", "error", "cached"], defaults=(False,)
+)
+
+
+class RateLimiter:
+    """Allows at most `per_minute` acquisitions in any sliding 60s window.
+
+    Waiters are served in arrival order. `clock` and `sleep` can be replaced
+    for tests.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic, sleep=asyncio.sleep):
+        if per_minute < 1:
+            raise ValueError("per_minute must be at least 1")
+        self.per_minute = per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self.waited = 0.0
+        self._calls = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self.clock()
+                while self._calls and self._calls[0] <= now - 60:
+                    self._calls.popleft()
+                if len(self._calls) < self.per_minute:
+                    self._calls.append(now)
+                    return
+                delay = self._calls[0] + 60 - now
+                self.waited += delay
+                await self.sleep(delay)
+
+    async def before_model_callback(self, callback_context, llm_request):
+        await self.acquire()
+        return None
+
+
+def limit_model_calls(agent, limiter):
+    """Makes every LlmAgent in `agent`'s tree wait for `limiter` before calling the model."""
+    if isinstance(agent, LlmAgent):
+        telemetry.add_callback(
+            agent, "before_model_callback", limiter.before_model_callback, first=True
+        )
+    for sub_agent in agent.sub_agents:
+        limit_model_calls(sub_agent, limiter)
+    return agent
+
+
+def _reports(outputs, risk_attitude):
+    """One plan of `pipeline.collect_outputs(...)[ticker]` as {sub-agent
+    output_key: report}, the value semantic_cache stores for the coordinator."""
+    data_key = pipeline.data_analyst_agent.output_key
+    return {data_key: outputs[data_key], **outputs["plans"][risk_attitude]}
+
+
+def _outputs(reports, risk_attitude):
+    """Inverse of `_reports`."""
+    data_key = pipeline.data_analyst_agent.output_key
+    plan = {key: report for key, report in reports.items() if key != data_key}
+    return {data_key: reports[data_key], "plans": {risk_attitude: plan}}
+
+
+async def analyze_batch(
+    tickers,
+    risk_attitude="moderate",
+    concurrency=DEFAULT_CONCURRENCY,
+    requests_per_minute=MODEL_REQUESTS_PER_MINUTE,
+    cache=None,
+    **pipeline_kwargs,
+):
+    """Runs the pipeline for every ticker; yields a TickerResult as each finishes.
+
+    At most `concurrency` tickers are in flight, and all of their model calls
+    share one `requests_per_minute` quota. A failing ticker yields a result
+    with `error` set instead of aborting the batch. Extra keyword arguments
+    go to `pipeline.build_pipeline` (e.g. `investment_period`, `model`).
+
+    With a `cache` (default: semantic_cache.default_cache when
+    SEMANTIC_CACHE=1; pass False to bypass it), tickers whose request
+    matches a fresh earlier one are answered from it (`cached` is set on
+    the result) and new outputs are stored. The cache holds each plan's
+    reports in the shape the coordinator's cache callbacks use, so either
+    caller can answer from the other's entries.
+    """
+    if cache is None:
+        cache = semantic_cache.default_cache if semantic_cache.enabled() else False
+    limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze(ticker):
+        request = semantic_cache.normalize_request(
+            ticker,
+            risk_attitude,
+            pipeline_kwargs.get("investment_period", pipeline.DEFAULT_INVESTMENT_PERIOD),
+            pipeline_kwargs.get("execution_preferences", pipeline.DEFAULT_EXECUTION_PREFERENCES),
+        )
+        hit = cache.lookup(request) if cache is not False else None
+        if hit is not None and semantic_cache.is_report_set(hit.value):
+            return TickerResult(ticker, _outputs(hit.value, risk_attitude), 0.0, None, True)
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                graph = pipeline.build_pipeline([ticker], [risk_attitude], **pipeline_kwargs)
+                if limiter:
+                    limit_model_calls(graph, limiter)
+                state = await pipeline.run_agent(graph, f"Analyze {ticker}", user_id="batch")
+                outputs = pipeline.collect_outputs(state, [ticker], [risk_attitude])[ticker]
+                reports = _reports(outputs, risk_attitude)
+                if cache is not False and semantic_cache.is_report_set(reports):
+                    cache.store(request, reports)
+                return TickerResult(ticker, outputs, time.perf_counter() - start, None)
+            except Exception as e:
+                return TickerResult(ticker, None, time.perf_counter() - start, e)
+
+    tasks = [
+        asyncio.create_task(analyze(ticker))
+        for ticker in dict.fromkeys(normalize_ticker(t) for t in tickers)
+    ]
+    try:
+        for done in asyncio.as_completed(tasks):
+            yield await done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _main(args):
+    async for result in analyze_batch(
+        args.tickers,
+        args.risk,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        investment_period=args.period,
+    ):
+        if result.error:
+            print(f"# {result.ticker}: failed after {result.seconds:.1f}s: {result.error}\n")
+            continue
+        plan = result.outputs["plans"][args.risk]
+        print(f"# {result.ticker} ({result.seconds:.1f}s)\n")
+        print(plan[pipeline.risk_analyst_agent.output_key] or "(no risk assessment)")
+        print()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Analyse a watchlist in one batch.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--risk", default="moderate", choices=pipeline.RISK_ATTITUDES)
+    parser.add_argument("--period", default=pipeline.DEFAULT_INVESTMENT_PERIOD)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=MODEL_REQUESTS_PER_MINUTE,
+                        help="model requests per minute for the whole batch")
+    asyncio.run(_main(parser.parse_args()))
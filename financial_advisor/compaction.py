@@ -0,0 +1,323 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compaction of sub-agent reports into bounded summaries for downstream prompts
+
+Full reports stay in session state and are saved to the artifact store;
+prompts only carry a structured summary (overview, key levels, strategies,
+risks) of each one. In the coordinator, each report is kept per ticker, so
+the reports of earlier tickers in a session stay loadable.
+"""
+
+import json
+import os
+import re
+from collections import namedtuple
+
+from google.adk.agents import LlmAgent
+from google.adk.tools import FunctionTool
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from . import prompt, telemetry
+from .sub_agents.data_analyst.cache import extract_ticker
+
+# output_key of each sub-agent whose report is compacted.
+REPORT_KEYS = (
+    "market_data_analysis_output",
+    "proposed_trading_strategies_output",
+    "execution_plan_output",
+    "final_risk_assessment_output",
+)
+MAX_ITEMS = 5
+MAX_ITEM_CHARS = 240
+
+Summary = namedtuple("Summary", ["overview", "key_levels", "strategies", "risks", "artifact"])
+
+_PRICE_OR_PERCENT = re.compile(r"\$\s?\d[\d,]*(?:\.\d+)?|\b\d+(?:\.\d+)?\s?%")
+_LEVEL_WORDS = re.compile(
+    r"support|resistance|target|stop|entry|exit|price|moving average|level|range|P/E|multiple",
+    re.IGNORECASE,
+)
+_STRATEGY_WORDS = re.compile(r"strateg|approach|setup|plan\b", re.IGNORECASE)
+_RISK_WORDS = re.compile(
+    r"\brisks?\b|drawdown|volatil|downside|exposure|concentrat|liquidity", re.IGNORECASE
+)
+_MARKUP = re.compile(r"^\s*(?:#+|[-*+]|\d+[.)])\s*|\*\*|__|`")
+_NON_WORD = re.compile(r"\W")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z$])")
+
+
+def summary_key(output_key):
+    return f"{output_key}_summary"
+
+
+def report_key(output_key, scope):
+    """State key of one coordinator report, e.g. ("execution_plan_output",
+    "BRK.B") -> "execution_plan_output_BRK_B"."""
+    return f"{output_key}_{_NON_WORD.sub('_', scope)}"
+
+
+def artifact_name(output_key):
+    return f"{output_key}.md"
+
+
+def _items(report):
+    """(is_heading, text) for every heading, bullet and sentence of a markdown report."""
+    for line in report.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        heading = stripped.startswith("#") or (stripped.startswith("**") and stripped.endswith("**"))
+        text = _MARKUP.sub("", stripped).strip(" :")
+        if not text:
+            continue
+        if heading:
+            yield True, text
+        else:
+            for sentence in _SENTENCE_END.split(text):
+                yield False, sentence
+
+
+def _clip(text):
+    return text if len(text) <= MAX_ITEM_CHARS else text[: MAX_ITEM_CHARS - 1].rstrip() + "…"
+
+
+def summarize_report(report, artifact=None):
+    """Extracts a bounded Summary from a markdown report; no model call.
+
+    Strategies are items under a heading that mentions strategies (or
+    items that name one); key levels are items quoting prices or
+    percentages next to level words; risks are items about risk. Each list
+    holds at most MAX_ITEMS items of at most MAX_ITEM_CHARS characters.
+    """
+    overview, levels, strategies, risks = [], [], [], []
+    section_is_strategy = False
+    for heading, text in _items(report or ""):
+        if heading:
+            section_is_strategy = bool(_STRATEGY_WORDS.search(text))
+            continue
+        text = _clip(text)
+        if len(overview) < 2:
+            overview.append(text)
+        if _PRICE_OR_PERCENT.search(text) and _LEVEL_WORDS.search(text):
+            levels.append(text)
+        if section_is_strategy or text.lower().startswith("strategy"):
+            strategies.append(text)
+        if _RISK_WORDS.search(text):
+            risks.append(text)
+
+    def first(items):
+        return list(dict.fromkeys(items))[:MAX_ITEMS]
+
+    return Summary(" ".join(overview), first(levels), first(strategies), first(risks), artifact)
+
+
+def render_summary(summary):
+    lines = [f"Overview: {summary.overview or '(empty report)'}"]
+    for title, items in (
+        ("Key levels", summary.key_levels),
+        ("Strategies", summary.strategies),
+        ("Risks", summary.risks),
+    ):
+        if items:
+            lines.append(f"{title}:")
+            lines += [f"- {item}" for item in items]
+    if summary.artifact:
+        lines.append(f"(Full report: {summary.artifact})")
+    return "\n".join(lines)
+
+
+async def _save_report(context, output_key, report):
+    """Saves `report` as an artifact; returns its name, or None without an artifact store."""
+    name = artifact_name(output_key)
+    try:
+        await context.save_artifact(name, types.Part(text=report))
+    except ValueError:  # no artifact service configured
+        return None
+    return name
+
+
+async def _compact(context, output_key, key=None):
+    """Summarizes the report in state[output_key] under `key` (default:
+    output_key): the summary goes to summary_key(key), the report to
+    state[key] and the artifact artifact_name(key)."""
+    key = key or output_key
+    report = context.state.get(output_key)
+    if not report:
+        return None
+    if isinstance(report, dict):
+        # Structured output (financial_advisor.schemas) is already compact.
+        context.state[summary_key(key)] = json.dumps(report)
+        return None
+    if key != output_key:
+        context.state[key] = report
+    summary = summarize_report(report)
+    # Set before saving (which awaits) so concurrent branches compact once.
+    context.state[summary_key(key)] = render_summary(summary)
+    summary = summary._replace(artifact=await _save_report(context, key, report))
+    context.state[summary_key(key)] = render_summary(summary)
+    return summary
+
+
+def summarize_inputs(*output_keys):
+    """before_agent_callback that writes `summary_key(k)` for each report
+    in state that has no summary yet (pipeline stages read the summaries)."""
+
+    async def summarize(callback_context):
+        for output_key in output_keys:
+            if summary_key(output_key) not in callback_context.state:
+                await _compact(callback_context, output_key)
+        return None
+
+    return summarize
+
+
+async def compact_tool_response(tool, args, tool_context, tool_response):
+    """after_tool_callback: replaces a sub-agent's report with its summary.
+
+    The report is kept per ticker named in the request (per call when there
+    is none) under `report_key`, so a later report of another ticker does
+    not replace it.
+    """
+    if (
+        not isinstance(tool, AgentTool)
+        or tool.agent.output_key not in REPORT_KEYS
+        or getattr(tool.agent, "output_schema", None) is not None
+    ):
+        return None
+    output_key = tool.agent.output_key
+    if not tool_context.state.get(output_key):
+        # AgentTool forwards the sub-agent's state; fall back to its answer.
+        tool_context.state[output_key] = (
+            tool_response if isinstance(tool_response, str) else str(tool_response)
+        )
+    ticker = extract_ticker(str((args or {}).get("request", "")))
+    key = report_key(output_key, ticker or tool_context.function_call_id or "latest")
+    summary = await _compact(tool_context, output_key, key)
+    if summary is None:
+        # An empty or structured answer; pass it through unchanged.
+        return None
+    return {
+        "report": output_key,
+        "ticker": ticker,
+        "overview": summary.overview,
+        "key_levels": summary.key_levels,
+        "strategies": summary.strategies,
+        "risks": summary.risks,
+        "full_report": summary.artifact or f"state key {key}",
+    }
+
+
+def _full_report_key(report, ticker):
+    report = report.removeprefix("state key ").removesuffix(".md").strip()
+    if report in REPORT_KEYS:
+        return report_key(report, ticker) if ticker else report
+    if any(report.startswith(f"{key}_") for key in REPORT_KEYS):
+        return report
+    return None
+
+
+async def load_full_report(report: str, tool_context: ToolContext, ticker: str = "") -> dict:
+    """Returns the full text of a sub-agent report.
+
+    Args:
+      report: one of market_data_analysis_output, proposed_trading_strategies_output,
+        execution_plan_output or final_risk_assessment_output, or the full_report
+        value of a summary.
+      ticker: the ticker the report is about; empty for the latest report.
+    """
+    key = _full_report_key(report, ticker.strip().upper())
+    if key is None:
+        return {"error": f"Unknown report {report!r}; use one of {', '.join(REPORT_KEYS)}."}
+    part = None
+    try:
+        part = await tool_context.load_artifact(artifact_name(key))
+    except ValueError:  # no artifact service configured
+        pass
+    text = part.text if part is not None else tool_context.state.get(key)
+    if isinstance(text, dict):
+        return {"report": text}
+    if not text:
+        return {"error": f"No {key} yet."}
+    return {"report": text}
+
+
+def _stale_response(part):
+    return types.Part(function_response=types.FunctionResponse(
+        id=part.function_response.id,
+        name=part.function_response.name,
+        response={"result": "Superseded; see the latest result or call load_full_report."},
+    ))
+
+
+def _report_of(response):
+    # Where a compact_tool_response summary's report is kept (one per
+    # report and ticker), else None. Call ids are not sent to the model.
+    result = response.response or {}
+    if "report" in result and "full_report" in result:
+        return result["full_report"]
+    return None
+
+
+def trim_history(callback_context, llm_request):
+    """before_model_callback: stubs out a report summary when the same
+    report was re-run for the same ticker later in the session, and full
+    reports loaded before the latest user turn (load_full_report can fetch
+    them again), so repeated work takes a bounded share of the prompt."""
+    last_user = max(
+        (i for i, content in enumerate(llm_request.contents)
+         if content.role == "user" and any(part.text for part in content.parts or ())),
+        default=0,
+    )
+    seen = set()
+    contents = []
+    for i, content in reversed(list(enumerate(llm_request.contents))):
+        parts = content.parts or []
+        new_parts = []
+        for part in parts:
+            response = part.function_response
+            report = _report_of(response) if response is not None else None
+            if report is not None and report in seen or (
+                response is not None
+                and response.name == load_full_report.__name__
+                and i < last_user
+            ):
+                part = _stale_response(part)
+            elif report is not None:
+                seen.add(report)
+            new_parts.append(part)
+        if any(new is not old for new, old in zip(new_parts, parts)):
+            content = types.Content(role=content.role, parts=new_parts)
+        contents.append(content)
+    llm_request.contents = contents[::-1]
+    return None
+
+
+def compact_reports(coordinator):
+    """Makes `coordinator` receive summaries instead of its sub-agents' full
+    reports, and gives it a load_full_report tool. Returns `coordinator`."""
+    if not isinstance(coordinator, LlmAgent):
+        raise TypeError("compact_reports needs an LlmAgent coordinator")
+    if not any(getattr(tool, "func", None) is load_full_report for tool in coordinator.tools):
+        coordinator.tools.append(FunctionTool(load_full_report))
+        coordinator.instruction += prompt.REPORT_COMPACTION_NOTE
+    telemetry.add_callback(coordinator, "after_tool_callback", compact_tool_response)
+    telemetry.add_callback(coordinator, "before_model_callback", trim_history)
+    return coordinator
+
+
+def enabled():
+    return os.environ.get("REPORT_COMPACTION", "1") != "0"
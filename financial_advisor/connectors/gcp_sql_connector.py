@@ -1,102 +1,587 @@
+import math
 import os
-from sqlalchemy import create_engine, text
+import threading
+import time
+import weakref
+from collections import namedtuple
+from functools import lru_cache
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    Double,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    create_engine,
+    delete,
+    event,
+    inspect,
+    select,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import URL
 from sqlalchemy.exc import OperationalError
-from google.cloud import secretmanager
 
-def _get_secret(secret_id: str, version: str = "latest") -> str:
-    """Retrieves a secret from Google Secret Manager."""
+# Rows per multi-row INSERT. Keeps statements well below the placeholder
+# limits of both MySQL and SQLite.
+DEFAULT_BATCH_SIZE = int(os.environ.get("SQL_UPSERT_BATCH_SIZE", 500))
+
+# Connection pool and secret cache settings for the shared engine.
+POOL_SIZE = int(os.environ.get("SQL_POOL_SIZE", 5))
+POOL_MAX_OVERFLOW = int(os.environ.get("SQL_POOL_MAX_OVERFLOW", 5))
+POOL_RECYCLE_SECONDS = int(os.environ.get("SQL_POOL_RECYCLE_SECONDS", 1800))
+SECRET_TTL_SECONDS = float(os.environ.get("SECRET_TTL_SECONDS", 300))
+
+_lock = threading.RLock()
+_engines = {}
+_secret_cache = {}
+_created_tables = weakref.WeakKeyDictionary()
+
+metadata = MetaData()
+
+# Where create_portfolio_table moves a portfolio table created before
+# positions were keyed by (account_name, con_id).
+LEGACY_PORTFOLIO_TABLE = "portfolio_symbol_keyed"
+
+portfolio_table = Table(
+    "portfolio",
+    metadata,
+    Column("account_name", String(255), primary_key=True),
+    Column("con_id", BigInteger, primary_key=True, autoincrement=False),
+    Column("symbol", String(255)),
+    Column("quantity", Double),
+    Column("market_price", Double),
+    Column("market_value", Double),
+    Column("average_cost", Double),
+    Column("unrealized_pnl", Double),
+    Column("realized_pnl", Double),
+)
+
+# Append-only position history. `taken_at` is the bucket start in Unix
+# seconds (UTC) and `bucket_seconds` its width: 60 for fresh snapshots, 3600
+# and 86400 once `portfolio_snapshots.downsample` has rolled them up. The key
+# order makes "one account, one resolution, time range" a primary key scan.
+portfolio_snapshots_table = Table(
+    "portfolio_snapshots",
+    metadata,
+    Column("account_name", String(255), primary_key=True),
+    Column("bucket_seconds", Integer, primary_key=True, autoincrement=False),
+    Column("taken_at", BigInteger, primary_key=True, autoincrement=False),
+    Column("con_id", BigInteger, primary_key=True, autoincrement=False),
+    Column("symbol", String(255)),
+    Column("quantity", Double),
+    Column("market_price", Double),
+    Column("market_value", Double),
+    Column("unrealized_pnl", Double),
+    Column("realized_pnl", Double),
+    Index("idx_snapshot_position", "account_name", "con_id", "taken_at"),
+)
+
+# Per-account totals of portfolio_snapshots, so P&L curves read one row per
+# bucket instead of aggregating every position.
+portfolio_pnl_snapshots_table = Table(
+    "portfolio_pnl_snapshots",
+    metadata,
+    Column("account_name", String(255), primary_key=True),
+    Column("bucket_seconds", Integer, primary_key=True, autoincrement=False),
+    Column("taken_at", BigInteger, primary_key=True, autoincrement=False),
+    Column("positions", Integer),
+    Column("market_value", Double),
+    Column("unrealized_pnl", Double),
+    Column("realized_pnl", Double),
+)
+
+insider_trades_table = Table(
+    "insider_trades",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("ticker", String(255)),
+    Column("insider_name", String(255)),
+    Column("relationship", String(255)),
+    Column("transaction_date", Date),
+    Column("transaction_type", String(255)),
+    Column("transaction_value", BigInteger),
+    Column("shares", BigInteger),
+    Column("price_per_share", Float),
+    UniqueConstraint(
+        "ticker",
+        "insider_name",
+        "transaction_date",
+        "transaction_type",
+        "shares",
+        name="idx_unique_trade",
+    ),
+    # Read paths of insider_trade_queries; the trailing id makes the keyset
+    # cursors (date, id) and (value, id) index-ordered.
+    Index("idx_trade_ticker_date", "ticker", "transaction_type", "transaction_date", "id"),
+    Index("idx_trade_date", "transaction_date", "transaction_type", "transaction_value"),
+    # top_buys walks this in value order and filters the date window from
+    # the index, so a page reads about limit / (share of rows in the window)
+    # entries instead of sorting the whole window.
+    Index("idx_trade_value", "transaction_type", "transaction_value", "id", "transaction_date"),
+    Index("idx_trade_insider_date", "insider_name", "transaction_date", "id"),
+)
+
+ingestion_watermarks_table = Table(
+    "ingestion_watermarks",
+    metadata,
+    Column("source", String(255), primary_key=True),
+    Column("high_water_date", Date),
+    # JSON list of the lookback window's row hashes; a busy source outgrows
+    # MySQL TEXT (64 KB).
+    Column("row_hashes", Text().with_variant(mysql.MEDIUMTEXT(), "mysql")),
+)
+
+# Structured-output mode results (financial_advisor.schemas): the latest
+# strategies and risk scores per ticker and risk attitude.
+trading_strategies_table = Table(
+    "trading_strategies",
+    metadata,
+    Column("ticker", String(32), primary_key=True),
+    Column("risk_attitude", String(64), primary_key=True),
+    Column("name", String(255), primary_key=True),
+    Column("direction", String(8)),
+    Column("entry_price", Double),
+    Column("stop_loss", Double),
+    Column("take_profit", Double),
+    Column("position_size_pct", Double),
+    Column("time_horizon", String(255)),
+    Column("entry_condition", Text),
+    Column("rationale", Text),
+)
+
+risk_scores_table = Table(
+    "risk_scores",
+    metadata,
+    Column("ticker", String(32), primary_key=True),
+    Column("risk_attitude", String(64), primary_key=True),
+    Column("category", String(255), primary_key=True),
+    Column("score", Integer),
+    Column("rationale", Text),
+    Column("mitigation", Text),
+)
+
+# Same order as ibkr_connector.PositionRow.
+PORTFOLIO_COLUMNS = (
+    "account_name",
+    "con_id",
+    "symbol",
+    "quantity",
+    "market_price",
+    "market_value",
+    "average_cost",
+    "unrealized_pnl",
+    "realized_pnl",
+)
+PORTFOLIO_KEY = ("account_name", "con_id")
+
+INSIDER_TRADE_COLUMNS = (
+    "ticker",
+    "insider_name",
+    "relationship",
+    "transaction_date",
+    "transaction_type",
+    "transaction_value",
+    "shares",
+    "price_per_share",
+)
+INSIDER_TRADE_KEY = (
+    "ticker",
+    "insider_name",
+    "transaction_date",
+    "transaction_type",
+    "shares",
+)
+
+# Same order as schemas.TradingStrategies.rows() / RiskAssessment.rows().
+TRADING_STRATEGY_COLUMNS = (
+    "ticker",
+    "risk_attitude",
+    "name",
+    "direction",
+    "entry_price",
+    "stop_loss",
+    "take_profit",
+    "position_size_pct",
+    "time_horizon",
+    "entry_condition",
+    "rationale",
+)
+RISK_SCORE_COLUMNS = ("ticker", "risk_attitude", "category", "score", "rationale", "mitigation")
+
+
+class UpsertStats(namedtuple("UpsertStats", ["rows", "batches", "seconds"])):
+    """Outcome of a bulk upsert."""
+
+    __slots__ = ()
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+PortfolioSyncStats = namedtuple(
+    "PortfolioSyncStats", ["positions", "written", "deleted", "seconds"]
+)
+
+
+@lru_cache(maxsize=1)
+def _secret_client():
+    """Returns a process-wide Secret Manager client (one gRPC channel)."""
+    # Imported here: the client library pulls in gRPC and protobuf, which
+    # the local SQLite paths never need.
+    from google.cloud import secretmanager
+
+    return secretmanager.SecretManagerServiceClient()
+
+def _get_secret(secret_id: str, version: str = "latest", max_age=None) -> str:
+    """Retrieves a secret from Google Secret Manager.
+
+    Values are cached for `max_age` seconds (SECRET_TTL_SECONDS by default)
+    so rotated secrets are picked up without an RPC on every call.
+    """
+    max_age = SECRET_TTL_SECONDS if max_age is None else max_age
+    key = (secret_id, version)
+    with _lock:
+        cached = _secret_cache.get(key)
+        if cached and time.monotonic() - cached[1] < max_age:
+            return cached[0]
     project_id = os.environ["GOOGLE_CLOUD_PROJECT"]
-    client = secretmanager.SecretManagerServiceClient()
     name = f"projects/{project_id}/secrets/{secret_id}/versions/{version}"
-    response = client.access_secret_version(name=name)
-    return response.payload.data.decode("UTF-8")
+    response = _secret_client().access_secret_version(name=name)
+    value = response.payload.data.decode("UTF-8")
+    with _lock:
+        _secret_cache[key] = (value, time.monotonic())
+    return value
+
+def _build_engine(db_url):
+    """Creates a pooled engine tuned for a long-lived Cloud Run instance."""
+    engine = create_engine(
+        db_url,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_recycle=POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+    )
+
+    @event.listens_for(engine, "handle_error")
+    def _invalidate_on_auth_error(context):
+        # MySQL "Access denied": the password was most likely rotated, so
+        # drop the cached secrets and let the next lookup rebuild the engine.
+        if getattr(context.original_exception, "errno", None) == 1045:
+            clear_secret_cache()
+
+    return engine
+
+def clear_secret_cache():
+    """Forgets cached secrets; the next lookup fetches them again."""
+    with _lock:
+        _secret_cache.clear()
 
 def get_gcp_sql_engine():
-    """Creates a SQLAlchemy engine for GCP SQL."""
+    """Returns the shared SQLAlchemy engine for GCP SQL.
+
+    The engine (and its connection pool) is created once per process and
+    reused. Credentials come from the secret cache, so a warm call does no
+    RPCs; when a refreshed secret changes the URL, the old engine is
+    disposed and replaced.
+    """
     # These values match the resources created in Terraform
     db_user = "db_user"
     db_name = "adk-trade"
     db_pass = _get_secret("db-password")
     db_host = _get_secret("db-host")
 
-    # Connection string for a public IP connection
-    db_uri = f"mysql+mysqlconnector://{db_user}:{db_pass}@{db_host}/{db_name}"
+    # Connection URL for a public IP connection
+    db_url = URL.create(
+        "mysql+mysqlconnector",
+        username=db_user,
+        password=db_pass,
+        host=db_host,
+        database=db_name,
+    )
+
+    with _lock:
+        engine = _engines.get("default")
+        if engine is not None and engine.url == db_url:
+            return engine
+        if engine is not None:
+            engine.dispose()
+        engine = _engines["default"] = _build_engine(db_url)
+        return engine
+
+def dispose_engines():
+    """Closes every pooled connection, e.g. on service shutdown."""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+@lru_cache(maxsize=64)
+def _upsert_statement(dialect, table, columns, key, row_count):
+    """Builds a multi-row upsert for `row_count` rows, cached per shape.
+
+    Placeholders are suffixed with the row index (`:ticker_0`, `:ticker_1`,
+    ...), so a full batch always reuses the same compiled statement and only
+    the trailing partial batch needs a second one.
+    """
+    values = ", ".join(
+        "(" + ", ".join(f":{column}_{i}" for column in columns) + ")"
+        for i in range(row_count)
+    )
+    updates = [column for column in columns if column not in key]
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values}"
+    if dialect == "sqlite":
+        # SQLite stand-in for local benchmarks and tests.
+        assignments = ", ".join(f"{c} = excluded.{c}" for c in updates)
+        sql += f" ON CONFLICT ({', '.join(key)}) DO UPDATE SET {assignments}"
+    else:
+        assignments = ", ".join(f"{c} = VALUES({c})" for c in updates)
+        sql += f" ON DUPLICATE KEY UPDATE {assignments}"
+    return text(sql)
+
+def _as_mapping(row, columns):
+    """Accepts dicts, namedtuples, or plain tuples in `columns` order."""
+    if isinstance(row, dict):
+        return row
+    if hasattr(row, "_asdict"):
+        return row._asdict()
+    return dict(zip(columns, row))
+
+def _execute_upsert(connection, table, columns, key, rows, batch_size):
+    """Runs the batched upsert on an open connection; returns the batch count."""
+    dialect = connection.dialect.name
+    batches = 0
+    for offset in range(0, len(rows), batch_size):
+        batch = [_as_mapping(row, columns) for row in rows[offset:offset + batch_size]]
+        stmt = _upsert_statement(dialect, table, columns, key, len(batch))
+        params = {
+            f"{column}_{i}": row[column]
+            for i, row in enumerate(batch)
+            for column in columns
+        }
+        connection.execute(stmt, params)
+        batches += 1
+    return batches
+
+def bulk_upsert(engine, table, columns, key, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Upserts `rows` into `table` with one statement per batch.
 
-    return create_engine(db_uri)
+    Rows may be dicts or tuples in `columns` order. Returns an `UpsertStats`
+    with the row count, number of round-trips and elapsed seconds;
+    `stats.rows_per_second` gives the throughput.
+    """
+    rows = list(rows)
+    if not rows:
+        return UpsertStats(0, 0, 0.0)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        batches = _execute_upsert(connection, table, columns, key, rows, batch_size)
+    return UpsertStats(len(rows), batches, time.perf_counter() - start)
+
+def _create_tables(engine, *tables):
+    """Runs CREATE TABLE IF NOT EXISTS once per engine and table.
+
+    Indexes added to a table after it was first created are created too
+    (create_all only adds indexes along with a new table).
+    """
+    with _lock:
+        created = _created_tables.setdefault(engine, set())
+        missing = [table for table in tables if table.name not in created]
+    if missing:
+        metadata.create_all(engine, tables=missing)
+        for table in missing:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+        with _lock:
+            created.update(table.name for table in missing)
+
+def _migrate_symbol_keyed_portfolio(engine):
+    # The original portfolio table was keyed by symbol and has no con_id, so
+    # its rows cannot be carried over to the (account_name, con_id) key. They
+    # are only the last synced positions, which the next sync rewrites; the
+    # old table is kept under LEGACY_PORTFOLIO_TABLE.
+    inspector = inspect(engine)
+    if not inspector.has_table("portfolio"):
+        return
+    if "con_id" in {column["name"] for column in inspector.get_columns("portfolio")}:
+        return
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE portfolio RENAME TO {LEGACY_PORTFOLIO_TABLE}"))
+    print(f"Renamed the symbol-keyed portfolio table to {LEGACY_PORTFOLIO_TABLE}.")
 
 def create_portfolio_table(engine):
-    """Creates the portfolio table if it doesn't exist."""
-    with engine.connect() as connection:
-        connection.execute(text("""
-            CREATE TABLE IF NOT EXISTS portfolio (
-                symbol VARCHAR(255) PRIMARY KEY,
-                quantity INTEGER,
-                market_price FLOAT,
-                market_value FLOAT,
-                average_cost FLOAT,
-                unrealized_pnl FLOAT,
-                realized_pnl FLOAT,
-                account_name VARCHAR(255)
-            )
-        """))
+    """Creates the portfolio table if it doesn't exist, first moving aside a
+    table in the original symbol-keyed layout."""
+    with _lock:
+        done = portfolio_table.name in _created_tables.get(engine, ())
+    if not done:
+        _migrate_symbol_keyed_portfolio(engine)
+    _create_tables(engine, portfolio_table)
 
-def upsert_portfolio(engine, portfolio):
+def upsert_portfolio(engine, portfolio, batch_size=DEFAULT_BATCH_SIZE):
     """Inserts or updates the portfolio data."""
-    with engine.connect() as connection:
-        trans = connection.begin()
-        for position in portfolio:
-            stmt = text("""
-                INSERT INTO portfolio (symbol, quantity, market_price, market_value, average_cost, unrealized_pnl, realized_pnl, account_name)
-                VALUES (:symbol, :quantity, :market_price, :market_value, :average_cost, :unrealized_pnl, :realized_pnl, :account_name)
-                ON DUPLICATE KEY UPDATE
-                    quantity = VALUES(quantity),
-                    market_price = VALUES(market_price),
-                    market_value = VALUES(market_value),
-                    average_cost = VALUES(average_cost),
-                    unrealized_pnl = VALUES(unrealized_pnl),
-                    realized_pnl = VALUES(realized_pnl),
-                    account_name = VALUES(account_name)
-            """)
-            connection.execute(stmt, **position)
-        trans.commit()
+    return bulk_upsert(
+        engine, "portfolio", PORTFOLIO_COLUMNS, PORTFOLIO_KEY, portfolio, batch_size
+    )
+
+def _same_row(stored, row):
+    return len(stored) == len(row) and all(
+        a == b or (
+            isinstance(a, float) and isinstance(b, (int, float))
+            and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+        )
+        for a, b in zip(stored, row)
+    )
+
+def sync_portfolio(engine, positions, accounts=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Makes the portfolio table match `positions` for `accounts`.
+
+    `positions` maps (account_name, con_id) to a row tuple in
+    PORTFOLIO_COLUMNS order (see `ibkr_connector.portfolio_rows`).
+    `accounts` names every account the positions were fetched for; pass it
+    so that an account whose positions were all closed is cleared too. It
+    defaults to the accounts appearing in `positions`. The stored snapshot
+    of those accounts is read once; only new or changed rows are upserted
+    and positions that disappeared are deleted, all in a single
+    transaction. Returns a PortfolioSyncStats.
+    """
+    start = time.perf_counter()
+    accounts = sorted(
+        set(accounts or ()) | {account for account, _ in positions}
+    )
+    with engine.begin() as connection:
+        stored = {}
+        if accounts:
+            result = connection.execute(
+                select(*(portfolio_table.c[c] for c in PORTFOLIO_COLUMNS)).where(
+                    portfolio_table.c.account_name.in_(accounts)
+                )
+            )
+            stored = {(row[0], row[1]): tuple(row) for row in result}
+        changed = [
+            tuple(row)
+            for key, row in positions.items()
+            if key not in stored or not _same_row(stored[key], tuple(row))
+        ]
+        removed = [key for key in stored if key not in positions]
+        if removed:
+            connection.execute(
+                delete(portfolio_table).where(
+                    tuple_(portfolio_table.c.account_name, portfolio_table.c.con_id).in_(removed)
+                )
+            )
+        _execute_upsert(
+            connection, "portfolio", PORTFOLIO_COLUMNS, PORTFOLIO_KEY, changed, batch_size
+        )
+    return PortfolioSyncStats(
+        len(positions), len(changed), len(removed), time.perf_counter() - start
+    )
+
+def create_portfolio_snapshots_table(engine):
+    """Creates the portfolio_snapshots and portfolio_pnl_snapshots tables if they don't exist."""
+    _create_tables(engine, portfolio_snapshots_table, portfolio_pnl_snapshots_table)
 
 def create_insider_trades_table(engine):
     """Creates the insider_trades table if it doesn't exist."""
-    with engine.connect() as connection:
-        connection.execute(text("""
-            CREATE TABLE IF NOT EXISTS insider_trades (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                ticker VARCHAR(255),
-                insider_name VARCHAR(255),
-                relationship VARCHAR(255),
-                transaction_date DATE,
-                transaction_type VARCHAR(255),
-                transaction_value BIGINT,
-                shares BIGINT,
-                price_per_share FLOAT,
-                UNIQUE KEY `idx_unique_trade` (`ticker`, `insider_name`, `transaction_date`, `transaction_type`, `shares`)
-            )
-        """))
+    _create_tables(engine, insider_trades_table)
 
-def upsert_insider_trades(engine, trades):
+def upsert_insider_trades(engine, trades, batch_size=DEFAULT_BATCH_SIZE):
     """Inserts or updates the insider trades data."""
+    return bulk_upsert(
+        engine,
+        "insider_trades",
+        INSIDER_TRADE_COLUMNS,
+        INSIDER_TRADE_KEY,
+        trades,
+        batch_size,
+    )
+
+def create_ingestion_watermarks_table(engine):
+    """Creates the ingestion_watermarks table if it doesn't exist.
+
+    On MySQL, widens a row_hashes column created as TEXT to MEDIUMTEXT.
+    """
+    with _lock:
+        done = ingestion_watermarks_table.name in _created_tables.get(engine, ())
+    _create_tables(engine, ingestion_watermarks_table)
+    if done or engine.dialect.name != "mysql":
+        return
+    columns = {c["name"]: c["type"] for c in inspect(engine).get_columns("ingestion_watermarks")}
+    if type(columns.get("row_hashes")) is mysql.TEXT:
+        with engine.begin() as connection:
+            connection.execute(text(
+                "ALTER TABLE ingestion_watermarks MODIFY row_hashes MEDIUMTEXT"
+            ))
+
+def load_watermark(engine, source):
+    """Returns (high_water_date, row_hashes_json) for `source`, or (None, None)."""
     with engine.connect() as connection:
-        trans = connection.begin()
-        for trade in trades:
-            stmt = text("""
-                INSERT INTO insider_trades (ticker, insider_name, relationship, transaction_date, transaction_type, transaction_value, shares, price_per_share)
-                VALUES (:ticker, :insider_name, :relationship, :transaction_date, :transaction_type, :transaction_value, :shares, :price_per_share)
-                ON DUPLICATE KEY UPDATE
-                    insider_name = VALUES(insider_name),
-                    relationship = VALUES(relationship),
-                    transaction_date = VALUES(transaction_date),
-                    transaction_type = VALUES(transaction_type),
-                    transaction_value = VALUES(transaction_value),
-                    shares = VALUES(shares),
-                    price_per_share = VALUES(price_per_share)
-            """)
-            connection.execute(stmt, **trade)
-        trans.commit()
+        row = connection.execute(
+            text(
+                "SELECT high_water_date, row_hashes FROM ingestion_watermarks "
+                "WHERE source = :source"
+            ),
+            {"source": source},
+        ).first()
+    return (row[0], row[1]) if row else (None, None)
+
+def save_watermark(engine, source, high_water_date, row_hashes):
+    """Inserts or updates the watermark for `source`."""
+    return bulk_upsert(
+        engine,
+        "ingestion_watermarks",
+        ("source", "high_water_date", "row_hashes"),
+        ("source",),
+        [{
+            "source": source,
+            "high_water_date": high_water_date,
+            "row_hashes": row_hashes,
+        }],
+    )
+
+def create_structured_output_tables(engine):
+    """Creates the trading_strategies and risk_scores tables if they don't exist."""
+    _create_tables(engine, trading_strategies_table, risk_scores_table)
+
+def _replace_rows(engine, table, columns, key, rows, batch_size):
+    # A new analysis replaces every row of its (ticker, risk_attitude).
+    rows = [_as_mapping(row, columns) for row in rows]
+    if not rows:
+        return UpsertStats(0, 0, 0.0)
+    start = time.perf_counter()
+    groups = {(row["ticker"], row["risk_attitude"]) for row in rows}
+    with engine.begin() as connection:
+        connection.execute(delete(table).where(
+            tuple_(table.c.ticker, table.c.risk_attitude).in_(groups)
+        ))
+        batches = _execute_upsert(connection, table.name, columns, key, rows, batch_size)
+    return UpsertStats(len(rows), batches, time.perf_counter() - start)
+
+def replace_trading_strategies(engine, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Stores TradingStrategies.rows(), replacing earlier strategies of the same
+    ticker and risk attitude."""
+    return _replace_rows(
+        engine, trading_strategies_table, TRADING_STRATEGY_COLUMNS,
+        ("ticker", "risk_attitude", "name"), rows, batch_size,
+    )
+
+def replace_risk_scores(engine, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Stores RiskAssessment.rows(), replacing earlier scores of the same
+    ticker and risk attitude."""
+    return _replace_rows(
+        engine, risk_scores_table, RISK_SCORE_COLUMNS,
+        ("ticker", "risk_attitude", "category"), rows, batch_size,
+    )
 
 if __name__ == "__main__":
     # For testing purposes
@@ -109,4 +594,4 @@ if __name__ == "__main__":
         create_insider_trades_table(engine)
         print("Successfully connected to the database and created the tables.")
     except OperationalError as e:
-        print(f"Failed to connect to the database: {e}")
\ No newline at end of file
+        print(f"Failed to connect to the database: {e}")
@@ -1,26 +1,84 @@
-
+import math
 import os
-from ib_insync import IB, util
+from collections import namedtuple
+from operator import attrgetter
+
+def connection_settings():
+    """Returns (host, port, client_id) for TWS / IB Gateway from the environment."""
+    return (
+        os.environ.get("IBKR_HOST", "127.0.0.1"),
+        int(os.environ.get("IBKR_PORT", 7497)),
+        int(os.environ.get("IBKR_CLIENT_ID", 1)),
+    )
+
+# One portfolio table row; field order matches gcp_sql_connector.PORTFOLIO_COLUMNS.
+PositionRow = namedtuple(
+    "PositionRow",
+    [
+        "account_name",
+        "con_id",
+        "symbol",
+        "quantity",
+        "market_price",
+        "market_value",
+        "average_cost",
+        "unrealized_pnl",
+        "realized_pnl",
+    ],
+)
+
+_position_fields = attrgetter(
+    "account",
+    "contract.conId",
+    "contract.symbol",
+    "position",
+    "marketPrice",
+    "marketValue",
+    "averageCost",
+    "unrealizedPNL",
+    "realizedPNL",
+)
+
+def _clean(value):
+    # IB reports unknown prices as NaN, which MySQL cannot store.
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+def position_row(item):
+    """Maps an ib_insync PortfolioItem to a PositionRow."""
+    return PositionRow._make(map(_clean, _position_fields(item)))
+
+def portfolio_rows(portfolio):
+    """Maps PortfolioItems to {(account, conId): PositionRow} in one pass."""
+    return {(row.account_name, row.con_id): row for row in map(position_row, portfolio)}
+
+def get_ibkr_accounts_and_portfolio():
+    """Connects to IBKR and fetches the managed account names and the portfolio.
+
+    The account names include accounts without open positions.
+    """
+    # ib_insync (and eventkit) load only when TWS is actually contacted.
+    from ib_insync import IB
 
-def get_ibkr_portfolio():
-    """Connects to IBKR and fetches the portfolio."""
     ib = IB()
+    host, port, client_id = connection_settings()
     try:
-        ib.connect(
-            os.environ.get("IBKR_HOST", "127.0.0.1"),
-            os.environ.get("IBKR_PORT", 7497),
-            clientId=os.environ.get("IBKR_CLIENT_ID", 1),
-        )
-        portfolio = ib.portfolio()
-        return portfolio
+        ib.connect(host, port, clientId=client_id)
+        return ib.managedAccounts(), ib.portfolio()
     finally:
         ib.disconnect()
 
+def get_ibkr_portfolio():
+    """Connects to IBKR and fetches the portfolio."""
+    return get_ibkr_accounts_and_portfolio()[1]
+
 if __name__ == "__main__":
     # For testing purposes
     from dotenv import load_dotenv
 
     load_dotenv()
+    from ib_insync import util
+
     util.startLoop()
     portfolio = get_ibkr_portfolio()
     print(portfolio)
+
@@ -0,0 +1,195 @@
+import asyncio
+import math
+
+from ib_insync import IB
+
+from financial_advisor.connectors import gcp_sql_connector, ibkr_connector
+
+# PnLSingle fields copied onto the position rows.
+_PNL_FIELDS = {
+    "unrealizedPnL": "unrealized_pnl",
+    "realizedPnL": "realized_pnl",
+    "value": "market_value",
+    "position": "quantity",
+}
+
+
+def write_positions(rows):
+    """Default sink: upserts changed position rows into the portfolio table."""
+    engine = gcp_sql_connector.get_gcp_sql_engine()
+    gcp_sql_connector.create_portfolio_table(engine)
+    return gcp_sql_connector.upsert_portfolio(engine, rows)
+
+
+class PortfolioStream:
+    """Keeps an in-memory position book in sync with TWS over one connection.
+
+    Instead of connect / `ib.portfolio()` / disconnect per update, the stream
+    stays connected, listens to `updatePortfolioEvent` and `pnlSingleEvent`,
+    and hands only the positions that changed to `sink` in debounced batches
+    (at most one flush per `debounce` seconds). Dropped connections are
+    re-established with exponential backoff and the book is rebuilt from the
+    new snapshot.
+
+    `ib` can be any object exposing the same events and methods as
+    `ib_insync.IB`, which is how the tests drive it.
+    """
+
+    def __init__(self, ib=None, sink=write_positions, debounce=2.0,
+                 reconnect_delay=1.0, max_reconnect_delay=60.0):
+        self.ib = ib or IB()
+        self.sink = sink
+        self.debounce = debounce
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # (account, conId) -> ibkr_connector.PositionRow
+        self.book = {}
+        # Flat rows of positions that closed while disconnected, until flushed.
+        self._closed = {}
+        self.flushes = 0
+        self._dirty = set()
+        self._pnl_subscriptions = set()
+        self._flush_handle = None
+        self._reconnect_task = None
+        self._stopped = False
+
+    async def start(self):
+        """Connects, subscribes to updates and seeds the book."""
+        self.ib.updatePortfolioEvent += self._on_portfolio
+        self.ib.pnlSingleEvent += self._on_pnl_single
+        self.ib.disconnectedEvent += self._on_disconnected
+        await self._connect()
+
+    async def stop(self):
+        """Flushes pending changes, unsubscribes and disconnects."""
+        self._stopped = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        self.ib.updatePortfolioEvent -= self._on_portfolio
+        self.ib.pnlSingleEvent -= self._on_pnl_single
+        self.ib.disconnectedEvent -= self._on_disconnected
+        try:
+            await self.flush()
+        finally:
+            # Release the TWS client id even when the last flush fails.
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self.ib.disconnect()
+
+    async def _connect(self):
+        host, port, client_id = ibkr_connector.connection_settings()
+        await self.ib.connectAsync(host, port, clientId=client_id)
+        self._pnl_subscriptions.clear()
+        items = self.ib.portfolio()
+        for item in items:
+            self._on_portfolio(item)
+        # A position closed during an outage is missing from the snapshot
+        # rather than reported flat: drop it and send the sink a flat row,
+        # as TWS does for a close seen while connected.
+        seeded = {(item.account, item.contract.conId) for item in items}
+        for key in self.book.keys() - seeded:
+            self._closed[key] = self.book.pop(key)._replace(
+                quantity=0.0, market_value=0.0, unrealized_pnl=0.0
+            )
+            self._dirty.add(key)
+            self._schedule_flush()
+
+    def _subscribe_pnl(self, account, con_id):
+        key = (account, con_id)
+        if key not in self._pnl_subscriptions:
+            self._pnl_subscriptions.add(key)
+            self.ib.reqPnLSingle(account, "", con_id)
+
+    def _update(self, key, row):
+        if self.book.get(key) != row:
+            self.book[key] = row
+            self._dirty.add(key)
+            self._schedule_flush()
+
+    def _on_portfolio(self, item):
+        key = (item.account, item.contract.conId)
+        self._update(key, ibkr_connector.position_row(item))
+        self._subscribe_pnl(*key)
+
+    def _on_pnl_single(self, pnl):
+        key = (pnl.account, pnl.conId)
+        row = self.book.get(key)
+        if row is None:
+            return
+        updates = {}
+        for field, column in _PNL_FIELDS.items():
+            value = getattr(pnl, field, None)
+            if value is not None and not math.isnan(value):
+                updates[column] = value
+        self._update(key, row._replace(**updates))
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(
+                self.debounce, lambda: loop.create_task(self._background_flush())
+            )
+
+    async def _background_flush(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Portfolio flush failed, will retry: {e}")
+
+    async def flush(self):
+        """Sends the changed positions to the sink; returns how many were sent."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty:
+            return 0
+        keys, self._dirty = self._dirty, set()
+        rows = [self.book[key] if key in self.book else self._closed[key] for key in keys]
+        try:
+            await asyncio.to_thread(self.sink, rows)
+        except Exception:
+            # Keep the changes so the next flush retries them.
+            self._dirty |= keys
+            self._schedule_flush()
+            raise
+        for key in keys:
+            self._closed.pop(key, None)
+        self.flushes += 1
+        return len(rows)
+
+    def _on_disconnected(self):
+        if not self._stopped and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = self.reconnect_delay
+        while not self._stopped:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+                print("Reconnected to IBKR.")
+                return
+            except Exception as e:  # refused connection, API error while re-seeding, ...
+                print(
+                    f"IBKR reconnect failed ({type(e).__name__}: {e}); "
+                    f"retrying in {delay:.0f}s."
+                )
+                # Drop a half-open session so the next attempt starts clean.
+                self.ib.disconnect()
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def run_forever(self):
+        """Starts the stream and keeps it running until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    asyncio.run(PortfolioStream().run_forever())
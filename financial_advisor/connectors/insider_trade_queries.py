@@ -0,0 +1,92 @@
+import datetime
+from collections import namedtuple
+
+from sqlalchemy import and_, or_, select
+
+from financial_advisor.connectors import gcp_sql_connector
+
+DEFAULT_PAGE_SIZE = 100
+BUY = "Buy"
+
+TRADE_COLUMNS = ("id",) + gcp_sql_connector.INSIDER_TRADE_COLUMNS
+
+# `rows` are dicts of TRADE_COLUMNS; pass `cursor` back to get the next
+# page (None after the last one).
+TradePage = namedtuple("TradePage", ["rows", "cursor"])
+
+
+def _date(value):
+    return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(value)
+
+
+def _after(sort_columns, cursor):
+    """WHERE clause for the rows after `cursor` in descending (a, b, ...) order.
+
+    Spelled out as OR-ed prefix comparisons instead of a row-value
+    comparison, plus a redundant `a <= cursor a` that both MySQL and SQLite
+    turn into an index range, so a deep page starts where the last ended.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(sort_columns, cursor)):
+        equal = [sort_columns[j] == cursor[j] for j in range(i)]
+        clauses.append(and_(*equal, column < value))
+    return and_(sort_columns[0] <= cursor[0], or_(*clauses))
+
+
+def _page(engine, where, sort_columns, limit, cursor):
+    c = gcp_sql_connector.insider_trades_table.c
+    # A NULL sort value can't be a cursor (every comparison with it is
+    # false), so such rows are left out rather than ending the paging.
+    query = select(*(c[name] for name in TRADE_COLUMNS)).where(
+        *where, sort_columns[0].is_not(None)
+    )
+    if cursor is not None:
+        query = query.where(_after(sort_columns, cursor))
+    query = query.order_by(*(column.desc() for column in sort_columns)).limit(limit + 1)
+    with engine.connect() as connection:
+        rows = [dict(row) for row in connection.execute(query).mappings()]
+    if len(rows) <= limit:
+        return TradePage(rows, None)
+    rows = rows[:limit]
+    return TradePage(rows, tuple(rows[-1][column.name] for column in sort_columns))
+
+
+def latest_buys(engine, ticker, limit=DEFAULT_PAGE_SIZE, cursor=None, since=None):
+    """The ticker's buys, newest first (idx_trade_ticker_date).
+
+    `since` is an inclusive transaction date.
+    """
+    c = gcp_sql_connector.insider_trades_table.c
+    where = [c.ticker == ticker.upper(), c.transaction_type == BUY]
+    if since is not None:
+        where.append(c.transaction_date >= _date(since))
+    return _page(engine, where, (c.transaction_date, c.id), limit, cursor)
+
+
+def top_buys(engine, start, end=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+    """Buys dated `start`..`end` (inclusive), largest transaction value first
+    (idx_trade_value). Buys without a transaction value are left out."""
+    c = gcp_sql_connector.insider_trades_table.c
+    where = [c.transaction_type == BUY, c.transaction_date >= _date(start)]
+    if end is not None:
+        where.append(c.transaction_date <= _date(end))
+    return _page(engine, where, (c.transaction_value, c.id), limit, cursor)
+
+
+def insider_history(engine, insider_name, limit=DEFAULT_PAGE_SIZE, cursor=None):
+    """Every trade of one insider across tickers, newest first
+    (idx_trade_insider_date)."""
+    c = gcp_sql_connector.insider_trades_table.c
+    where = [c.insider_name == insider_name]
+    return _page(engine, where, (c.transaction_date, c.id), limit, cursor)
+
+
+def iter_rows(query, engine, *args, page_size=DEFAULT_PAGE_SIZE, **kwargs):
+    """Yields every row of a paged query above, fetching one page at a time."""
+    cursor = None
+    while True:
+        page = query(engine, *args, limit=page_size, cursor=cursor, **kwargs)
+        yield from page.rows
+        if page.cursor is None:
+            return
+        cursor = page.cursor
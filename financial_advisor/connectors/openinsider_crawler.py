@@ -0,0 +1,221 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+
+from financial_advisor.connectors import web_scraper_connector
+
+BASE_URL = "http://openinsider.com"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Upper bound on one retry delay, including a server's Retry-After.
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+def latest_buys_urls(pages=1, base_url=BASE_URL):
+    """URLs for the first `pages` pages of the latest insider buys screen."""
+    return [
+        f"{base_url}/latest-insider-buys"
+        + (f"?{urlencode({'page': page})}" if page > 1 else "")
+        for page in range(1, pages + 1)
+    ]
+
+
+def ticker_urls(tickers, base_url=BASE_URL, page_size=100):
+    """Screener URLs listing each ticker's insider trades."""
+    return [
+        f"{base_url}/screener?"
+        + urlencode({"s": ticker.strip().upper(), "cnt": page_size})
+        for ticker in tickers
+    ]
+
+
+def cluster_buys_urls(base_url=BASE_URL):
+    """URL for the latest cluster buys screen."""
+    return [f"{base_url}/latest-cluster-buys"]
+
+
+def date_range_urls(start, end, pages=1, base_url=BASE_URL, page_size=100):
+    """Screener URLs for purchases traded between `start` and `end` (dates)."""
+    trade_range = f"{start:%m/%d/%Y} - {end:%m/%d/%Y}"
+    return [
+        f"{base_url}/screener?"
+        + urlencode({"tdr": trade_range, "xp": 1, "cnt": page_size, "page": page})
+        for page in range(1, pages + 1)
+    ]
+
+
+@dataclass
+class CrawlResult:
+    url: str
+    status: int
+    trades: list = field(default_factory=list)
+    not_modified: bool = False
+    attempts: int = 1
+    error: str = None
+
+
+class _HostRateLimiter:
+    """Spaces requests to the same host at least `1 / rate` seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class OpenInsiderCrawler:
+    """Fetches many OpenInsider screens concurrently over one HTTP client.
+
+    Concurrency is bounded by a semaphore, requests to each host are rate
+    limited, transient failures are retried with exponential backoff, and
+    ETag / Last-Modified validators are replayed so unchanged pages come back
+    as cheap 304s (served from the previous parse).
+
+        async with OpenInsiderCrawler() as crawler:
+            trades = await crawler.crawl_trades(latest_buys_urls(pages=5))
+    """
+
+    def __init__(
+        self,
+        concurrency=8,
+        rate_per_host=2.0,
+        max_retries=3,
+        backoff=0.5,
+        max_retry_delay=MAX_RETRY_DELAY_SECONDS,
+        timeout=20.0,
+        client=None,
+        parser=None,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_retry_delay = max_retry_delay
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._rate_limiter = _HostRateLimiter(rate_per_host)
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+            headers={"User-Agent": "adk-trade-scanner/0.1"},
+        )
+        self._parse = parser or web_scraper_connector.parse_insider_trades
+        # url -> (etag, last_modified, trades) from the last 200 response.
+        self._validators = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._owns_client:
+            await self._client.aclose()
+
+    def _conditional_headers(self, url):
+        etag, last_modified, _ = self._validators.get(url, (None, None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = self.backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.25)
+        return min(delay, self.max_retry_delay)
+
+    async def fetch(self, url):
+        """Fetches and parses one page, returning a `CrawlResult`."""
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            attempt += 1
+            response = error = None
+            # Only the request holds a slot; backoff sleeps below do not.
+            async with self._semaphore:
+                await self._rate_limiter.wait(host)
+                try:
+                    response = await self._client.get(
+                        url, headers=self._conditional_headers(url)
+                    )
+                except httpx.TransportError as e:
+                    error = e
+            if error is not None:
+                if attempt > self.max_retries:
+                    return CrawlResult(url, 0, attempts=attempt, error=str(error))
+            else:
+                if response.status_code == 304 and url in self._validators:
+                    return CrawlResult(
+                        url, 304, list(self._validators[url][2]),
+                        not_modified=True, attempts=attempt,
+                    )
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                if attempt > self.max_retries:
+                    return CrawlResult(
+                        url, response.status_code, attempts=attempt,
+                        error=f"HTTP {response.status_code}",
+                    )
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+        if response.status_code != 200:
+            return CrawlResult(
+                url, response.status_code, attempts=attempt,
+                error=f"HTTP {response.status_code}",
+            )
+        try:
+            trades = self._parse(response.content)
+        except web_scraper_connector.LayoutChanged as e:
+            return CrawlResult(url, 200, attempts=attempt, error=f"layout changed: {e}")
+        self._validators[url] = (
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            trades,
+        )
+        return CrawlResult(url, 200, trades, attempts=attempt)
+
+    async def crawl(self, urls):
+        """Fetches `urls` concurrently; returns results in the same order."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    async def crawl_trades(self, urls):
+        """Fetches `urls` and returns their trades, de-duplicated across pages."""
+        trades, seen = [], set()
+        for result in await self.crawl(urls):
+            for trade in result.trades:
+                key = tuple(sorted(trade.items()))
+                if key not in seen:
+                    seen.add(key)
+                    trades.append(trade)
+        return trades
+
+
+def crawl_insider_trades(urls, **kwargs):
+    """Blocking helper: crawls `urls` with a short-lived crawler."""
+
+    async def _run():
+        async with OpenInsiderCrawler(**kwargs) as crawler:
+            return await crawler.crawl_trades(urls)
+
+    return asyncio.run(_run())
@@ -0,0 +1,311 @@
+import datetime
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, literal_column, select
+
+from financial_advisor.connectors import gcp_sql_connector
+
+MINUTE, HOUR, DAY = 60, 3600, 86400
+
+# How long each resolution is kept before `downsample` rolls it up into the
+# next one; daily buckets are kept forever.
+RETENTION = {
+    MINUTE: datetime.timedelta(days=7),
+    HOUR: datetime.timedelta(days=90),
+}
+ROLLUPS = ((MINUTE, HOUR), (HOUR, DAY))
+# How often `downsample_if_due` runs `downsample` per engine.
+DOWNSAMPLE_INTERVAL = datetime.timedelta(hours=1)
+
+SNAPSHOT_COLUMNS = (
+    "account_name",
+    "bucket_seconds",
+    "taken_at",
+    "con_id",
+    "symbol",
+    "quantity",
+    "market_price",
+    "market_value",
+    "unrealized_pnl",
+    "realized_pnl",
+)
+SNAPSHOT_KEY = ("account_name", "bucket_seconds", "taken_at", "con_id")
+
+PNL_COLUMNS = (
+    "account_name",
+    "bucket_seconds",
+    "taken_at",
+    "positions",
+    "market_value",
+    "unrealized_pnl",
+    "realized_pnl",
+)
+PNL_KEY = ("account_name", "bucket_seconds", "taken_at")
+
+SnapshotStats = namedtuple("SnapshotStats", ["positions", "accounts", "taken_at", "seconds"])
+DownsampleStats = namedtuple("DownsampleStats", ["rolled_up", "written", "seconds"])
+
+
+def to_epoch(value):
+    """Unix seconds for a datetime (naive values are taken as UTC) or number."""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, datetime.date):
+        return to_epoch(datetime.datetime.combine(value, datetime.time()))
+    return int(value)
+
+
+def _row_values(row):
+    return row._asdict() if hasattr(row, "_asdict") else dict(row)
+
+
+def record_snapshot(engine, positions, taken_at=None, batch_size=gcp_sql_connector.DEFAULT_BATCH_SIZE):
+    """Appends a minute snapshot of `positions` and the per-account totals.
+
+    `positions` is an iterable of position rows (dicts or namedtuples with the
+    portfolio columns, e.g. `ibkr_connector.portfolio_rows(...).values()`).
+    Snapshots taken within the same minute replace each other. Returns a
+    SnapshotStats.
+    """
+    start = time.perf_counter()
+    taken_at = to_epoch(time.time() if taken_at is None else taken_at)
+    taken_at -= taken_at % MINUTE
+
+    rows, totals = [], {}
+    for position in positions:
+        values = _row_values(position)
+        rows.append({
+            "account_name": values["account_name"],
+            "bucket_seconds": MINUTE,
+            "taken_at": taken_at,
+            "con_id": values["con_id"],
+            "symbol": values.get("symbol"),
+            "quantity": values.get("quantity"),
+            "market_price": values.get("market_price"),
+            "market_value": values.get("market_value"),
+            "unrealized_pnl": values.get("unrealized_pnl"),
+            "realized_pnl": values.get("realized_pnl"),
+        })
+        total = totals.setdefault(values["account_name"], {
+            "account_name": values["account_name"],
+            "bucket_seconds": MINUTE,
+            "taken_at": taken_at,
+            "positions": 0,
+            "market_value": 0.0,
+            "unrealized_pnl": 0.0,
+            "realized_pnl": 0.0,
+        })
+        total["positions"] += 1
+        for column in ("market_value", "unrealized_pnl", "realized_pnl"):
+            total[column] += values.get(column) or 0.0
+
+    with engine.begin() as connection:
+        gcp_sql_connector._execute_upsert(
+            connection, "portfolio_snapshots", SNAPSHOT_COLUMNS, SNAPSHOT_KEY, rows, batch_size
+        )
+        gcp_sql_connector._execute_upsert(
+            connection, "portfolio_pnl_snapshots", PNL_COLUMNS, PNL_KEY,
+            list(totals.values()), batch_size,
+        )
+    return SnapshotStats(len(rows), len(totals), taken_at, time.perf_counter() - start)
+
+
+def _roll_up(connection, table, group_columns, columns, key, account_name,
+             source, target, cutoff, batch_size):
+    """Replaces the account's `source` buckets older than `cutoff` with `target` buckets.
+
+    Snapshots are state, not flows, so each coarse bucket keeps the values of
+    the last fine bucket inside it.
+    """
+    c = table.c
+    width = literal_column(str(int(target)))
+    # Filtering on the account keeps both statements on the primary key range.
+    older = and_(
+        c.account_name == account_name, c.bucket_seconds == source, c.taken_at < cutoff
+    )
+    last = (
+        select(*(c[name] for name in group_columns), func.max(c.taken_at).label("last_at"))
+        .where(older)
+        .group_by(*(c[name] for name in group_columns), c.taken_at - c.taken_at % width)
+        .subquery()
+    )
+    rows = connection.execute(
+        select(*(c[name] for name in columns if name not in ("bucket_seconds", "taken_at")),
+               (c.taken_at - c.taken_at % width).label("taken_at"))
+        .join(last, and_(
+            c.bucket_seconds == source,
+            c.taken_at == last.c.last_at,
+            *(c[name] == last.c[name] for name in group_columns),
+        ))
+    ).mappings().all()
+    rows = [dict(row, bucket_seconds=target) for row in rows]
+    gcp_sql_connector._execute_upsert(connection, table.name, columns, key, rows, batch_size)
+    rolled_up = connection.execute(delete(table).where(older)).rowcount
+    return rolled_up, len(rows)
+
+
+def downsample(engine, now=None, batch_size=gcp_sql_connector.DEFAULT_BATCH_SIZE):
+    """Rolls minute snapshots up to hours and hours up to days per RETENTION.
+
+    Only whole coarse buckets are rolled up, so running this at any interval
+    (e.g. hourly) is safe. Returns a DownsampleStats with the number of fine
+    rows removed and coarse rows written.
+    """
+    start = time.perf_counter()
+    now = to_epoch(time.time() if now is None else now)
+    rolled_up = written = 0
+    totals = gcp_sql_connector.portfolio_pnl_snapshots_table
+    with engine.begin() as connection:
+        for source, target in ROLLUPS:
+            cutoff = now - int(RETENTION[source].total_seconds())
+            cutoff -= cutoff % target
+            # Every snapshot also writes its account's total, so the small
+            # totals table tells which accounts have buckets to roll up.
+            accounts = connection.execute(
+                select(totals.c.account_name.distinct()).where(
+                    totals.c.bucket_seconds == source, totals.c.taken_at < cutoff
+                )
+            ).scalars().all()
+            for account_name in accounts:
+                for table, group_columns, columns, key in (
+                    (gcp_sql_connector.portfolio_snapshots_table, ("account_name", "con_id"),
+                     SNAPSHOT_COLUMNS, SNAPSHOT_KEY),
+                    (totals, ("account_name",), PNL_COLUMNS, PNL_KEY),
+                ):
+                    removed, added = _roll_up(
+                        connection, table, group_columns, columns, key, account_name,
+                        source, target, cutoff, batch_size,
+                    )
+                    rolled_up += removed
+                    written += added
+    return DownsampleStats(rolled_up, written, time.perf_counter() - start)
+
+
+_last_downsample = weakref.WeakKeyDictionary()
+_downsample_lock = threading.Lock()
+
+
+def downsample_if_due(engine, now=None, interval=DOWNSAMPLE_INTERVAL):
+    """Runs `downsample` if it has not run on `engine` in this process for
+    `interval`. Returns its DownsampleStats, or None when it was not due."""
+    now = to_epoch(time.time() if now is None else now)
+    with _downsample_lock:
+        last = _last_downsample.get(engine)
+        if last is not None and now - last < interval.total_seconds():
+            return None
+        _last_downsample[engine] = now
+    return downsample(engine, now)
+
+
+def _as_arrays(rows, columns):
+    arrays = {}
+    for i, column in enumerate(columns):
+        values = [row[i] for row in rows]
+        if column == "taken_at":
+            arrays[column] = np.array(values, dtype="datetime64[s]")
+        elif column in ("bucket_seconds", "positions", "con_id"):
+            arrays[column] = np.array(values, dtype=np.int64)
+        elif column == "symbol":
+            arrays[column] = np.array(values, dtype=str)
+        else:
+            arrays[column] = np.array(values, dtype=np.float64)
+    return arrays
+
+
+def _coarsen(arrays, resolution):
+    """Keeps the last point of every `resolution`-second bucket."""
+    if not resolution or not len(arrays["taken_at"]):
+        return arrays
+    seconds = arrays["taken_at"].astype(np.int64)
+    buckets = seconds - seconds % resolution
+    # taken_at is sorted, so the last row of each bucket ends a run.
+    last = np.flatnonzero(np.append(buckets[1:] != buckets[:-1], True))
+    coarse = {column: values[last] for column, values in arrays.items()}
+    coarse["taken_at"] = buckets[last].astype("datetime64[s]")
+    return coarse
+
+
+def pnl_curve(engine, account_name, start=None, end=None, resolution=None):
+    """Returns the account's P&L curve as {column: array}, oldest first.
+
+    Recent points are minutely and older ones hourly or daily, depending on
+    how far `downsample` has rolled them up. Pass `resolution` (seconds) to
+    get evenly coarse points. `start`/`end` are inclusive.
+    """
+    c = gcp_sql_connector.portfolio_pnl_snapshots_table.c
+    columns = ("taken_at", "positions", "market_value", "unrealized_pnl", "realized_pnl")
+    query = select(*(c[name] for name in columns)).where(
+        c.account_name == account_name, c.bucket_seconds.in_((MINUTE, HOUR, DAY))
+    )
+    if start is not None:
+        query = query.where(c.taken_at >= to_epoch(start))
+    if end is not None:
+        query = query.where(c.taken_at <= to_epoch(end))
+    with engine.connect() as connection:
+        rows = connection.execute(query.order_by(c.taken_at)).all()
+    return _coarsen(_as_arrays(rows, columns), resolution)
+
+
+def position_history(engine, account_name, con_id, start=None, end=None, resolution=None):
+    """Like `pnl_curve`, for a single position of the account."""
+    c = gcp_sql_connector.portfolio_snapshots_table.c
+    columns = ("taken_at", "quantity", "market_price", "market_value",
+               "unrealized_pnl", "realized_pnl")
+    query = select(*(c[name] for name in columns)).where(
+        c.account_name == account_name, c.con_id == con_id
+    )
+    if start is not None:
+        query = query.where(c.taken_at >= to_epoch(start))
+    if end is not None:
+        query = query.where(c.taken_at <= to_epoch(end))
+    with engine.connect() as connection:
+        rows = connection.execute(query.order_by(c.taken_at)).all()
+    return _coarsen(_as_arrays(rows, columns), resolution)
+
+
+def daily_prices(engine, account_name, start=None, con_ids=None):
+    """Returns (days, con_ids, prices) for the account's positions.
+
+    `prices` is a (days x positions) array of the last market price of each
+    UTC day, NaN where a position has no snapshot that day. Every resolution
+    is read, so older days come from the daily buckets `downsample` keeps
+    and recent ones from the last hourly or minute snapshot of the day.
+    """
+    c = gcp_sql_connector.portfolio_snapshots_table.c
+    day = c.taken_at - c.taken_at % literal_column(str(DAY))
+    where = [c.account_name == account_name, c.bucket_seconds.in_((MINUTE, HOUR, DAY))]
+    if start is not None:
+        where.append(c.taken_at >= to_epoch(start))
+    if con_ids is not None:
+        where.append(c.con_id.in_(list(con_ids)))
+    last = (
+        select(c.con_id, func.max(c.taken_at).label("last_at"))
+        .where(*where)
+        .group_by(c.con_id, day)
+        .subquery()
+    )
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(c.con_id, c.taken_at, c.market_price).join(last, and_(
+                c.account_name == account_name,
+                c.bucket_seconds.in_((MINUTE, HOUR, DAY)),
+                c.con_id == last.c.con_id,
+                c.taken_at == last.c.last_at,
+            ))
+        ).all()
+    if not rows:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.int64), np.empty((0, 0))
+    ids, taken_at, price = (np.array(column) for column in zip(*rows))
+    days, day_index = np.unique(taken_at.astype(np.int64) // DAY, return_inverse=True)
+    con_id_values, con_index = np.unique(ids.astype(np.int64), return_inverse=True)
+    prices = np.full((len(days), len(con_id_values)), np.nan)
+    prices[day_index, con_index] = np.array(
+        [np.nan if p is None else p for p in price], dtype=np.float64
+    )
+    return days.astype("datetime64[D]"), con_id_values, prices
@@ -0,0 +1,173 @@
+import datetime
+import math
+from collections import namedtuple
+from dataclasses import dataclass
+
+import numpy as np
+
+# OpenInsider trade type codes mapped to the values stored in insider_trades.
+TRANSACTION_TYPES = {
+    "P - Purchase": "Buy",
+    "S - Sale": "Sell",
+    "S - Sale+OE": "Sell",
+}
+
+Reject = namedtuple("Reject", ["index", "trade", "reason"])
+
+
+@dataclass(slots=True, frozen=True)
+class InsiderTrade:
+    """One typed insider trade, ready for `upsert_insider_trades`."""
+
+    ticker: str
+    insider_name: str
+    relationship: str
+    transaction_date: datetime.date
+    transaction_type: str
+    transaction_value: int
+    shares: int
+    price_per_share: float
+    # Percent change in the insider's holdings (ΔOwn); inf for a new
+    # position, None when the page did not report it.
+    ownership_change: float = None
+
+    def as_row(self):
+        """Returns the insider_trades columns (plus ownership_change) as a dict."""
+        return {
+            "ticker": self.ticker,
+            "insider_name": self.insider_name,
+            "relationship": self.relationship,
+            "transaction_date": self.transaction_date,
+            "transaction_type": self.transaction_type,
+            "transaction_value": self.transaction_value,
+            "shares": self.shares,
+            "price_per_share": self.price_per_share,
+            "ownership_change": self.ownership_change,
+        }
+
+
+@dataclass(slots=True)
+class TradeBatch:
+    """Result of `normalize_trades`: typed trades plus per-row rejects."""
+
+    trades: list
+    rejects: list
+
+    def rows(self, transaction_type=None):
+        """Column dicts for bulk insert, optionally for one transaction type."""
+        return [
+            trade.as_row()
+            for trade in self.trades
+            if transaction_type is None or trade.transaction_type == transaction_type
+        ]
+
+
+def _column(trades, *keys):
+    return np.array(
+        [next((str(t[k]) for k in keys if t.get(k) is not None), "") for t in trades],
+        dtype=str,
+    )
+
+
+def _parse_numbers(raw, integer=False):
+    """Parses strings like "+$1,234.50" or "-12,000"; returns (values, valid)."""
+    cleaned = np.char.strip(raw)
+    for token in ("$", ",", "+", " "):
+        cleaned = np.char.replace(cleaned, token, "")
+    negative = np.char.startswith(cleaned, "-")
+    digits = np.where(negative, np.char.lstrip(cleaned, "-"), cleaned)
+    if integer:
+        valid = np.char.isdecimal(digits)
+    else:
+        valid = np.char.isdecimal(np.char.replace(digits, ".", "", count=1))
+    values = np.where(valid, digits, "0").astype(np.float64)
+    values = np.where(negative, -values, values)
+    return values, valid
+
+
+def _parse_dates(raw):
+    """Parses ISO dates (a trailing time is ignored); returns (dates, valid)."""
+    days = np.char.strip(raw).astype("<U10")
+    valid = (
+        (np.char.str_len(days) == 10)
+        & (np.char.count(days, "-") == 2)
+        & np.char.isdecimal(np.char.replace(days, "-", ""))
+    )
+    candidates = np.where(valid, days, "1970-01-01")
+    try:
+        dates = candidates.astype("datetime64[D]")
+    except ValueError:
+        # Well-formed but impossible dates (e.g. 2025-02-30): go row by row.
+        dates = np.empty(len(candidates), dtype="datetime64[D]")
+        for i, day in enumerate(candidates):
+            try:
+                dates[i] = np.datetime64(day, "D")
+            except ValueError:
+                dates[i] = np.datetime64("1970-01-01")
+                valid[i] = False
+    return dates.astype(object), valid
+
+
+def _parse_deltas(raw):
+    """Parses ΔOwn values ("+4%", "New", ">999%") into percent floats."""
+    cleaned = np.char.lower(np.char.strip(raw))
+    cleaned = np.char.replace(np.char.replace(cleaned, "%", ""), ">", "")
+    values, valid = _parse_numbers(cleaned)
+    deltas = values.astype(object)
+    deltas[~valid] = None
+    deltas[cleaned == "new"] = math.inf
+    return deltas
+
+
+def normalize_trades(raw_trades):
+    """Turns scraped trade dicts into typed `InsiderTrade` records.
+
+    Money, share counts, dates and ownership deltas are parsed column-wise
+    with NumPy in one pass. Rows with a missing ticker or an unparseable
+    date, share count or price are returned as `Reject`s with the reason;
+    an unparseable value is derived from shares * price.
+    """
+    raw_trades = list(raw_trades)
+    if not raw_trades:
+        return TradeBatch([], [])
+
+    tickers = np.char.upper(np.char.strip(_column(raw_trades, "ticker")))
+    dates, dates_ok = _parse_dates(_column(raw_trades, "transaction_date"))
+    shares, shares_ok = _parse_numbers(_column(raw_trades, "shares"), integer=True)
+    prices, prices_ok = _parse_numbers(_column(raw_trades, "price_per_share"))
+    values, values_ok = _parse_numbers(_column(raw_trades, "transaction_value", "value"))
+    values = np.where(values_ok, values, shares * prices)
+    deltas = _parse_deltas(_column(raw_trades, "delta_own"))
+
+    checks = (
+        (tickers != "", "missing ticker"),
+        (dates_ok, "invalid transaction_date"),
+        (shares_ok, "invalid shares"),
+        (prices_ok, "invalid price_per_share"),
+    )
+    ok = np.logical_and.reduce([mask for mask, _ in checks])
+
+    shares = np.rint(shares).astype(np.int64).tolist()
+    values = np.rint(values).astype(np.int64).tolist()
+    prices = prices.tolist()
+    tickers = tickers.tolist()
+
+    trades, rejects = [], []
+    for i, raw in enumerate(raw_trades):
+        if not ok[i]:
+            reason = "; ".join(message for mask, message in checks if not mask[i])
+            rejects.append(Reject(i, raw, reason))
+            continue
+        transaction_type = str(raw.get("transaction_type", "")).strip()
+        trades.append(InsiderTrade(
+            ticker=tickers[i],
+            insider_name=str(raw.get("insider_name", "")).strip(),
+            relationship=str(raw.get("relationship", "")).strip(),
+            transaction_date=dates[i],
+            transaction_type=TRANSACTION_TYPES.get(transaction_type, transaction_type),
+            transaction_value=values[i],
+            shares=shares[i],
+            price_per_share=prices[i],
+            ownership_change=deltas[i],
+        ))
+    return TradeBatch(trades, rejects)
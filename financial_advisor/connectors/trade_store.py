@@ -0,0 +1,220 @@
+import datetime
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+# Column name -> dtype of the on-disk arrays. Strings are fixed-width
+# unicode so every column can be memory-mapped.
+COLUMNS = {
+    "ticker": str,
+    "insider_name": str,
+    "relationship": str,
+    "transaction_date": "datetime64[D]",
+    "transaction_type": str,
+    "transaction_value": np.int64,
+    "shares": np.int64,
+    "price_per_share": np.float64,
+    "ownership_change": np.float64,
+}
+
+# Columns identifying a trade, mirroring idx_unique_trade in insider_trades.
+KEY_COLUMNS = ("ticker", "insider_name", "transaction_date", "transaction_type", "shares")
+
+STORE_DIR_ENV = "INSIDER_TRADES_STORE_DIR"
+# Each append adds a segment (and its memory maps); the trade scanner
+# compacts the store once it holds more than this many.
+MAX_SEGMENTS = int(os.environ.get("INSIDER_TRADES_STORE_MAX_SEGMENTS", 64))
+
+# Present in segments written by `compact`, whose rows are sorted by ticker
+# and then transaction date.
+SORTED_MARKER = "_SORTED"
+
+
+def _month(day):
+    return f"{day:%Y-%m}"
+
+
+def _empty_columns():
+    return {name: np.array([], dtype=dtype) for name, dtype in COLUMNS.items()}
+
+
+def default_store():
+    """Returns the store configured by INSIDER_TRADES_STORE_DIR, or None."""
+    return ColumnarTradeStore() if os.environ.get(STORE_DIR_ENV) else None
+
+
+class ColumnarTradeStore:
+    """Local columnar copy of the insider_trades table.
+
+    Trades are partitioned by transaction month (`month=YYYY-MM/`). Each
+    append writes an immutable segment directory holding one `.npy` file per
+    column; reads memory-map only the segments of the months in range and
+    filter them with vectorized masks, so no network round-trip is needed.
+    `compact` merges a partition's segments, drops duplicate trades and
+    sorts by ticker so later ticker lookups are binary searches.
+    """
+
+    def __init__(self, root=None):
+        root = root or os.environ.get(STORE_DIR_ENV)
+        if not root:
+            raise ValueError("ColumnarTradeStore needs a root directory")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Segments are immutable, so their memory maps can be reused.
+        self._maps = {}
+
+    def _load(self, segment, column):
+        key = (segment, column)
+        values = self._maps.get(key)
+        if values is None:
+            values = self._maps[key] = np.load(segment / f"{column}.npy", mmap_mode="r")
+        return values
+
+    def _partitions(self, start=None, end=None):
+        for path in sorted(self.root.glob("month=*")):
+            month = path.name.split("=", 1)[1]
+            if start and month < _month(start):
+                continue
+            if end and month > _month(end):
+                continue
+            yield path
+
+    @staticmethod
+    def _segments(partition):
+        return sorted(p for p in partition.iterdir() if p.name.startswith("seg-"))
+
+    def segment_count(self):
+        return sum(len(self._segments(partition)) for partition in self._partitions())
+
+    def _write_segment(self, partition, columns, is_sorted=False):
+        partition.mkdir(parents=True, exist_ok=True)
+        name = f"seg-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        staging = partition / f".{name}"
+        staging.mkdir()
+        for column, values in columns.items():
+            np.save(staging / f"{column}.npy", values)
+        if is_sorted:
+            (staging / SORTED_MARKER).touch()
+        # Readers only look at seg-* directories, so the rename publishes the
+        # segment atomically.
+        staging.rename(partition / name)
+        return partition / name
+
+    def append(self, trades):
+        """Appends trades (row dicts or objects with the same attributes).
+
+        Returns the number of trades written.
+        """
+        by_month = {}
+        for trade in trades:
+            get = trade.get if isinstance(trade, dict) else lambda k, t=trade: getattr(t, k, None)
+            row = {column: get(column) for column in COLUMNS}
+            day = row["transaction_date"]
+            if not isinstance(day, datetime.date):
+                day = row["transaction_date"] = datetime.date.fromisoformat(str(day))
+            by_month.setdefault(_month(day), []).append(row)
+
+        for month, rows in by_month.items():
+            columns = {}
+            for column, dtype in COLUMNS.items():
+                values = [row[column] for row in rows]
+                if column == "ownership_change":
+                    values = [np.nan if v is None else v for v in values]
+                columns[column] = np.array(values, dtype=dtype)
+            self._write_segment(self.root / f"month={month}", columns)
+        return sum(len(rows) for rows in by_month.values())
+
+    def read(self, ticker=None, start=None, end=None, columns=None):
+        """Returns {column: array} for trades matching the filters.
+
+        `ticker` may be a symbol or an iterable of symbols; `start`/`end` are
+        inclusive transaction dates.
+        """
+        wanted = list(columns or COLUMNS)
+        tickers = None
+        if ticker is not None:
+            tickers = [ticker] if isinstance(ticker, str) else list(ticker)
+            tickers = np.array([t.upper() for t in tickers])
+        start64 = np.datetime64(start, "D") if start else None
+        end64 = np.datetime64(end, "D") if end else None
+
+        parts = {column: [] for column in wanted}
+        for partition in self._partitions(start, end):
+            for segment in self._segments(partition):
+                rows = self._select(segment, tickers, start64, end64)
+                if rows is None:
+                    continue
+                for column in wanted:
+                    parts[column].append(self._load(segment, column)[rows])
+
+        empty = _empty_columns()
+        return {
+            column: np.concatenate(chunks) if chunks else empty[column]
+            for column, chunks in parts.items()
+        }
+
+    def _select(self, segment, tickers, start64, end64):
+        """Returns the segment rows (slice or index array) that match, or None."""
+        rows = slice(None)
+        if tickers is not None:
+            if not len(tickers):
+                return None
+            ticker_column = self._load(segment, "ticker")
+            if (segment / SORTED_MARKER).exists():
+                # Compacted segments are sorted by ticker: binary search.
+                rows = np.concatenate([
+                    np.arange(
+                        np.searchsorted(ticker_column, t, side="left"),
+                        np.searchsorted(ticker_column, t, side="right"),
+                    )
+                    for t in tickers
+                ])
+            else:
+                rows = np.flatnonzero(np.isin(ticker_column, tickers))
+            if not len(rows):
+                return None
+        if start64 is not None or end64 is not None:
+            dates = self._load(segment, "transaction_date")[rows]
+            in_range = np.ones(len(dates), dtype=bool)
+            if start64 is not None:
+                in_range &= dates >= start64
+            if end64 is not None:
+                in_range &= dates <= end64
+            if not in_range.any():
+                return None
+            rows = np.arange(len(in_range))[in_range] if isinstance(rows, slice) else rows[in_range]
+        return rows
+
+    def compact(self):
+        """Merges each partition into one de-duplicated, sorted segment.
+
+        Later segments win for duplicate trades. Returns the number of rows
+        removed as duplicates.
+        """
+        removed = 0
+        for partition in self._partitions():
+            segments = self._segments(partition)
+            if len(segments) == 1 and (segments[0] / SORTED_MARKER).exists():
+                continue
+            merged = {
+                column: np.concatenate([self._load(s, column) for s in segments])
+                for column in COLUMNS
+            }
+            # Keep the last occurrence of every key.
+            keys = np.rec.fromarrays([merged[c][::-1] for c in KEY_COLUMNS])
+            _, first = np.unique(keys, return_index=True)
+            keep = len(keys) - 1 - first
+            removed += len(keys) - len(keep)
+            keep = keep[np.lexsort((merged["transaction_date"][keep], merged["ticker"][keep]))]
+            self._write_segment(
+                partition, {c: v[keep] for c, v in merged.items()}, is_sorted=True
+            )
+            for segment in segments:
+                for column in COLUMNS:
+                    self._maps.pop((segment, column), None)
+                shutil.rmtree(segment)
+        return removed
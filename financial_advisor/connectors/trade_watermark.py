@@ -0,0 +1,90 @@
+import datetime
+import hashlib
+import json
+from collections import namedtuple
+
+# Form 4 filings can land a few days after the trade, so rows dated within
+# this window below the high-water mark are still checked by content hash
+# instead of being dropped as stale.
+LOOKBACK_DAYS = 14
+
+IngestionStats = namedtuple(
+    "IngestionStats", ["fetched", "new", "skipped_seen", "skipped_stale"]
+)
+
+
+def trade_hash(trade):
+    """Returns a stable content hash of a scraped trade dict."""
+    payload = json.dumps(trade, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("UTF-8")).hexdigest()
+
+
+def _as_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+class TradeWatermark:
+    """High-water mark plus the content hashes of recently ingested trades.
+
+    `filter_new` drops rows that were already ingested before they reach the
+    database; `advance` records the rows that were written.
+    """
+
+    def __init__(self, high_water_date=None, hashes=None, lookback_days=LOOKBACK_DAYS):
+        self.high_water_date = _as_date(high_water_date) if high_water_date else None
+        # hash -> ISO transaction date, so the set can be pruned by age.
+        self.hashes = dict(hashes or {})
+        self.lookback = datetime.timedelta(days=lookback_days)
+
+    @classmethod
+    def from_stored(cls, high_water_date, row_hashes, **kwargs):
+        """Rebuilds a watermark from `gcp_sql_connector.load_watermark` output."""
+        return cls(high_water_date, json.loads(row_hashes) if row_hashes else {}, **kwargs)
+
+    def to_stored(self):
+        """Returns (high_water_date, row_hashes) for `save_watermark`."""
+        return self.high_water_date, json.dumps(self.hashes, sort_keys=True)
+
+    @property
+    def cutoff(self):
+        if self.high_water_date is None:
+            return None
+        return self.high_water_date - self.lookback
+
+    def filter_new(self, trades):
+        """Splits `trades` into unseen rows and an `IngestionStats` summary."""
+        cutoff = self.cutoff
+        new, seen, stale = [], 0, 0
+        batch_hashes = set()
+        for trade in trades:
+            trade_date = _as_date(trade.get("transaction_date"))
+            if cutoff and trade_date and trade_date < cutoff:
+                stale += 1
+                continue
+            digest = trade_hash(trade)
+            if digest in self.hashes or digest in batch_hashes:
+                seen += 1
+                continue
+            batch_hashes.add(digest)
+            new.append(trade)
+        return new, IngestionStats(len(trades), len(new), seen, stale)
+
+    def advance(self, trades):
+        """Records ingested `trades` and prunes hashes that fell out of the window."""
+        for trade in trades:
+            trade_date = _as_date(trade.get("transaction_date"))
+            self.hashes[trade_hash(trade)] = trade_date.isoformat() if trade_date else None
+            if trade_date and (self.high_water_date is None or trade_date > self.high_water_date):
+                self.high_water_date = trade_date
+        cutoff = self.cutoff
+        if cutoff:
+            self.hashes = {
+                digest: day
+                for digest, day in self.hashes.items()
+                if day is None or datetime.date.fromisoformat(day) >= cutoff
+            }
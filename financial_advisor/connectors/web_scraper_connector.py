@@ -1,32 +1,207 @@
 
+import html
+import os
+import re
+import threading
+
 import requests
 from bs4 import BeautifulSoup
 
-def get_insider_trades():
-    """Scrapes the OpenInsider website for the latest insider trades."""
-    url = "http://openinsider.com/latest-insider-buys"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, "html.parser")
+LATEST_INSIDER_BUYS_URL = "http://openinsider.com/latest-insider-buys"
+
+# "fast" tokenizes the tinytable directly and falls back to BeautifulSoup
+# when the layout does not look as expected; "bs4" always builds the DOM.
+PARSER_MODE = os.environ.get("SCRAPER_PARSER_MODE", "fast")
+
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("SCRAPER_TIMEOUT_SECONDS", 30))
+
+_session = None
+_session_lock = threading.Lock()
+
+# Header labels of the columns read below, by position.
+EXPECTED_HEADERS = {
+    2: "trade date",
+    3: "ticker",
+    5: "insider name",
+    6: "title",
+    7: "trade type",
+    8: "price",
+    9: "qty",
+    11: "δown",  # "ΔOwn", lower-cased
+    12: "value",
+}
+
+# Header labels of the latest-cluster-buys screen. Each row is one ticker's
+# buys by `ins` insiders, so it has no insider name or title.
+CLUSTER_BUY_HEADERS = (
+    "trade date",
+    "ticker",
+    "industry",
+    "ins",
+    "trade type",
+    "price",
+    "qty",
+    "δown",
+    "value",
+)
+
+_TABLE_RE = re.compile(
+    r"<table\b[^>]*\bclass\s*=\s*[\"']?tinytable\b[^>]*>(.*?)</table\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_ROW_RE = re.compile(r"<tr\b[^>]*>(.*?)</tr\s*>", re.IGNORECASE | re.DOTALL)
+_CELL_RE = re.compile(r"<td\b[^>]*>(.*?)</td\s*>", re.IGNORECASE | re.DOTALL)
+_HEADER_RE = re.compile(r"<th\b[^>]*>(.*?)</th\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class LayoutChanged(Exception):
+    """The page does not match the tinytable layout the fast parser expects."""
+
+
+def _cell_text(fragment):
+    return html.unescape(_TAG_RE.sub("", fragment)).strip()
+
+
+def _header_text(text):
+    return _SPACE_RE.sub(" ", text).strip().lower()
+
+
+_EXPECTED_COLUMNS = {label: i for i, label in EXPECTED_HEADERS.items()}
+
+
+def _trade_from_cells(cells, columns=_EXPECTED_COLUMNS):
+    """Trade dict from one row's cell texts; `columns` maps header label to index."""
+    return {
+        "ticker": cells[columns["ticker"]],
+        "insider_name": cells[columns["insider name"]],
+        "relationship": cells[columns["title"]],
+        "transaction_date": cells[columns["trade date"]],
+        "transaction_type": cells[columns["trade type"]],
+        "value": cells[columns["value"]].replace(",", ""),
+        "shares": cells[columns["qty"]].replace(",", ""),
+        "price_per_share": cells[columns["price"]],
+        "delta_own": cells[columns["δown"]],
+    }
+
+
+def _cluster_trade_from_cells(cells, columns):
+    """Trade dict from one latest-cluster-buys row."""
+    return {
+        "ticker": cells[columns["ticker"]],
+        "insider_name": f"{cells[columns['ins']]} insiders",
+        "relationship": "Cluster",
+        "transaction_date": cells[columns["trade date"]],
+        "transaction_type": cells[columns["trade type"]],
+        "value": cells[columns["value"]].replace(",", ""),
+        "shares": cells[columns["qty"]].replace(",", ""),
+        "price_per_share": cells[columns["price"]],
+        "delta_own": cells[columns["δown"]],
+    }
+
+
+# (header labels, row -> trade dict) of each tinytable layout, in the order
+# they are tried.
+_LAYOUTS = (
+    (tuple(EXPECTED_HEADERS.values()), _trade_from_cells),
+    (CLUSTER_BUY_HEADERS, _cluster_trade_from_cells),
+)
+
+def parse_insider_trades_fast(content):
+    """Extracts trades from the tinytable without building a DOM.
+
+    Raises LayoutChanged when the table or its header is not where it is
+    expected, so callers can fall back to `parse_insider_trades_bs4`.
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("UTF-8")
+        except UnicodeDecodeError as e:
+            raise LayoutChanged("page is not UTF-8") from e
+    table = _TABLE_RE.search(content)
+    if not table:
+        raise LayoutChanged("no tinytable found")
+    body = table.group(1)
+    if "<table" in body.lower():
+        raise LayoutChanged("nested table")
+    rows = _ROW_RE.findall(body)
+    if not rows:
+        raise LayoutChanged("table has no rows")
+    headers = [_header_text(_cell_text(header)) for header in _HEADER_RE.findall(rows[0])]
+    if len(headers) != 13 or any(
+        headers[i] != label for i, label in EXPECTED_HEADERS.items()
+    ):
+        raise LayoutChanged(f"unexpected header {headers}")
 
     trades = []
+    for row in rows[1:]:
+        cells = _CELL_RE.findall(row)
+        if len(cells) == 13:
+            trades.append(_trade_from_cells([_cell_text(cell) for cell in cells]))
+    return trades
+
+def parse_insider_trades_bs4(content):
+    """Parses the OpenInsider `tinytable` results table with BeautifulSoup.
+
+    Columns are found by their header text, so reordered or added columns
+    (e.g. the per-ticker screener's performance columns) still parse, and
+    the latest-cluster-buys layout (CLUSTER_BUY_HEADERS) is recognized.
+    Raises LayoutChanged when a header in EXPECTED_HEADERS is missing; a
+    page without the table yields no trades.
+    """
+    soup = BeautifulSoup(content, "html.parser")
+
     table = soup.find("table", {"class": "tinytable"})
-    if table:
-        for row in table.find_all("tr")[1:]:
-            cells = row.find_all("td")
-            if len(cells) == 13:
-                trade = {
-                    "ticker": cells[3].text.strip(),
-                    "insider_name": cells[5].text.strip(),
-                    "relationship": cells[6].text.strip(),
-                    "transaction_date": cells[2].text.strip(),
-                    "transaction_type": cells[7].text.strip(),
-                    "value": cells[9].text.strip().replace(",", ""),
-                    "shares": cells[8].text.strip().replace(",", ""),
-                    "price_per_share": cells[10].text.strip(),
-                }
-                trades.append(trade)
+    if not table:
+        return []
+    rows = table.find_all("tr")
+    if not rows:
+        return []
+    headers = [_header_text(header.get_text()) for header in rows[0].find_all("th")]
+    for labels, make_trade in _LAYOUTS:
+        if all(label in headers for label in labels):
+            break
+    else:
+        missing = [label for label in EXPECTED_HEADERS.values() if label not in headers]
+        raise LayoutChanged(f"missing columns {missing} in header {headers}")
+    columns = {label: headers.index(label) for label in labels}
+
+    trades = []
+    for row in rows[1:]:
+        cells = row.find_all("td")
+        if len(cells) == len(headers):
+            trades.append(make_trade([cell.text.strip() for cell in cells], columns))
     return trades
 
+def parse_insider_trades(content, mode=None):
+    """Parses the OpenInsider `tinytable` results table into trade dicts.
+
+    Raises LayoutChanged when the table lacks a column it needs.
+    """
+    if (mode or PARSER_MODE) == "fast":
+        try:
+            return parse_insider_trades_fast(content)
+        except LayoutChanged:
+            pass
+    return parse_insider_trades_bs4(content)
+
+def _http_session():
+    """Process-wide session, so repeated scans reuse keep-alive connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=4))
+            _session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=4))
+        return _session
+
+def get_insider_trades(url=LATEST_INSIDER_BUYS_URL):
+    """Scrapes the OpenInsider website for the latest insider trades."""
+    response = _http_session().get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return parse_insider_trades(response.content)
+
 if __name__ == "__main__":
     # For testing purposes
     insider_trades = get_insider_trades()
@@ -0,0 +1,378 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Insider buying signals scored from the stored insider trades
+
+Every buy gets a conviction weight from the insider's role (parsed from
+`relationship`), its dollar value and its size relative to the insider's
+prior holdings (ΔOwn). Per ticker and trailing window of `window_days`,
+the weights and dollars are summed and the distinct buying insiders
+counted; `cluster_min_insiders` or more make a cluster buy, and each
+additional insider raises the score. Windows are evaluated on sorted
+(ticker, day) keys with cumulative sums and binary searches, so rescoring
+years of history takes a few NumPy passes. `InsiderSignalEngine` keeps
+only the trailing window in memory and rescores the tickers of each new
+batch of trades.
+"""
+
+import argparse
+import datetime
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from .connectors.trade_store import KEY_COLUMNS
+
+DEFAULT_WINDOW_DAYS = int(os.environ.get("INSIDER_SIGNAL_WINDOW_DAYS", 30))
+CLUSTER_MIN_INSIDERS = int(os.environ.get("INSIDER_CLUSTER_MIN_INSIDERS", 2))
+# Score multiplier added per distinct insider beyond the first.
+CLUSTER_BONUS = 0.5
+# Shares bought / prior holdings is capped here; new positions (ΔOwn
+# "New") count as the cap.
+MAX_HOLDINGS_RATIO = 10.0
+
+# Weight of a role in OpenInsider titles ("CEO", "Pres, CEO", "Dir, 10%").
+# A title with several roles gets the highest weight; unknown roles (VP,
+# GC, ...) get OTHER_ROLE_WEIGHT.
+ROLE_WEIGHTS = {
+    "ceo": 3.0,
+    "chief executive officer": 3.0,
+    "cfo": 2.5,
+    "chief financial officer": 2.5,
+    "cob": 2.5,
+    "chairman": 2.5,
+    "pres": 2.0,
+    "president": 2.0,
+    "coo": 2.0,
+    "dir": 1.5,
+    "director": 1.5,
+    "10%": 0.75,
+}
+OTHER_ROLE_WEIGHT = 1.0
+
+FIELDS = {
+    "ticker": str,
+    "insider_name": str,
+    "relationship": str,
+    "transaction_date": "datetime64[D]",
+    "transaction_type": str,
+    "transaction_value": np.float64,
+    "shares": np.int64,
+    "ownership_change": np.float64,
+}
+
+SIGNAL_COLUMNS = (
+    "ticker", "date", "trades", "insiders", "dollars", "conviction", "cluster", "score"
+)
+InsiderSignal = namedtuple("InsiderSignal", SIGNAL_COLUMNS)
+
+_ROLE_SEPARATOR = re.compile(r"\s*(?:[,;/&]|\band\b)\s*", re.I)
+
+
+def role_weight(relationship):
+    """Weight of the most senior role in an insider's title."""
+    weights = [
+        ROLE_WEIGHTS.get(role.strip(" .").lower())
+        for role in _ROLE_SEPARATOR.split(relationship or "")
+    ]
+    return max((w for w in weights if w is not None), default=OTHER_ROLE_WEIGHT)
+
+
+def holdings_factors(ownership_change):
+    """1 + log1p(shares bought / prior holdings) per trade.
+
+    ΔOwn is that ratio in percent. Unknown values (NaN) give 1; new
+    positions (inf) and huge buys are capped at MAX_HOLDINGS_RATIO.
+    """
+    ratio = np.asarray(ownership_change, dtype=np.float64) / 100
+    ratio = np.nan_to_num(ratio, nan=0.0, posinf=MAX_HOLDINGS_RATIO)
+    return 1 + np.log1p(np.clip(ratio, 0, MAX_HOLDINGS_RATIO))
+
+
+def trade_weights(buys):
+    """Conviction weight per buy: role weight * holdings factor * log10(1 + dollars)."""
+    relationships, inverse = np.unique(buys["relationship"], return_inverse=True)
+    roles = np.array([role_weight(r) for r in relationships], dtype=np.float64)[inverse]
+    dollars = np.log10(1 + np.abs(buys["transaction_value"]))
+    return roles * holdings_factors(buys["ownership_change"]) * dollars
+
+
+def _array(values, dtype):
+    if isinstance(values, np.ndarray):
+        return values.astype(dtype, copy=False)
+    if dtype is np.float64:
+        values = [np.nan if v is None else v for v in values]
+    elif dtype is str:
+        values = ["" if v is None else v for v in values]
+    return np.asarray(values, dtype=dtype)
+
+
+def _row_mapping(trade):
+    if isinstance(trade, dict):
+        return trade
+    if hasattr(trade, "_mapping"):  # SQLAlchemy Row
+        return trade._mapping
+    if hasattr(trade, "as_row"):  # trade_records.InsiderTrade
+        return trade.as_row()
+    return trade._asdict()
+
+
+def buys_from(trades):
+    """The buys in `trades` as {field: array}.
+
+    `trades` is either {column: array} (e.g. `ColumnarTradeStore.read()`)
+    or an iterable of rows (dicts, InsiderTrade records or SQL rows). A
+    missing ownership_change column (the SQL table has none) is NaN. Row
+    tickers are upper-cased; stored columns already are.
+    """
+    if isinstance(trades, dict):
+        count = len(trades["ticker"])
+        raw = {
+            name: trades[name] if name in trades else np.full(count, np.nan)
+            for name in FIELDS
+        }
+    else:
+        rows = [_row_mapping(trade) for trade in trades]
+        raw = {name: [row.get(name) for row in rows] for name in FIELDS}
+        raw["ticker"] = [(ticker or "").upper() for ticker in raw["ticker"]]
+    columns = {name: _array(raw[name], dtype) for name, dtype in FIELDS.items()}
+    buy = columns["transaction_type"] == "Buy"
+    return columns if buy.all() else {name: values[buy] for name, values in columns.items()}
+
+
+class _Windows:
+    """Trailing-window sums over buys, evaluated at any (ticker, day).
+
+    Tickers become integer codes and days are packed with them into one
+    sorted int64 key, `code * span + day`, with `span` large enough that a
+    window never reaches into the previous ticker's keys. Sums over a
+    window are differences of cumulative sums at two binary-searched
+    positions. Distinct insiders: each insider's buys of a ticker are
+    merged into runs that keep the insider in the window without a gap, so
+    the insiders in a window ending on key k are the runs started at or
+    before k minus the runs that ended at or before k.
+    """
+
+    def __init__(self, buys, window_days, days=()):
+        self.window_days = window_days
+        self.names, self.codes = np.unique(buys["ticker"], return_inverse=True)
+        day_numbers = np.concatenate([
+            buys["transaction_date"].astype(np.int64),
+            np.asarray(days, dtype="datetime64[D]").astype(np.int64),
+        ])
+        self.origin = int(day_numbers.min()) if len(day_numbers) else 0
+        last = int(day_numbers.max()) if len(day_numbers) else 0
+        self.span = last - self.origin + window_days + 1
+
+        keys = self.key(self.codes, buys["transaction_date"])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        weights = trade_weights(buys)[order]
+        dollars = buys["transaction_value"][order]
+        self.conviction = np.concatenate(([0.0], np.cumsum(weights)))
+        self.dollars = np.concatenate(([0.0], np.cumsum(dollars)))
+
+        _, insiders = np.unique(buys["insider_name"], return_inverse=True)
+        by_insider = np.lexsort((keys, insiders))
+        insider_keys, insiders = keys[by_insider], insiders[by_insider]
+        new_run = np.ones(len(insider_keys), dtype=bool)
+        new_run[1:] = (
+            (insiders[1:] != insiders[:-1])
+            | (insider_keys[1:] // self.span != insider_keys[:-1] // self.span)
+            | (insider_keys[1:] - insider_keys[:-1] >= window_days)
+        )
+        run_last = np.append(np.flatnonzero(new_run)[1:], len(insider_keys)) - 1
+        self.run_starts = np.sort(insider_keys[new_run])
+        self.run_ends = np.sort(insider_keys[run_last[run_last >= 0]] + window_days)
+
+    def key(self, codes, days):
+        days = np.asarray(days, dtype="datetime64[D]").astype(np.int64)
+        return codes.astype(np.int64) * self.span + (days - self.origin)
+
+    def code(self, tickers):
+        """Codes of `tickers` (each must be one of the names)."""
+        return np.searchsorted(self.names, np.asarray(tickers, dtype=str))
+
+    def evaluate(self, keys, cluster_min_insiders):
+        """Signals for windows ending on `keys`, as {column: array}."""
+        hi = np.searchsorted(self.keys, keys, side="right")
+        lo = np.searchsorted(self.keys, keys - (self.window_days - 1), side="left")
+        insiders = (
+            np.searchsorted(self.run_starts, keys, side="right")
+            - np.searchsorted(self.run_ends, keys, side="right")
+        )
+        conviction = self.conviction[hi] - self.conviction[lo]
+        return {
+            "ticker": self.names[keys // self.span],
+            "date": (keys % self.span + self.origin).astype("datetime64[D]"),
+            "trades": hi - lo,
+            "insiders": insiders,
+            "dollars": self.dollars[hi] - self.dollars[lo],
+            "conviction": conviction,
+            "cluster": insiders >= cluster_min_insiders,
+            "score": conviction * (1 + CLUSTER_BONUS * np.maximum(insiders - 1, 0)),
+        }
+
+
+def rolling_signals(
+    trades, window_days=DEFAULT_WINDOW_DAYS, cluster_min_insiders=CLUSTER_MIN_INSIDERS
+):
+    """Signals of every ticker on every day it had a buy, over the window
+    ending that day. Returns {column: array} sorted by ticker and date."""
+    windows = _Windows(buys_from(trades), window_days)
+    return windows.evaluate(np.unique(windows.keys), cluster_min_insiders)
+
+
+def score_tickers(
+    trades,
+    as_of=None,
+    tickers=None,
+    window_days=DEFAULT_WINDOW_DAYS,
+    cluster_min_insiders=CLUSTER_MIN_INSIDERS,
+):
+    """InsiderSignals over the window ending `as_of` (default: the latest
+    buy), best score first. Tickers without buys in the window are left
+    out; `tickers` limits the result to those symbols."""
+    buys = buys_from(trades)
+    if not len(buys["ticker"]):
+        return []
+    as_of = np.datetime64(buys["transaction_date"].max() if as_of is None else as_of, "D")
+    dates = buys["transaction_date"]
+    in_window = (dates <= as_of) & (dates > as_of - np.timedelta64(window_days, "D"))
+    if not in_window.all():
+        buys = {name: values[in_window] for name, values in buys.items()}
+    windows = _Windows(buys, window_days, days=[as_of])
+    names = windows.names
+    if tickers is not None:
+        names = np.intersect1d(names, np.char.upper(np.asarray(list(tickers), dtype=str)))
+    columns = windows.evaluate(
+        windows.key(windows.code(names), np.full(len(names), as_of)), cluster_min_insiders
+    )
+    active = np.flatnonzero(columns["trades"] > 0)
+    active = active[np.argsort(-columns["score"][active], kind="stable")]
+    return [
+        InsiderSignal(*(columns[name][i].item() for name in SIGNAL_COLUMNS)) for i in active
+    ]
+
+
+class InsiderSignalEngine:
+    """Scores tickers incrementally as new trades arrive.
+
+    Only the buys inside the trailing window of the newest trade date are
+    kept, so an update costs a rescore of one window regardless of how
+    much history came before. Trades already seen (same key as the
+    insider_trades unique index) are ignored, and buys older than the
+    window are counted in `stale` and dropped.
+    """
+
+    def __init__(
+        self, window_days=DEFAULT_WINDOW_DAYS, cluster_min_insiders=CLUSTER_MIN_INSIDERS
+    ):
+        self.window_days = window_days
+        self.cluster_min_insiders = cluster_min_insiders
+        self.newest = None
+        self.stale = 0
+        self._buys = buys_from([])
+        self._seen = set()
+
+    def __len__(self):
+        return len(self._buys["ticker"])
+
+    def _keys(self, buys):
+        return zip(*(buys[column].tolist() for column in KEY_COLUMNS))
+
+    def update(self, trades):
+        """Adds trades; returns the current signals of the tickers they touched."""
+        buys = buys_from(trades)
+        fresh = np.zeros(len(buys["ticker"]), dtype=bool)
+        for i, key in enumerate(self._keys(buys)):
+            if key not in self._seen:
+                self._seen.add(key)
+                fresh[i] = True
+        buys = {name: values[fresh] for name, values in buys.items()}
+        if not fresh.any():
+            return []
+
+        newest = buys["transaction_date"].max()
+        if self.newest is None or newest > self.newest:
+            self.newest = newest
+        horizon = self.newest - np.timedelta64(self.window_days - 1, "D")
+        recent = buys["transaction_date"] >= horizon
+        self.stale += int((~recent).sum())
+
+        kept = self._buys["transaction_date"] >= horizon
+        if not kept.all():
+            self._seen.difference_update(
+                self._keys({name: values[~kept] for name, values in self._buys.items()})
+            )
+        self._seen.difference_update(
+            self._keys({name: values[~recent] for name, values in buys.items()})
+        )
+        self._buys = {
+            name: np.concatenate([self._buys[name][kept], buys[name][recent]])
+            for name in FIELDS
+        }
+        return self.signals(tickers=np.unique(buys["ticker"][recent]))
+
+    def signals(self, as_of=None, tickers=None):
+        """InsiderSignals over the window ending `as_of` (default: the newest
+        trade date; earlier dates only see the buys still kept)."""
+        return score_tickers(
+            self._buys, as_of, tickers, self.window_days, self.cluster_min_insiders
+        )
+
+
+def load_buys(engine=None, start=None, store=None):
+    """Buys since `start` from the columnar trade store when one is given or
+    configured (INSIDER_TRADES_STORE_DIR), else from the insider_trades
+    table (`engine` defaults to the shared SQL engine)."""
+    from .connectors import gcp_sql_connector, trade_store
+
+    store = store if store is not None else trade_store.default_store()
+    if store is not None:
+        return buys_from(store.read(start=start))
+    table = gcp_sql_connector.insider_trades_table
+    query = table.select().where(table.c.transaction_type == "Buy")
+    if start is not None:
+        query = query.where(table.c.transaction_date >= start)
+    engine = engine or gcp_sql_connector.get_gcp_sql_engine()
+    with engine.connect() as connection:
+        return buys_from(connection.execute(query).all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank tickers by recent insider buying.")
+    parser.add_argument("--as-of", type=datetime.date.fromisoformat, default=None)
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW_DAYS, help="days")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--clusters", action="store_true", help="only cluster buys")
+    args = parser.parse_args()
+
+    as_of = args.as_of or datetime.date.today()
+    buys = load_buys(start=as_of - datetime.timedelta(days=args.window - 1))
+    signals = score_tickers(buys, as_of, window_days=args.window)
+    if args.clusters:
+        signals = [s for s in signals if s.cluster]
+    print(f"{'ticker':<8} {'insiders':>8} {'trades':>6} {'dollars':>14} {'score':>8}")
+    for signal in signals[: args.top]:
+        print(
+            f"{signal.ticker:<8} {signal.insiders:>8} {signal.trades:>6} "
+            f"{signal.dollars:>14,.0f} {signal.score:>8.1f}{'  cluster' if signal.cluster else ''}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pipeline mode: run the sub-agents as a fixed fan-out graph without coordinator turns"""
+
+import argparse
+import asyncio
+import re
+
+from google.adk.agents import ParallelAgent, SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from . import compaction, prompt, prompt_cache, schemas, telemetry
+from .connectors import gcp_sql_connector
+from .sub_agents.data_analyst import cache as data_analyst_cache
+from .sub_agents.data_analyst import data_analyst_agent
+from .sub_agents.execution_analyst import execution_analyst_agent
+from .sub_agents.risk_analyst import risk_analyst_agent, structured_risk_analyst_agent
+from .sub_agents.trading_analyst import (
+    structured_trading_analyst_agent,
+    trading_analyst_agent,
+)
+
+RISK_ATTITUDES = ("conservative", "moderate", "aggressive")
+DEFAULT_INVESTMENT_PERIOD = "long-term"
+DEFAULT_EXECUTION_PREFERENCES = (
+    "None stated; prefer limit orders and cost optimization over latency."
+)
+
+STAGES = (
+    ("trading", trading_analyst_agent, prompt.PIPELINE_TRADING_INPUTS),
+    ("execution", execution_analyst_agent, prompt.PIPELINE_EXECUTION_INPUTS),
+    ("risk", risk_analyst_agent, prompt.PIPELINE_RISK_INPUTS),
+)
+# Stage agents replaced in structured-output mode (same output_keys).
+STRUCTURED_STAGES = {
+    "trading": structured_trading_analyst_agent,
+    "risk": structured_risk_analyst_agent,
+}
+
+# Stages are clones of these agents whose instructions only add a suffix,
+# so they share the cached prefixes.
+if prompt_cache.enabled():
+    prompt_cache.default_cache.setup(
+        data_analyst_agent,
+        *(agent for _, agent, _ in STAGES),
+        *STRUCTURED_STAGES.values(),
+    )
+
+
+def _slug(value):
+    return re.sub(r"\W", "_", value)
+
+
+def state_key(output_key, ticker, risk_attitude=None):
+    """Per-branch variant of a sub-agent's output_key.
+
+    e.g. ("execution_plan_output", "AAPL", "moderate") ->
+    "execution_plan_output_AAPL_moderate".
+    """
+    parts = [output_key, ticker] + ([risk_attitude] if risk_attitude else [])
+    return "_".join(_slug(part) for part in parts)
+
+
+def _stage(agent, name, instruction, output_key, model=None, **update):
+    update.update(
+        name=name,
+        instruction=agent.instruction + instruction,
+        output_key=output_key,
+        # Each stage has exactly one job; no transfer tool in the request.
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+    )
+    if model is not None:
+        update["model"] = model
+    return agent.clone(update=update)
+
+
+def build_pipeline(
+    tickers,
+    risk_attitudes=("moderate",),
+    investment_period=DEFAULT_INVESTMENT_PERIOD,
+    execution_preferences=DEFAULT_EXECUTION_PREFERENCES,
+    model=None,
+    name="financial_pipeline",
+    compact=None,
+    structured=None,
+):
+    """Builds the data -> trading -> execution -> risk graph for many inputs.
+
+    Every ticker gets its own branch, and all branches run concurrently
+    (ParallelAgent; a single branch is returned as is). Inside a branch the
+    data analysis runs first, then one trading -> execution -> risk chain
+    per risk attitude, again concurrently.
+    Stages hand off through the sub-agents' output_key state keys, suffixed
+    per branch by `state_key`, so no coordinator model turn sits between
+    them. `model` overrides the sub-agents' model (e.g. a stub in tests).
+    With `compact` (default: compaction.enabled()), downstream stages read
+    summaries of the upstream reports (see financial_advisor.compaction).
+    With `structured` (default: schemas.enabled()), the trading and risk
+    stages answer with JSON validated against financial_advisor.schemas,
+    and their state keys hold dicts.
+    """
+    if compact is None:
+        compact = compaction.enabled()
+    if structured is None:
+        structured = schemas.enabled()
+    stage_agents = [
+        (stage, STRUCTURED_STAGES.get(stage, agent) if structured else agent, inputs)
+        for stage, agent, inputs in STAGES
+    ]
+    # Key downstream stages read an upstream report from.
+    read_key = compaction.summary_key if compact else (lambda key: key)
+    tickers = list(dict.fromkeys(data_analyst_cache.normalize_ticker(t) for t in tickers))
+    if not tickers:
+        raise ValueError("build_pipeline needs at least one ticker")
+    branches = []
+    for ticker in tickers:
+        data_key = state_key(data_analyst_agent.output_key, ticker)
+        serve_cached, store = data_analyst_cache.report_callbacks(ticker, data_key)
+        data = _stage(
+            data_analyst_agent,
+            f"data_analyst_{_slug(ticker)}",
+            prompt.PIPELINE_DATA_INPUTS.format(ticker=ticker),
+            data_key,
+            model,
+            before_agent_callback=serve_cached,
+            after_agent_callback=store,
+        )
+        chains = []
+        for risk_attitude in risk_attitudes:
+            strategies_key = state_key(trading_analyst_agent.output_key, ticker, risk_attitude)
+            execution_key = state_key(execution_analyst_agent.output_key, ticker, risk_attitude)
+            fields = {
+                "ticker": ticker,
+                "risk_attitude": risk_attitude,
+                "investment_period": investment_period,
+                "execution_preferences": execution_preferences,
+                "market_data_key": read_key(data_key),
+                "strategies_key": read_key(strategies_key),
+                "execution_key": read_key(execution_key),
+            }
+            upstream = {
+                "trading": [data_key],
+                "execution": [strategies_key],
+                "risk": [data_key, strategies_key, execution_key],
+            }
+            stages = []
+            for stage, agent, inputs in stage_agents:
+                stages.append(_stage(
+                    agent,
+                    f"{stage}_analyst_{_slug(ticker)}_{_slug(risk_attitude)}",
+                    inputs.format(**fields),
+                    state_key(agent.output_key, ticker, risk_attitude),
+                    model,
+                ))
+                if compact:
+                    # Added to the agent's own callbacks, e.g. the structured
+                    # risk analyst's store_portfolio_risk.
+                    telemetry.add_callback(
+                        stages[-1],
+                        "before_agent_callback",
+                        compaction.summarize_inputs(*upstream[stage]),
+                    )
+            chains.append(SequentialAgent(
+                name=f"plan_{_slug(ticker)}_{_slug(risk_attitude)}", sub_agents=stages
+            ))
+        plans = _fan_out(f"plans_{_slug(ticker)}", chains)
+        branches.append(SequentialAgent(
+            name=f"analysis_{_slug(ticker)}",
+            sub_agents=[data, plans],
+        ))
+    graph = _fan_out(name, branches)
+    return telemetry.instrument(graph) if telemetry.enabled() else graph
+
+
+def _fan_out(name, agents):
+    # A single branch runs as is; ParallelAgent would only add task overhead.
+    return agents[0] if len(agents) == 1 else ParallelAgent(name=name, sub_agents=agents)
+
+
+def collect_outputs(state, tickers, risk_attitudes=("moderate",)):
+    """Regroups the pipeline's state keys as {ticker: {...}}."""
+    results = {}
+    for ticker in tickers:
+        ticker = data_analyst_cache.normalize_ticker(ticker)
+        data_key = state_key(data_analyst_agent.output_key, ticker)
+        results[ticker] = {
+            data_analyst_agent.output_key: state.get(data_key),
+            "plans": {
+                risk_attitude: {
+                    agent.output_key: state.get(state_key(agent.output_key, ticker, risk_attitude))
+                    for _, agent, _ in STAGES
+                }
+                for risk_attitude in risk_attitudes
+            },
+        }
+    return results
+
+
+def store_structured_outputs(engine, outputs):
+    """Writes the structured trading strategies and risk scores in `outputs`
+    (as returned by `run_pipeline(..., structured=True)`) to the
+    trading_strategies and risk_scores tables. Markdown reports are skipped.
+    Returns (strategy rows, risk score rows)."""
+    strategies, scores = [], []
+    for result in outputs.values():
+        for plan in result["plans"].values():
+            report = plan[trading_analyst_agent.output_key]
+            if isinstance(report, dict):
+                strategies += schemas.TradingStrategies.model_validate(report).rows()
+            report = plan[risk_analyst_agent.output_key]
+            if isinstance(report, dict):
+                scores += schemas.RiskAssessment.model_validate(report).rows()
+    gcp_sql_connector.create_structured_output_tables(engine)
+    gcp_sql_connector.replace_trading_strategies(engine, strategies)
+    gcp_sql_connector.replace_risk_scores(engine, scores)
+    return len(strategies), len(scores)
+
+
+async def run_agent(agent, message, user_id="pipeline"):
+    """Runs `agent` once on `message` in a fresh session; returns its final state."""
+    runner = InMemoryRunner(agent=agent)
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id
+    )
+    async for _ in runner.run_async(
+        user_id=user_id,
+        session_id=session.id,
+        new_message=types.UserContent(parts=[types.Part(text=message)]),
+    ):
+        pass
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=user_id, session_id=session.id
+    )
+    return session.state
+
+
+async def run_pipeline(tickers, risk_attitudes=("moderate",), user_id="pipeline", **kwargs):
+    """Runs `build_pipeline(...)` once and returns `collect_outputs(...)`."""
+    pipeline = build_pipeline(tickers, risk_attitudes, **kwargs)
+    state = await run_agent(pipeline, "Analyze " + ", ".join(tickers), user_id)
+    return collect_outputs(state, tickers, risk_attitudes)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the financial advisor in pipeline mode.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--risk", nargs="+", default=["moderate"], choices=RISK_ATTITUDES)
+    parser.add_argument("--period", default=DEFAULT_INVESTMENT_PERIOD)
+    parser.add_argument("--structured", action="store_true",
+                        help="JSON strategies and risk scores (default: STRUCTURED_OUTPUTS)")
+    parser.add_argument("--store", action="store_true",
+                        help="write structured results to the SQL database")
+    args = parser.parse_args()
+    structured = args.structured or schemas.enabled()
+    outputs = asyncio.run(
+        run_pipeline(args.tickers, args.risk, investment_period=args.period, structured=structured)
+    )
+    for ticker, result in outputs.items():
+        for risk_attitude, plan in result["plans"].items():
+            print(f"# {ticker} ({risk_attitude})\n")
+            print(plan[risk_analyst_agent.output_key] or "(no risk assessment)")
+            print()
+    if args.store:
+        rows = store_structured_outputs(gcp_sql_connector.get_gcp_sql_engine(), outputs)
+        print(f"Stored {rows[0]} strategies and {rows[1]} risk scores.")
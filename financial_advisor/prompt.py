@@ -101,3 +101,50 @@ Expected Output: The risk_analyst subagent MUST provide a comprehensive evaluati
 and point out any potential misalignments or concentrated risks.
 Output the generated extended version by visualizing the results as markdown
 """
+
+# Appended to the coordinator instruction by financial_advisor.compaction.
+REPORT_COMPACTION_NOTE = """
+Subagent results come back as compact summaries (overview, key levels, strategies, risks);
+the full reports are kept per ticker. When the user asks for a detailed result, or a step
+needs more than the summary, call load_full_report with the report name and ticker, or with
+the full_report value of the summary.
+"""
+
+# Appended to the sub-agent instructions in pipeline mode
+# (financial_advisor.pipeline), where nobody is around to answer prompts.
+# `{...}` placeholders are filled from session state by ADK at call time.
+
+PIPELINE_DATA_INPUTS = """
+Pipeline Inputs (Strictly Provided - Do Not Prompt User):
+provided_ticker: {ticker}
+"""
+
+PIPELINE_TRADING_INPUTS = """
+Pipeline Inputs (Strictly Provided - Do Not Prompt User):
+user_risk_attitude: {risk_attitude}
+user_investment_period: {investment_period}
+market_data_analysis_output:
+{{{market_data_key}}}
+"""
+
+PIPELINE_EXECUTION_INPUTS = """
+Pipeline Inputs (Strictly Provided - Do Not Prompt User):
+user_risk_attitude: {risk_attitude}
+user_investment_period: {investment_period}
+user_execution_preferences: {execution_preferences}
+provided_trading_strategy (the proposed strategies for {ticker}):
+{{{strategies_key}}}
+"""
+
+PIPELINE_RISK_INPUTS = """
+Pipeline Inputs (Strictly Provided - Do Not Prompt User):
+user_risk_attitude: {risk_attitude}
+user_investment_period: {investment_period}
+user_execution_preferences: {execution_preferences}
+market_data_analysis_output:
+{{{market_data_key}}}
+provided_trading_strategy:
+{{{strategies_key}}}
+provided_execution_strategy:
+{{{execution_key}}}
+"""
@@ -0,0 +1,346 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Gemini context caching of the agents' static instruction prefixes"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.tools import BaseTool, FunctionTool
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.google_search_tool import GoogleSearchTool
+from google.genai import types
+
+from . import telemetry
+
+DEFAULT_TTL = int(os.environ.get("PROMPT_CACHE_TTL_SECONDS", 3600))
+# Caches are extended this long before they expire...
+REFRESH_MARGIN = 300
+# ...and no longer referenced this close to expiry, so no request races it.
+_EXPIRY_GUARD = 30
+# Cached input tokens are billed at a quarter of the input price (Gemini 2.5).
+CACHED_TOKEN_PRICE = 0.25
+
+# ADK fills `{key}` placeholders from session state; only the text before
+# the first one is static.
+_PLACEHOLDER = re.compile(r"{+[^{}]*}+")
+
+
+class CachedPrefix:
+    """One cachedContents resource: a static instruction plus the agent's tools."""
+
+    def __init__(self, name, agent, model, instruction, tools, expires_at, tokens=None):
+        self.name = name
+        self.agent = agent
+        self.model = model
+        self.instruction = instruction
+        self.tools = tools
+        self.tools_key = _tools_key(tools)
+        self.expires_at = expires_at
+        # Prompt tokens each call no longer sends, as counted by the API.
+        self.tokens = tokens
+
+    @property
+    def key(self):
+        return (self.model, self.instruction, self.tools_key)
+
+
+def _tools_key(tools):
+    return json.dumps(
+        [tool.model_dump(mode="json", exclude_none=True) for tool in tools or ()],
+        sort_keys=True,
+    )
+
+
+def _request_tools(agent):
+    """The `config.tools` ADK sends for `agent`, or None if it can't be known
+    up front (e.g. toolsets resolved per request)."""
+    tools, declarations = [], []
+    for tool in agent.tools:
+        if isinstance(tool, GoogleSearchTool):
+            tools.append(types.Tool(google_search=types.GoogleSearch()))
+            continue
+        if not isinstance(tool, BaseTool):
+            if not callable(tool):
+                return None
+            tool = FunctionTool(tool)
+        if type(tool).process_llm_request is not BaseTool.process_llm_request:
+            return None
+        declaration = tool._get_declaration()
+        if declaration is None:
+            continue
+        # Like ADK, all function declarations share the first function Tool.
+        if not declarations:
+            tools.append(None)
+            position = len(tools) - 1
+        declarations.append(declaration)
+    if declarations:
+        tools[position] = types.Tool(function_declarations=declarations)
+    return tools
+
+
+class PromptCache:
+    """Serves the static head of each registered agent's instruction from a
+    Gemini cachedContents resource instead of resending it on every call.
+
+    `warm()` creates one cache per (model, static instruction, tools) at
+    startup. A before_model_callback then points matching requests at the
+    cache: the system instruction and tools are dropped (the API rejects
+    them alongside `cached_content`), and whatever followed the static
+    prefix -- state-filled inputs, ADK's identity line -- moves into a
+    leading user turn. Caches are extended in the background `refresh_margin`
+    seconds before they expire; requests that find no usable cache are sent
+    unchanged. `clock` can be replaced for tests.
+    """
+
+    def __init__(self, client=None, ttl=DEFAULT_TTL, refresh_margin=REFRESH_MARGIN,
+                 clock=time.time):
+        self._client = client
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.metrics = Counter()
+        # key -> reason the cache could not be created (e.g. below the
+        # model's minimum cacheable size)
+        self.skipped = {}
+        self._agents = []
+        self._entries = {}
+        self._refreshing = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        return self._client
+
+    def register(self, *agents):
+        """Adds the callback to every LlmAgent reachable from `agents`, through
+        sub_agents and AgentTools. Agents cloned afterwards keep it."""
+        for agent in agents:
+            if isinstance(agent, LlmAgent):
+                if agent not in self._agents:
+                    self._agents.append(agent)
+                telemetry.add_callback(agent, "before_model_callback", self.before_model_callback)
+                for tool in agent.tools:
+                    if isinstance(tool, AgentTool) and isinstance(tool.agent, BaseAgent):
+                        self.register(tool.agent)
+            self.register(*agent.sub_agents)
+
+    def setup(self, *agents):
+        """`register(*agents)`, then `warm()`."""
+        self.register(*agents)
+        return self.warm()
+
+    def _spec(self, agent):
+        if not isinstance(agent.instruction, str):
+            return None
+        instruction = _PLACEHOLDER.split(agent.instruction, maxsplit=1)[0]
+        tools = _request_tools(agent)
+        if not instruction.strip() or tools is None:
+            return None
+        return agent.canonical_model.model, instruction, tools
+
+    def warm(self):
+        """Creates the caches registered agents don't have yet; returns all of them."""
+        for agent in self._agents:
+            spec = self._spec(agent)
+            if spec is None:
+                continue
+            model, instruction, tools = spec
+            key = (model, instruction, _tools_key(tools))
+            if key in self._entries or key in self.skipped:
+                continue
+            try:
+                cached = self.client.caches.create(
+                    model=model, config=self._create_config(agent.name, instruction, tools)
+                )
+            except Exception as e:
+                self.skipped[key] = str(e)
+                print(f"Not caching the {agent.name} prompt: {e}")
+                continue
+            usage = cached.usage_metadata
+            self._entries[key] = CachedPrefix(
+                cached.name, agent.name, model, instruction, tools,
+                self.clock() + self.ttl, usage.total_token_count if usage else None,
+            )
+        return list(self._entries.values())
+
+    def _create_config(self, agent_name, instruction, tools):
+        return types.CreateCachedContentConfig(
+            display_name=agent_name,
+            system_instruction=instruction,
+            tools=tools or None,
+            ttl=f"{self.ttl}s",
+        )
+
+    def _match(self, model, instruction, tools):
+        tools_key = _tools_key(tools)
+        matches = [
+            entry for entry in self._entries.values()
+            if entry.model == model
+            and entry.tools_key == tools_key
+            and instruction.startswith(entry.instruction)
+        ]
+        return max(matches, key=lambda entry: len(entry.instruction), default=None)
+
+    async def before_model_callback(self, callback_context, llm_request):
+        config = llm_request.config
+        instruction = config.system_instruction
+        if config.cached_content or not isinstance(instruction, str):
+            return None
+        entry = self._match(llm_request.model, instruction, config.tools)
+        if entry is None:
+            return None
+        now = self.clock()
+        if now >= entry.expires_at - self.refresh_margin:
+            self._schedule_refresh(entry)
+        if now >= entry.expires_at - _EXPIRY_GUARD:
+            self.metrics["expired"] += 1
+            return None
+        dynamic = instruction[len(entry.instruction):].strip()
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        config.cached_content = entry.name
+        if dynamic:
+            llm_request.contents.insert(
+                0, types.Content(role="user", parts=[types.Part(text=dynamic)])
+            )
+        self.metrics["hits"] += 1
+        return None
+
+    def _schedule_refresh(self, entry):
+        task = self._refreshing.get(entry.key)
+        if task is None or task.done():
+            self._refreshing[entry.key] = asyncio.get_running_loop().create_task(
+                self._refresh(entry)
+            )
+
+    async def _refresh(self, entry):
+        try:
+            if self.clock() < entry.expires_at - _EXPIRY_GUARD:
+                await self.client.aio.caches.update(
+                    name=entry.name,
+                    config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s"),
+                )
+            else:
+                cached = await self.client.aio.caches.create(
+                    model=entry.model,
+                    config=self._create_config(entry.agent, entry.instruction, entry.tools),
+                )
+                entry.name = cached.name
+            entry.expires_at = self.clock() + self.ttl
+            self.metrics["refreshed"] += 1
+        except Exception as e:
+            self.metrics["refresh_errors"] += 1
+            print(f"Refreshing the cached {entry.agent} prompt failed: {e}")
+        finally:
+            self._refreshing.pop(entry.key, None)
+
+    def close(self):
+        """Deletes the caches (they are billed for storage until they expire)."""
+        for entry in self._entries.values():
+            try:
+                self.client.caches.delete(name=entry.name)
+            except Exception as e:
+                print(f"Deleting the cached {entry.agent} prompt failed: {e}")
+        self._entries.clear()
+
+
+def enabled():
+    # Opt-in: caches are created with API calls at startup and billed for storage.
+    return os.environ.get("PROMPT_CACHE", "0") == "1"
+
+
+default_cache = PromptCache()
+
+
+def savings(records):
+    """Per-agent rows comparing model calls served with and without a cached prefix.
+
+    `records` are telemetry CallRecords. Token savings are per call: cached
+    tokens, and the billed input tokens they save at CACHED_TOKEN_PRICE.
+    Latency savings compare the p50 latency and time to first token of
+    cached and uncached calls of the same agent.
+    """
+    by_agent = defaultdict(list)
+    for record in records:
+        if record.kind == "model":
+            by_agent[record.agent].append(record)
+
+    def p50(calls, field):
+        values = [getattr(c, field) for c in calls if getattr(c, field) is not None]
+        return float(np.percentile(values, 50)) if values else None
+
+    def saved(uncached, cached):
+        return None if uncached is None or cached is None else uncached - cached
+
+    rows = []
+    for agent, calls in sorted(by_agent.items()):
+        cached = [c for c in calls if c.cached_tokens]
+        uncached = [c for c in calls if not c.cached_tokens]
+        cached_tokens = sum(c.cached_tokens for c in cached)
+        row = {
+            "agent": agent,
+            "calls": len(calls),
+            "cached_calls": len(cached),
+            "prompt_tokens_per_call": sum(c.prompt_tokens for c in calls) / len(calls),
+            "cached_tokens_per_call": cached_tokens / len(cached) if cached else 0.0,
+            "billed_tokens_saved_per_call": (
+                cached_tokens * (1 - CACHED_TOKEN_PRICE) / len(cached) if cached else 0.0
+            ),
+        }
+        for field in ("latency", "ttft"):
+            row[f"{field}_p50_cached"] = p50(cached, field)
+            row[f"{field}_p50_uncached"] = p50(uncached, field)
+            row[f"{field}_saved_p50"] = saved(row[f"{field}_p50_uncached"], row[f"{field}_p50_cached"])
+        rows.append(row)
+    return rows
+
+
+def format_savings(rows):
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.0f}"
+
+    lines = [
+        f"{'agent':<36} {'calls':>6} {'cached':>6} {'prompt/call':>11} {'cached/call':>11} "
+        f"{'billed saved/call':>17} {'p50 saved ms':>12} {'ttft saved ms':>13}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['agent']:<36} {row['calls']:>6} {row['cached_calls']:>6} "
+            f"{row['prompt_tokens_per_call']:>11,.0f} {row['cached_tokens_per_call']:>11,.0f} "
+            f"{row['billed_tokens_saved_per_call']:>17,.0f} {ms(row['latency_saved_p50']):>12} "
+            f"{ms(row['ttft_saved_p50']):>13}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Token and latency savings of the prompt cache.")
+    parser.add_argument("path", nargs="?", default=os.environ.get(telemetry.TRACE_FILE_ENV),
+                        help=f"span file written by telemetry (default: ${telemetry.TRACE_FILE_ENV})")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error(f"pass a span file or set {telemetry.TRACE_FILE_ENV}")
+    print(format_savings(savings(telemetry.records_from_spans(args.path))))
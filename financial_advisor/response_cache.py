@@ -0,0 +1,205 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""TTL response cache with stale-while-revalidate and pluggable backends"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+CacheLookup = namedtuple("CacheLookup", ["status", "value", "age"])
+
+
+class MemoryBackend:
+    """Process-local LRU dict; evicts the least recently used entry when full."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DiskBackend:
+    """SQLite file shared by every process on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache "
+                "(key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=5)
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        with self._connection() as connection:
+            now = time.time()
+            connection.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?)", (key, value, now + ttl)
+            )
+            connection.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+
+    def delete(self, key):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+
+class RedisBackend:
+    """Any client with redis-py's get/set(ex=)/delete, e.g. Memorystore."""
+
+    def __init__(self, client, prefix="adk-trade:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisBackend.from_url needs the `redis` package") from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+def backend_from_url(url):
+    """Builds a backend from "memory", "disk:/path/cache.db" or "redis://..."."""
+    if not url or url == "memory":
+        return MemoryBackend()
+    if url.startswith("disk:"):
+        return DiskBackend(url[len("disk:"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend.from_url(url)
+    raise ValueError(f"Unknown response cache backend: {url}")
+
+
+class ResponseCache:
+    """JSON values with a freshness TTL and a stale-while-revalidate window.
+
+    An entry is fresh for `ttl` seconds; for the following `stale_ttl`
+    seconds it is still served but `lookup` reports it as stale so the caller
+    can refresh it in the background (see `revalidate`). After that the
+    backend drops it. `metrics` counts fresh/stale/miss lookups and writes.
+    """
+
+    def __init__(self, backend=None, ttl=3600.0, stale_ttl=4 * 3600.0):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.metrics = Counter()
+        self._refreshing = {}
+
+    @classmethod
+    def from_env(cls, prefix):
+        """Reads <prefix>_BACKEND, <prefix>_TTL_SECONDS and <prefix>_STALE_SECONDS."""
+        return cls(
+            backend_from_url(os.environ.get(f"{prefix}_BACKEND", "memory")),
+            ttl=float(os.environ.get(f"{prefix}_TTL_SECONDS", 3600)),
+            stale_ttl=float(os.environ.get(f"{prefix}_STALE_SECONDS", 4 * 3600)),
+        )
+
+    def lookup(self, key):
+        raw = self.backend.get(key)
+        if raw is None:
+            self.metrics[MISS] += 1
+            return CacheLookup(MISS, None, None)
+        entry = json.loads(raw)
+        age = time.time() - entry["stored_at"]
+        status = FRESH if age < self.ttl else STALE
+        self.metrics[status] += 1
+        return CacheLookup(status, entry["value"], age)
+
+    def store(self, key, value):
+        entry = json.dumps({"value": value, "stored_at": time.time()})
+        self.backend.set(key, entry, self.ttl + self.stale_ttl)
+        self.metrics["stores"] += 1
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+    def revalidate(self, key, refresh):
+        """Runs `refresh()` (a coroutine function) in the background once per key.
+
+        Whatever the refresh stores replaces the stale entry. Returns the
+        task, or the one already running for `key`.
+        """
+        task = self._refreshing.get(key)
+        if task is None or task.done():
+            task = self._refreshing[key] = asyncio.get_running_loop().create_task(
+                self._run_refresh(key, refresh)
+            )
+        return task
+
+    async def _run_refresh(self, key, refresh):
+        try:
+            await refresh()
+            self.metrics["revalidated"] += 1
+        except Exception as e:
+            self.metrics["revalidate_errors"] += 1
+            print(f"Background refresh of {key} failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def hit_rate(self):
+        lookups = self.metrics[FRESH] + self.metrics[STALE] + self.metrics[MISS]
+        return (self.metrics[FRESH] + self.metrics[STALE]) / lookups if lookups else 0.0
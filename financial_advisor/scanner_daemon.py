@@ -0,0 +1,317 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Long-running insider trade scanner with an adaptive polling schedule
+
+One process keeps the TradeScannerAgent (and with it the ingestion
+watermark, the scraper's HTTP session and the SQL engine pool) warm and
+scans again after an interval that depends on the US market session and
+on how many new filings the last scan found.
+"""
+
+import asyncio
+import datetime
+import os
+import time
+from collections import Counter
+
+# (start, end) of each session in New York time, minutes after midnight.
+REGULAR_SESSION = (9 * 60 + 30, 16 * 60)
+EXTENDED_SESSION = (4 * 60, 20 * 60)
+REGULAR, EXTENDED, CLOSED = "regular", "extended", "closed"
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _NEW_YORK = ZoneInfo("America/New_York")
+except Exception:  # no tz database (e.g. slim images without tzdata)
+    _NEW_YORK = None
+
+
+def _nth_sunday(year, month, n):
+    first = datetime.date(year, month, 1)
+    return first + datetime.timedelta(days=(6 - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def new_york_time(timestamp):
+    """Local New York datetime for a UNIX timestamp.
+
+    Uses the tz database when present, else the US DST rule (second
+    Sunday of March to first Sunday of November, 2:00 local).
+    """
+    if _NEW_YORK is not None:
+        return datetime.datetime.fromtimestamp(timestamp, _NEW_YORK)
+    utc = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    dst_start = datetime.datetime.combine(
+        _nth_sunday(utc.year, 3, 2), datetime.time(7), datetime.timezone.utc
+    )
+    dst_end = datetime.datetime.combine(
+        _nth_sunday(utc.year, 11, 1), datetime.time(6), datetime.timezone.utc
+    )
+    offset = -4 if dst_start <= utc < dst_end else -5
+    return utc.astimezone(datetime.timezone(datetime.timedelta(hours=offset)))
+
+
+def market_session(timestamp):
+    """REGULAR, EXTENDED or CLOSED for a UNIX timestamp (exchange holidays are
+    not modelled; a holiday is just polled like a quiet trading day)."""
+    local = new_york_time(timestamp)
+    if local.weekday() >= 5:
+        return CLOSED
+    minute = local.hour * 60 + local.minute
+    if REGULAR_SESSION[0] <= minute < REGULAR_SESSION[1]:
+        return REGULAR
+    if EXTENDED_SESSION[0] <= minute < EXTENDED_SESSION[1]:
+        return EXTENDED
+    return CLOSED
+
+
+def seconds_to_session_change(timestamp):
+    """Seconds until the next session boundary (4:00, 9:30, 16:00 or 20:00 New York)."""
+    local = new_york_time(timestamp)
+    minute = local.hour * 60 + local.minute + local.second / 60
+    boundaries = sorted({*REGULAR_SESSION, *EXTENDED_SESSION})
+    upcoming = [b for b in boundaries if b > minute] or [boundaries[0] + 24 * 60]
+    return (upcoming[0] - minute) * 60
+
+
+class AdaptiveSchedule:
+    """Picks the delay before the next scan.
+
+    The base interval depends on the market session. A scan that finds at
+    least `burst_threshold` new trades drops the interval to `burst`; each
+    quieter scan doubles it back toward the base. Failed scans retry after
+    `burst`, doubling per consecutive failure up to the base. Sleeps never
+    run past the next session boundary, so the cadence changes on time.
+    """
+
+    def __init__(
+        self,
+        regular=float(os.environ.get("SCANNER_REGULAR_INTERVAL", 300)),
+        extended=float(os.environ.get("SCANNER_EXTENDED_INTERVAL", 900)),
+        closed=float(os.environ.get("SCANNER_CLOSED_INTERVAL", 3600)),
+        burst=float(os.environ.get("SCANNER_BURST_INTERVAL", 60)),
+        burst_threshold=int(os.environ.get("SCANNER_BURST_THRESHOLD", 5)),
+    ):
+        self.intervals = {REGULAR: regular, EXTENDED: extended, CLOSED: closed}
+        self.burst = burst
+        self.burst_threshold = burst_threshold
+        self.failures = 0
+        self._interval = None
+
+    def base_interval(self, now):
+        return self.intervals[market_session(now)]
+
+    def next_delay(self, now, new_trades=0, failed=False):
+        base = self.base_interval(now)
+        if failed:
+            self.failures += 1
+            delay = min(self.burst * 2 ** (self.failures - 1), base)
+        else:
+            self.failures = 0
+            if new_trades >= self.burst_threshold:
+                self._interval = self.burst
+            elif self._interval is None:
+                self._interval = base
+            else:
+                self._interval = self._interval * 2
+            self._interval = min(self._interval, base)
+            delay = self._interval
+        return max(1.0, min(delay, seconds_to_session_change(now)))
+
+
+def agent_scan(agent):
+    """Scan callable for ScannerDaemon running `agent.scan_and_store_trades()`."""
+
+    def scan():
+        agent.scan_and_store_trades()
+        stats = agent.last_stats
+        high_water = agent.watermark.high_water_date if agent.watermark else None
+        return (stats.new if stats else 0), high_water
+
+    return scan
+
+
+class ScannerDaemon:
+    """Scans on an AdaptiveSchedule until stopped.
+
+    `scan` is a blocking callable returning (new trade count, newest
+    ingested trade date or None); by default it runs one
+    TradeScannerAgent scan in a worker thread, reusing the agent across
+    scans. `clock` and `sleep` can be replaced with a fake clock in tests.
+    """
+
+    def __init__(self, scan=None, schedule=None, clock=time.time, sleep=asyncio.sleep):
+        if scan is None:
+            from financial_advisor.sub_agents.trade_scanner_agent import TradeScannerAgent
+
+            scan = agent_scan(TradeScannerAgent())
+        self.scan = scan
+        self.schedule = schedule or AdaptiveSchedule()
+        self.clock = clock
+        self.sleep = sleep
+        self.metrics = Counter()
+        self.started_at = None
+        self.last_attempt_at = None
+        self.last_success_at = None
+        self.last_error = None
+        self.last_scan_seconds = None
+        self.newest_trade_date = None
+        self.next_scan_at = None
+        self.delay = None
+        self._wake = None
+        self._stopped = False
+
+    async def run_once(self):
+        """Runs one scan; returns the delay before the next one."""
+        start = self.clock()
+        self.last_attempt_at = start
+        self.metrics["scans"] += 1
+        try:
+            if asyncio.iscoroutinefunction(self.scan):
+                new_trades, newest = await self.scan()
+            else:
+                new_trades, newest = await asyncio.to_thread(self.scan)
+        except Exception as e:
+            self.metrics["failures"] += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"Scan failed: {self.last_error}")
+            failed, new_trades = True, 0
+        else:
+            self.last_success_at = self.clock()
+            self.last_error = None
+            self.metrics["new_trades"] += new_trades
+            if newest is not None:
+                self.newest_trade_date = newest
+            failed = False
+        now = self.clock()
+        self.last_scan_seconds = now - start
+        self.delay = self.schedule.next_delay(now, new_trades, failed)
+        self.next_scan_at = now + self.delay
+        return self.delay
+
+    def trigger(self):
+        """Starts the next scan now instead of at the scheduled time."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _wait(self, delay):
+        sleeper = asyncio.ensure_future(self.sleep(delay))
+        woken = asyncio.ensure_future(self._wake.wait())
+        done, pending = await asyncio.wait({sleeper, woken}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if woken in done:
+            self.metrics["triggered"] += 1
+        self._wake.clear()
+
+    async def run_forever(self):
+        self._wake = asyncio.Event()
+        self._stopped = False
+        self.started_at = self.clock()
+        while not self._stopped:
+            delay = await self.run_once()
+            if self._stopped:
+                break
+            await self._wait(delay)
+
+    def stop(self):
+        self._stopped = True
+        self.trigger()
+
+    def lag(self):
+        """Seconds since the last successful scan (or since start)."""
+        reference = self.last_success_at or self.started_at
+        return None if reference is None else self.clock() - reference
+
+    def health(self):
+        """Status plus lag metrics. Unhealthy once the last success is older
+        than three scheduled intervals (at least 15 minutes)."""
+        now = self.clock()
+        lag = self.lag()
+        allowed = max(3 * (self.delay or self.schedule.base_interval(now)), 900)
+        newest = self.newest_trade_date
+        return {
+            "healthy": lag is not None and lag <= allowed,
+            "session": market_session(now),
+            "scan_lag_seconds": lag,
+            "data_lag_days": (
+                (new_york_time(now).date() - newest).days if newest is not None else None
+            ),
+            "next_scan_in_seconds": (
+                None if self.next_scan_at is None else max(0.0, self.next_scan_at - now)
+            ),
+            "interval_seconds": self.delay,
+            "last_scan_seconds": self.last_scan_seconds,
+            "consecutive_failures": self.schedule.failures,
+            "last_error": self.last_error,
+            **self.metrics,
+        }
+
+    def render_prometheus(self):
+        health = self.health()
+        lines = [
+            "# TYPE trade_scanner_healthy gauge",
+            f"trade_scanner_healthy {int(health['healthy'])}",
+        ]
+        for name, value in (
+            ("scan_lag_seconds", health["scan_lag_seconds"]),
+            ("data_lag_days", health["data_lag_days"]),
+            ("interval_seconds", health["interval_seconds"]),
+            ("last_scan_seconds", health["last_scan_seconds"]),
+            ("consecutive_failures", health["consecutive_failures"]),
+        ):
+            if value is not None:
+                lines += [f"# TYPE trade_scanner_{name} gauge", f"trade_scanner_{name} {value}"]
+        for name in ("scans", "failures", "new_trades", "triggered"):
+            lines += [
+                f"# TYPE trade_scanner_{name}_total counter",
+                f"trade_scanner_{name}_total {self.metrics[name]}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def create_app(daemon):
+    """FastAPI app running `daemon` for its lifetime.
+
+    POST / starts a scan now; GET /healthz answers 503 when the scanner is
+    unhealthy (see `ScannerDaemon.health`); GET /metrics is Prometheus text.
+    """
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, PlainTextResponse
+
+    async def lifespan(app):
+        task = asyncio.create_task(daemon.run_forever())
+        yield
+        daemon.stop()
+        await task
+
+    app = FastAPI(title="trade_scanner", lifespan=lifespan)
+    app.state.daemon = daemon
+
+    @app.post("/", status_code=202)
+    async def trigger_scan():
+        daemon.trigger()
+        return daemon.health()
+
+    @app.get("/healthz")
+    async def healthz():
+        health = daemon.health()
+        return JSONResponse(health, status_code=200 if health["healthy"] else 503)
+
+    @app.get("/metrics")
+    async def metrics():
+        return PlainTextResponse(daemon.render_prometheus())
+
+    return app
@@ -0,0 +1,104 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Output schemas of the trading and risk analysts in structured-output mode
+
+Used as ADK `output_schema`: Gemini answers with JSON matching the model,
+ADK validates it and stores the dict under the agent's output_key.
+"""
+
+import os
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class TradingStrategy(BaseModel):
+    name: str = Field(description="Short unique name of the strategy.")
+    direction: Literal["long", "short"]
+    entry_price: float = Field(ge=0, description="Price to enter at (limit or trigger).")
+    entry_condition: str = Field(description="Signal or condition that triggers the entry.")
+    stop_loss: float = Field(ge=0, description="Price at which the position is closed at a loss.")
+    take_profit: float = Field(ge=0, description="Target price to take profits at.")
+    position_size_pct: float = Field(
+        ge=0, le=100, description="Position size as a percentage of the portfolio."
+    )
+    time_horizon: str = Field(description="Expected holding period, e.g. '2-6 weeks'.")
+    rationale: str
+
+    @model_validator(mode="after")
+    def _levels_match_direction(self):
+        sign = 1 if self.direction == "long" else -1
+        if sign * (self.stop_loss - self.entry_price) >= 0:
+            raise ValueError(f"{self.name}: stop_loss must be on the losing side of entry_price")
+        if sign * (self.take_profit - self.entry_price) <= 0:
+            raise ValueError(f"{self.name}: take_profit must be on the winning side of entry_price")
+        return self
+
+    @property
+    def reward_to_risk(self):
+        return abs(self.take_profit - self.entry_price) / abs(self.entry_price - self.stop_loss)
+
+
+class TradingStrategies(BaseModel):
+    ticker: str
+    risk_attitude: str
+    investment_period: str
+    strategies: list[TradingStrategy] = Field(min_length=1)
+
+    def rows(self):
+        """Rows in gcp_sql_connector.TRADING_STRATEGY_COLUMNS order."""
+        return [
+            (
+                self.ticker, self.risk_attitude, s.name, s.direction, s.entry_price,
+                s.stop_loss, s.take_profit, s.position_size_pct, s.time_horizon,
+                s.entry_condition, s.rationale,
+            )
+            for s in self.strategies
+        ]
+
+
+class RiskScore(BaseModel):
+    category: str = Field(
+        description="Risk category, e.g. market, volatility, liquidity, concentration, execution, event."
+    )
+    score: int = Field(ge=1, le=10, description="1 = negligible, 10 = severe.")
+    rationale: str
+    mitigation: str
+
+
+class RiskAssessment(BaseModel):
+    ticker: str
+    risk_attitude: str
+    overall_score: int = Field(ge=1, le=10, description="1 = negligible, 10 = severe.")
+    aligned_with_risk_attitude: bool
+    scores: list[RiskScore] = Field(min_length=1)
+    summary: str
+
+    def rows(self):
+        """Rows in gcp_sql_connector.RISK_SCORE_COLUMNS order; the overall
+        score is stored as category "overall"."""
+        overall = RiskScore(
+            category="overall", score=self.overall_score, rationale=self.summary,
+            mitigation="" if self.aligned_with_risk_attitude
+            else "Plan is not aligned with the stated risk attitude.",
+        )
+        return [
+            (self.ticker, self.risk_attitude, s.category, s.score, s.rationale, s.mitigation)
+            for s in [overall, *self.scores]
+        ]
+
+
+def enabled():
+    return os.environ.get("STRUCTURED_OUTPUTS", "0") == "1"
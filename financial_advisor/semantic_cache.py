@@ -0,0 +1,369 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Semantic cache of advisor results keyed by the normalized request
+
+A request is reduced to (ticker, risk attitude, investment period, execution
+preferences), embedded locally, and matched against earlier requests for the
+same ticker in a NumPy vector index. A close enough match that is still
+fresh returns the stored result instead of running the agents.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+from google.genai import types
+
+from . import compaction
+from .sub_agents.data_analyst.cache import extract_ticker, normalize_ticker
+
+DEFAULT_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", 0.85))
+DEFAULT_TTL = float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", 6 * 3600))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", 4096))
+# Session state key of the request a coordinator session is still answering.
+PENDING_KEY = "semantic_cache_pending_request"
+
+AdvisorRequest = namedtuple(
+    "AdvisorRequest", ["ticker", "risk_attitude", "investment_period", "execution_preferences"]
+)
+SemanticHit = namedtuple("SemanticHit", ["value", "score", "age", "request"])
+
+_RISK_ATTITUDES = (
+    ("conservative", re.compile(r"conservative|low[- ]risk|risk[- ]averse|cautious|defensive", re.I)),
+    ("aggressive", re.compile(r"aggressive|high[- ]risk|speculative", re.I)),
+    ("moderate", re.compile(r"moderate|medium[- ]risk|balanced", re.I)),
+)
+_PERIOD = re.compile(
+    r"\b(short|medium|mid|long)[- ]?term\b|\b(\d+)\s*(?:-|to)?\s*(years?|months?|weeks?)\b", re.I
+)
+_PERIOD_WORDS = {"short": "short-term", "medium": "medium-term", "mid": "medium-term", "long": "long-term"}
+_EXECUTION = re.compile(r"execution preferences?\s*[:=]\s*(.+)", re.I)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_risk_attitude(text):
+    for risk_attitude, pattern in _RISK_ATTITUDES:
+        if pattern.search(text or ""):
+            return risk_attitude
+    return None
+
+
+def normalize_period(text):
+    """'Long term' / 'long-term horizon' -> 'long-term'; '5 years' -> '5 years'."""
+    match = _PERIOD.search(text or "")
+    if not match:
+        return None
+    if match.group(1):
+        return _PERIOD_WORDS[match.group(1).lower()]
+    unit = match.group(3).lower().rstrip("s")
+    return f"{int(match.group(2))} {unit}s"
+
+
+def normalize_request(ticker, risk_attitude, investment_period, execution_preferences=""):
+    return AdvisorRequest(
+        normalize_ticker(ticker),
+        normalize_risk_attitude(risk_attitude) or risk_attitude.strip().lower(),
+        normalize_period(investment_period) or " ".join(investment_period.lower().split()),
+        " ".join((execution_preferences or "").lower().split()),
+    )
+
+
+def parse_request(text, state=None):
+    """Reads an AdvisorRequest from a free-text request and session state.
+
+    State keys (provided_ticker, risk_attitude, investment_period,
+    execution_preferences) win over the text. Returns None unless ticker,
+    risk attitude and period are all known.
+    """
+    state = state or {}
+    ticker = extract_ticker(text, state)
+    risk_attitude = normalize_risk_attitude(state.get("risk_attitude") or text)
+    period = normalize_period(state.get("investment_period") or text)
+    if not (ticker and risk_attitude and period):
+        return None
+    preferences = state.get("execution_preferences")
+    if preferences is None:
+        match = _EXECUTION.search(text)
+        preferences = match.group(1) if match else ""
+    return normalize_request(ticker, risk_attitude, period, preferences)
+
+
+class HashingEmbedder:
+    """Deterministic local embedding of an AdvisorRequest.
+
+    Each field contributes hashed word and character-trigram features,
+    weighted per field, so paraphrased execution preferences still land
+    close together. No model call; swap in any callable returning a vector
+    of `dim` floats (e.g. a hosted text-embedding model) if needed.
+    """
+
+    WEIGHTS = {"investment_period": 2.0, "execution_preferences": 1.0}
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def _add(self, vector, feature, weight):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % self.dim] += weight if value >> 63 else -weight
+
+    def __call__(self, request):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for field, weight in self.WEIGHTS.items():
+            text = getattr(request, field)
+            words = _WORD.findall(text)
+            for word in words:
+                self._add(vector, f"{field}:{word}", weight)
+            joined = " ".join(words)
+            trigrams = [joined[i:i + 3] for i in range(len(joined) - 2)]
+            for trigram in trigrams:
+                self._add(vector, f"{field}#{trigram}", weight / 2 / max(1, len(trigrams)) ** 0.5)
+            if not words:
+                self._add(vector, f"{field}:<none>", weight)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Brute-force cosine index over unit vectors in a preallocated matrix.
+
+    Slots are reused after `remove`; `search` scans only occupied slots of
+    the wanted group (here: one ticker and risk attitude), which is a single matrix-vector
+    product for the few thousand entries a process holds.
+    """
+
+    def __init__(self, dim, capacity):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.groups = np.full(capacity, None, dtype=object)
+        self.occupied = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return int(self.occupied.sum())
+
+    def free_slot(self):
+        free = np.flatnonzero(~self.occupied)
+        return int(free[0]) if len(free) else None
+
+    def put(self, slot, vector, group):
+        self.vectors[slot] = vector
+        self.groups[slot] = group
+        self.occupied[slot] = True
+
+    def remove(self, slot):
+        self.occupied[slot] = False
+        self.groups[slot] = None
+
+    def search(self, vector, group):
+        """Returns (slot, cosine similarity) of the nearest entry in `group`, or None."""
+        candidates = np.flatnonzero(self.occupied & (self.groups == group))
+        if not len(candidates):
+            return None
+        scores = self.vectors[candidates] @ vector
+        best = int(np.argmax(scores))
+        return int(candidates[best]), float(scores[best])
+
+
+def _group(request):
+    # Only requests for the same ticker and risk attitude are compared.
+    return f"{request.ticker}:{request.risk_attitude}"
+
+
+class SemanticCache:
+    """Stores results per AdvisorRequest and serves them to similar requests.
+
+    A lookup hits when an entry for the same ticker and risk attitude is younger than `ttl`
+    and its embedding's cosine similarity is at least `threshold`. When all
+    `max_entries` slots are taken, expired entries go first, then the least
+    recently used one. `metrics` counts hits, misses, expired entries,
+    stores and evictions.
+    """
+
+    def __init__(
+        self,
+        embed=None,
+        threshold=DEFAULT_THRESHOLD,
+        ttl=DEFAULT_TTL,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        clock=time.time,
+    ):
+        self.embed = embed or HashingEmbedder()
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.metrics = Counter()
+        self._index = None
+        self._entries = {}  # slot -> [request, value, stored_at, last_used]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _vector(self, request):
+        vector = np.asarray(self.embed(request), dtype=np.float32)
+        if self._index is None:
+            self._index = VectorIndex(len(vector), self.max_entries)
+        return vector
+
+    def _evict(self, slot, reason):
+        self._index.remove(slot)
+        del self._entries[slot]
+        self.metrics[reason] += 1
+
+    def lookup(self, request):
+        """Returns a SemanticHit for `request`, or None on a miss."""
+        vector = self._vector(request)
+        with self._lock:
+            now = self.clock()
+            while True:
+                found = self._index.search(vector, _group(request))
+                if found is None or now - self._entries[found[0]][2] < self.ttl:
+                    break
+                self._evict(found[0], "expired")
+            if found is None or found[1] < self.threshold:
+                self.metrics["misses"] += 1
+                return None
+            slot, score = found
+            entry = self._entries[slot]
+            entry[3] = now
+            self.metrics["hits"] += 1
+            return SemanticHit(entry[1], score, now - entry[2], entry[0])
+
+    def store(self, request, value):
+        vector = self._vector(request)
+        with self._lock:
+            now = self.clock()
+            found = self._index.search(vector, _group(request))
+            if found is not None and self._entries[found[0]][0] == request:
+                slot = found[0]  # same request again: replace in place
+            else:
+                slot = self._index.free_slot()
+            if slot is None:
+                expired = [s for s, e in self._entries.items() if now - e[2] >= self.ttl]
+                for expired_slot in expired:
+                    self._evict(expired_slot, "expired")
+                if not expired:
+                    oldest = min(self._entries, key=lambda s: self._entries[s][3])
+                    self._evict(oldest, "evictions")
+                slot = self._index.free_slot()
+            self._index.put(slot, vector, _group(request))
+            self._entries[slot] = [request, value, now, now]
+            self.metrics["stores"] += 1
+
+    def clear(self):
+        with self._lock:
+            for slot in list(self._entries):
+                self._index.remove(slot)
+            self._entries.clear()
+
+    def hit_rate(self):
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return self.metrics["hits"] / lookups if lookups else 0.0
+
+
+def _request_text(callback_context):
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def is_report_set(value, report_keys=compaction.REPORT_KEYS):
+    """Whether a cached value is the {report key: report} dict the coordinator
+    and `batch.analyze_batch` both store, with every report present."""
+    return isinstance(value, dict) and all(value.get(key) for key in report_keys)
+
+
+def _digest(value):
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _render_reports(reports):
+    sections = []
+    for key, report in reports.items():
+        title = key.removesuffix("_output").replace("_", " ").capitalize()
+        text = report if isinstance(report, str) else json.dumps(report, indent=2)
+        sections.append(f"## {title}\n\n{text}")
+    return "\n\n".join(sections)
+
+
+def agent_callbacks(cache, output_key, report_keys=compaction.REPORT_KEYS):
+    """Returns the (before_agent_callback, after_agent_callback) pair that
+    puts `cache` in front of the coordinator.
+
+    The cached value is the sub-agents' reports ({report key: report}, the
+    shape batch.analyze_batch stores too), not the coordinator's reply,
+    which only covers its last turn. The before
+    callback answers a fully specified request (see `parse_request`) from
+    the cache, restoring the reports to state, and skips the agent. On a
+    miss the request is kept in session state, and the after callback of
+    whichever turn completes all `report_keys` for it stores them.
+    """
+
+    def reports_for(state, ticker):
+        reports = {}
+        for key in report_keys:
+            # With report compaction each ticker's report has its own key.
+            report = state.get(compaction.report_key(key, ticker)) or state.get(key)
+            if report:
+                reports[key] = report
+        return reports
+
+    def serve_cached_result(callback_context):
+        state = callback_context.state.to_dict()
+        request = parse_request(_request_text(callback_context), state)
+        if request is None:
+            return None
+        hit = cache.lookup(request)
+        if hit is None or not is_report_set(hit.value, report_keys):
+            # Reports already in state belong to an earlier request.
+            previous = {k: _digest(v) for k, v in reports_for(state, request.ticker).items()}
+            callback_context.state[PENDING_KEY] = {"request": list(request), "previous": previous}
+            return None
+        reports = {key: hit.value[key] for key in report_keys}
+        for key, report in reports.items():
+            callback_context.state[key] = report
+        text = _render_reports(reports)
+        callback_context.state[output_key] = text
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+    def store_result(callback_context):
+        pending = callback_context.state.get(PENDING_KEY)
+        if not pending:
+            return None
+        request = AdvisorRequest(*pending["request"])
+        reports = reports_for(callback_context.state, request.ticker)
+        if len(reports) == len(report_keys) and all(
+            _digest(report) != pending["previous"].get(key) for key, report in reports.items()
+        ):
+            cache.store(request, reports)
+            callback_context.state[PENDING_KEY] = None
+        return None
+
+    return serve_cached_result, store_result
+
+
+def enabled():
+    return os.environ.get("SEMANTIC_CACHE", "0") == "1"
+
+
+default_cache = SemanticCache()
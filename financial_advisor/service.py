@@ -0,0 +1,341 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Async job service for the deployment runners
+
+`POST /` enqueues a job on an in-process worker pool and answers at once
+with its ID; `GET /jobs/{id}` polls its status and result, and
+`GET /jobs/{id}/events` streams its agent events as server-sent events.
+`GET /metrics` exports the agent telemetry in Prometheus text format.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+DEFAULT_WORKERS = int(os.environ.get("SERVICE_WORKERS", 32))
+# Jobs waiting for a worker before POST / answers 429.
+MAX_PENDING_JOBS = int(os.environ.get("SERVICE_MAX_PENDING_JOBS", 1000))
+# Finished jobs kept for polling; the oldest are dropped first.
+RETAINED_JOBS = int(os.environ.get("SERVICE_RETAINED_JOBS", 1000))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """One unit of work, its result and the events it emitted so far."""
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self._updated = asyncio.Event()
+
+    @property
+    def done(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def emit(self, event):
+        self.events.append(event)
+        self._notify()
+
+    def _notify(self):
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def wait(self):
+        while not self.done:
+            await self._updated.wait()
+        return self
+
+    async def stream(self, start=0):
+        """Yields (index, event) from `start` on, then new events until the job is done."""
+        index = start
+        while True:
+            updated = self._updated
+            while index < len(self.events):
+                yield index, self.events[index]
+                index += 1
+            if self.done:
+                return
+            await updated.wait()
+
+    def to_dict(self, result=True):
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "events": len(self.events),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if result and self.done:
+            data["result"] = self.result
+            data["error"] = self.error
+        return data
+
+
+def _call_sync(func, *args):
+    # Runs in a worker thread; ib_insync and friends expect a current event loop.
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return func(*args)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+class JobQueue:
+    """Runs submitted jobs on `workers` asyncio tasks in arrival order.
+
+    Coroutine functions get the Job as first argument (to `emit` events);
+    plain functions run in a thread so they never block the event loop.
+    Workers start on the first `submit` (or `start()`).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=MAX_PENDING_JOBS, retain=RETAINED_JOBS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retain = retain
+        self.jobs = OrderedDict()
+        self.metrics = Counter()
+        self._queue = None
+        self._tasks = []
+
+    def _start_workers(self):
+        if not self._tasks:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def start(self):
+        self._start_workers()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind, func, *args, coalesce=False):
+        """Queues `func(*args)` and returns its Job.
+
+        With `coalesce`, a job of the same kind that is still queued is
+        returned instead of queueing another (e.g. repeated scan triggers).
+        Raises QueueFull when `max_pending` jobs are already waiting.
+        """
+        self._start_workers()
+        if coalesce:
+            for job in reversed(self.jobs.values()):
+                if job.kind == kind and job.status == QUEUED:
+                    self.metrics["coalesced"] += 1
+                    return job
+        if self._queue.qsize() >= self.max_pending:
+            self.metrics["rejected"] += 1
+            raise QueueFull(f"{self._queue.qsize()} jobs already waiting")
+        job = Job(kind)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((job, func, args))
+        self.metrics["submitted"] += 1
+        self._forget_finished()
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def _forget_finished(self):
+        excess = len(self.jobs) - self.retain
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done][:max(0, excess)]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job, func, args = await self._queue.get()
+            try:
+                await self._run(job, func, args)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job, func, args):
+        job.status = RUNNING
+        job.started_at = time.time()
+        job._notify()
+        try:
+            if inspect.iscoroutinefunction(func):
+                job.result = await func(job, *args)
+            else:
+                job.result = await asyncio.to_thread(_call_sync, func, *args)
+            job.status = SUCCEEDED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        job.finished_at = time.time()
+        self.metrics[job.status] += 1
+        job._notify()
+
+    def stats(self):
+        statuses = Counter(job.status for job in self.jobs.values())
+        return {
+            "workers": self.workers,
+            "queued": statuses[QUEUED],
+            "running": statuses[RUNNING],
+            "retained": len(self.jobs),
+            **self.metrics,
+        }
+
+
+def agent_job(agent, user_id="service"):
+    """Returns a job function that runs `agent` on a prompt in a fresh
+    session, emits every ADK event, and returns the final response text
+    with the agent's output_key value."""
+    # Here rather than at module level: the scanner and portfolio services
+    # use this module without any agent.
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from . import telemetry
+
+    if telemetry.enabled():
+        telemetry.instrument(agent)
+    runner = InMemoryRunner(agent=agent, app_name=agent.name)
+
+    async def run(job, prompt):
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=user_id
+        )
+        text = None
+        try:
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=session.id,
+                new_message=types.UserContent(parts=[types.Part(text=prompt)]),
+            ):
+                job.emit(event.model_dump(mode="json", exclude_none=True))
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = "".join(part.text or "" for part in event.content.parts)
+            session = await runner.session_service.get_session(
+                app_name=runner.app_name, user_id=user_id, session_id=session.id
+            )
+            output = session.state.get(agent.output_key) if agent.output_key else None
+        finally:
+            # Results live on the job; don't keep every session in memory.
+            await runner.session_service.delete_session(
+                app_name=runner.app_name, user_id=user_id, session_id=session.id
+            )
+        return {"text": text, "output": output}
+
+    return run
+
+
+def _sse(index, event, name="message"):
+    return f"id: {index}\nevent: {name}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def create_app(name, run, takes_prompt=True, workers=DEFAULT_WORKERS, coalesce=False):
+    """Builds the FastAPI app of one deployment runner.
+
+    `run` is a job function for `JobQueue.submit`; with `takes_prompt` it
+    also receives the `prompt` query parameter of `POST /`.
+    """
+    jobs = JobQueue(workers)
+
+    async def lifespan(app):
+        await jobs.start()
+        yield
+        await jobs.stop()
+
+    app = FastAPI(title=name, lifespan=lifespan)
+    app.state.jobs = jobs
+
+    def submit(*args):
+        try:
+            job = jobs.submit(name, run, *args, coalesce=coalesce)
+        except QueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        return job.to_dict(result=False)
+
+    if takes_prompt:
+        @app.post("/", status_code=202)
+        async def submit_prompt(prompt: str):
+            return submit(prompt)
+    else:
+        @app.post("/", status_code=202)
+        async def submit_job():
+            return submit()
+
+    def get_job(job_id):
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+        return job
+
+    @app.get("/jobs")
+    async def job_stats():
+        return jobs.stats()
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str, wait: float = 0):
+        """Job status; with `wait`, holds the request up to that many seconds for the result."""
+        job = get_job(job_id)
+        if wait > 0 and not job.done:
+            try:
+                await asyncio.wait_for(job.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return job.to_dict()
+
+    @app.get("/metrics")
+    async def metrics():
+        """Prometheus text of telemetry.default_recorder."""
+        # telemetry imports ADK, so services without agents never load it
+        # and have no agent calls to report.
+        telemetry = sys.modules.get("financial_advisor.telemetry")
+        text = telemetry.default_recorder.render_prometheus() if telemetry else ""
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    @app.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str, start: int = 0):
+        """Server-sent events: one `message` per agent event, then `done`
+        with the job status. Reconnect with `start` = last id + 1."""
+        job = get_job(job_id)
+
+        async def stream():
+            async for index, event in job.stream(start):
+                yield _sse(index, event)
+            yield _sse(len(job.events), job.to_dict(), name="done")
+
+        return StreamingResponse(
+            stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+        )
+
+    return app
@@ -0,0 +1,199 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic stand-ins for Gemini, for benchmarks and offline tests
+
+The agent modules take their model from `model_for`, so the whole agent
+graph can run offline:
+
+    ADVISOR_MODEL=stub ADVISOR_STUB_LATENCY=0.5 adk run financial_advisor
+    ADVISOR_MODEL=replay ADVISOR_REPLAY_FILE=session.jsonl adk run financial_advisor
+
+Replay files hold one {"agent": ..., "parts": [...]} line per model
+response; write one by hand or record a live run with ADVISOR_RECORD_FILE.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from . import telemetry
+
+MODEL_ENV = "ADVISOR_MODEL"  # "stub" or "replay"; unset means Gemini
+LATENCY_ENV = "ADVISOR_STUB_LATENCY"
+REPLAY_FILE_ENV = "ADVISOR_REPLAY_FILE"
+RECORD_FILE_ENV = "ADVISOR_RECORD_FILE"
+
+
+class StubLlm(BaseLlm):
+    """Answers every request after `latency` seconds without any network call.
+
+    Responses cycle through `responses` (default: a numbered placeholder);
+    an entry is a text, a `types.Part` (e.g. a function call) or a list of
+    parts. The model name looks like a Gemini one so built-in Gemini tools such as
+    google_search still accept it. `calls` counts the requests served.
+    """
+
+    model: str = "gemini-stub"
+    latency: float = 0.0
+    responses: list = []
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        call = self.calls
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = (
+            self.responses[self._response_index(llm_request, call) % len(self.responses)]
+            if self.responses
+            else f"Stub response #{call}."
+        )
+        if isinstance(response, str):
+            parts = [types.Part(text=response)]
+        elif isinstance(response, types.Part):
+            parts = [response]
+        else:
+            parts = list(response)
+        output = " ".join(part.text or "" for part in parts)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=_count_tokens(llm_request),
+                candidates_token_count=len(output.split()),
+            ),
+        )
+
+    def _response_index(self, llm_request, call):
+        return call - 1
+
+
+class ReplayLlm(StubLlm):
+    """Replays one agent's responses from a replay file.
+
+    The n-th model turn of a conversation gets the n-th response, counting
+    the model turns already in the request, so concurrent sessions each see
+    the script from the start. Responses recorded for pipeline clones
+    ("risk_analyst_AAPL_moderate" for "risk_analyst_agent") are included.
+    """
+
+    model: str = "gemini-replay"
+
+    @classmethod
+    def from_file(cls, path, agent_name, **kwargs):
+        return cls(responses=load_responses(path, agent_name), **kwargs)
+
+    def _response_index(self, llm_request, call):
+        return sum(1 for content in llm_request.contents if content.role == "model")
+
+
+def load_responses(path, agent_name):
+    """Reads `agent_name`'s responses (lists of Parts) from a replay file."""
+    stem = agent_name.removesuffix("_agent")
+    responses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            agent = record["agent"]
+            if agent == agent_name or agent.startswith(stem + "_"):
+                responses.append([types.Part.model_validate(part) for part in record["parts"]])
+    if not responses:
+        raise ValueError(f"{path} has no responses for {agent_name}")
+    return responses
+
+
+class ResponseRecorder:
+    """after_model_callback that appends every final response to a replay file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def after_model_callback(self, callback_context, llm_response):
+        if llm_response.partial or not llm_response.content:
+            return None
+        parts = []
+        for part in llm_response.content.parts or ():
+            part = part.model_dump(mode="json", exclude_none=True)
+            # ADK assigns fresh ids to function calls without one.
+            part.get("function_call", {}).pop("id", None)
+            parts.append(part)
+        line = json.dumps({"agent": callback_context.agent_name, "parts": parts})
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        return None
+
+
+def record_responses(agent, path):
+    """Records the responses of every LlmAgent reachable from `agent` to `path`."""
+    recorder = ResponseRecorder(path)
+
+    def install(agent):
+        if isinstance(agent, LlmAgent):
+            telemetry.add_callback(agent, "after_model_callback", recorder.after_model_callback)
+            for tool in agent.tools:
+                if isinstance(tool, AgentTool) and isinstance(tool.agent, BaseAgent):
+                    install(tool.agent)
+        for sub_agent in agent.sub_agents:
+            install(sub_agent)
+
+    install(agent)
+    return recorder
+
+
+def model_for(agent_name, default):
+    """The model for `agent_name`: `default` unless ADVISOR_MODEL picks a fake one."""
+    backend = os.environ.get(MODEL_ENV, "").lower()
+    latency = float(os.environ.get(LATENCY_ENV, 0))
+    if backend in ("", "gemini"):
+        return default
+    if backend == "stub":
+        return StubLlm(latency=latency)
+    if backend == "replay":
+        path = os.environ.get(REPLAY_FILE_ENV)
+        if not path:
+            raise ValueError(f"{MODEL_ENV}=replay needs {REPLAY_FILE_ENV}")
+        return ReplayLlm.from_file(path, agent_name, latency=latency)
+    raise ValueError(f"Unknown {MODEL_ENV} {backend!r}; use stub or replay")
+
+
+def _part_text(part):
+    if part.function_call:
+        return json.dumps(part.function_call.args or {})
+    if part.function_response:
+        return json.dumps(part.function_response.response or {})
+    return part.text or ""
+
+
+def _count_tokens(llm_request):
+    """Rough whitespace token count of the instruction and contents."""
+    words = itertools.chain(
+        str(llm_request.config.system_instruction or "").split(),
+        *(
+            _part_text(part).split()
+            for content in llm_request.contents
+            for part in content.parts or ()
+        ),
+    )
+    return sum(1 for _ in words)
@@ -17,9 +17,11 @@
 from google.adk import Agent
 from google.adk.tools import google_search
 
-from . import prompt
+from financial_advisor.stub_model import model_for
 
-MODEL = "gemini-2.5-pro"
+from . import cache, prompt
+
+MODEL = model_for("data_analyst_agent", "gemini-2.5-pro")
 
 data_analyst_agent = Agent(
     model=MODEL,
@@ -27,4 +29,8 @@ data_analyst_agent = Agent(
     instruction=prompt.DATA_ANALYST_PROMPT,
     output_key="market_data_analysis_output",
     tools=[google_search],
+    # google_search runs server-side as Gemini grounding, so whole reports
+    # are cached per ticker instead of individual tool calls.
+    before_agent_callback=cache.serve_cached_report,
+    after_agent_callback=cache.store_report,
 )
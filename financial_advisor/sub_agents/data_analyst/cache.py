@@ -0,0 +1,165 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared cache of data_analyst_agent reports keyed by ticker and freshness window"""
+
+import contextvars
+import re
+import time
+
+from google.genai import types
+
+from financial_advisor.response_cache import FRESH, MISS, ResponseCache
+
+OUTPUT_KEY = "market_data_analysis_output"
+DEFAULT_MAX_DATA_AGE_DAYS = 7
+
+# Upper-case words that show up in requests but are not tickers.
+_NOT_TICKERS = {
+    "A", "I", "AI", "API", "CEO", "CFO", "COO", "CTO", "EPS", "ETF", "FAQ",
+    "GAAP", "IPO", "LLC", "NASDAQ", "NYSE", "OK", "P", "PE", "Q", "SEC",
+    "USA", "US", "USD", "YOY",
+}
+_EXPLICIT_TICKER = re.compile(
+    r"(?:provided_ticker|ticker(?:\s+symbol)?)\s*[:=]?\s*[\"']?\$?([A-Za-z]{1,5}(?:[.\-][A-Za-z])?)\b"
+    r"|\$([A-Za-z]{1,5}(?:[.\-][A-Za-z])?)\b"
+)
+_BARE_TICKER = re.compile(r"\b([A-Z]{1,5}(?:[.\-][A-Z])?)\b")
+# An explicit freshness window: "max_data_age_days: 3", "news no older than
+# 3 days", "at most 3 days old", "from the last 3 days". Other day counts in a
+# request ("plan for 30 days") are not a data age.
+_MAX_AGE = re.compile(
+    r"max_data_age_days\D{0,5}(\d+)"
+    r"|\b(?:no\s+older\s+than|at\s+most|not\s+older\s+than)\s+(\d+)\s*days?\b"
+    r"|\b(?:within|from|in)\s+the\s+(?:last|past)\s+(\d+)\s*days?\b",
+    re.IGNORECASE,
+)
+
+response_cache = ResponseCache.from_env("DATA_ANALYST_CACHE")
+
+# Set while a background refresh runs, so its lookup goes to the model.
+_bypass = contextvars.ContextVar("data_analyst_cache_bypass", default=False)
+# (invocation_id, agent_name) -> (cache key, report in state before the run,
+# start time) for runs whose new report should be stored. ADK skips the after
+# callback of a run that raised, so entries older than _PENDING_TTL_SECONDS
+# are dropped.
+_pending = {}
+_PENDING_TTL_SECONDS = 3600.0
+
+
+def normalize_ticker(ticker):
+    return ticker.strip().lstrip("$").upper().replace("-", ".")
+
+
+def extract_ticker(request, state=None):
+    """Returns the normalized ticker of a request, or None.
+
+    The ticker comes from `provided_ticker` in state or from the request
+    text; requests naming several candidate tickers have none.
+    """
+    ticker = (state or {}).get("provided_ticker")
+    if not ticker:
+        explicit = {m.group(1) or m.group(2) for m in _EXPLICIT_TICKER.finditer(request)}
+        candidates = explicit or {
+            word for word in _BARE_TICKER.findall(request) if word not in _NOT_TICKERS
+        }
+        if len(candidates) != 1:
+            return None
+        ticker = candidates.pop()
+    return normalize_ticker(ticker)
+
+
+def cache_key(request, state=None):
+    """Returns "data_analyst:<TICKER>:<N>d" for a request, or None if it
+    names no single ticker (see `extract_ticker`)."""
+    state = state or {}
+    ticker = extract_ticker(request, state)
+    if ticker is None:
+        return None
+    max_age = state.get("max_data_age_days")
+    if max_age is None:
+        match = _MAX_AGE.search(request)
+        max_age = int(next(filter(None, match.groups()))) if match else DEFAULT_MAX_DATA_AGE_DAYS
+    return f"data_analyst:{ticker}:{int(max_age)}d"
+
+
+def _request_text(callback_context):
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+async def _refresh(request):
+    from google.adk.runners import InMemoryRunner
+
+    from .agent import data_analyst_agent
+
+    _bypass.set(True)
+    runner = InMemoryRunner(agent=data_analyst_agent, app_name="data_analyst_refresh")
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="cache_refresh"
+    )
+    async for _ in runner.run_async(
+        user_id=session.user_id,
+        session_id=session.id,
+        new_message=types.UserContent(parts=[types.Part(text=request)]),
+    ):
+        pass
+
+
+def report_callbacks(ticker=None, output_key=OUTPUT_KEY):
+    """Returns the (before_agent_callback, after_agent_callback) pair.
+
+    The before callback answers from the cache and skips the model run; a
+    stale report is still served while a background run refreshes it. The
+    after callback caches the report the model just wrote to `output_key`.
+    Pass `ticker` for agents that analyse a fixed ticker (see
+    `financial_advisor.pipeline`) instead of reading it from the request.
+    """
+
+    def serve_cached_report(callback_context):
+        request = _request_text(callback_context)
+        if ticker is not None:
+            request = f"provided_ticker: {ticker}\n{request}"
+        key = cache_key(request, {} if ticker else callback_context.state.to_dict())
+        if key is None:
+            return None
+        if not _bypass.get():
+            lookup = response_cache.lookup(key)
+            if lookup.status != MISS:
+                if lookup.status != FRESH:
+                    response_cache.revalidate(key, lambda: _refresh(request))
+                callback_context.state[output_key] = lookup.value
+                return types.Content(role="model", parts=[types.Part(text=lookup.value)])
+        now = time.monotonic()
+        for stale in [k for k, entry in _pending.items() if now - entry[2] > _PENDING_TTL_SECONDS]:
+            _pending.pop(stale, None)
+        pending = (callback_context.invocation_id, callback_context.agent_name)
+        _pending[pending] = (key, callback_context.state.get(output_key), now)
+        return None
+
+    def store_report(callback_context):
+        pending = (callback_context.invocation_id, callback_context.agent_name)
+        key, previous, _ = _pending.pop(pending, (None, None, None))
+        report = callback_context.state.get(output_key)
+        # State is copied from the caller, so an unchanged value is an old report.
+        if key and report and report != previous:
+            response_cache.store(key, report)
+        return None
+
+    return serve_cached_report, store_report
+
+
+serve_cached_report, store_report = report_callbacks()
@@ -14,4 +14,14 @@
 
 """Execution_analyst_agent for finding the ideal execution strategy"""
 
-from .agent import execution_analyst_agent
+import importlib
+
+_AGENTS = {"execution_analyst_agent"}
+
+
+def __getattr__(name):
+    # Agents are built on first use, so importing a helper module of this
+    # package does not construct them (or import ADK).
+    if name in _AGENTS:
+        return getattr(importlib.import_module(f"{__name__}.agent"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -16,9 +16,11 @@
 
 from google.adk import Agent
 
+from financial_advisor.stub_model import model_for
+
 from . import prompt
 
-MODEL = "gemini-2.5-pro"
+MODEL = model_for("execution_analyst_agent", "gemini-2.5-pro")
 
 execution_analyst_agent = Agent(
     model=MODEL,
@@ -1,5 +1,5 @@
 
-from financial_advisor.connectors import ibkr_connector, gcp_sql_connector
+from financial_advisor.connectors import ibkr_connector, gcp_sql_connector, portfolio_snapshots
 
 class PortfolioManagerAgent:
     def __init__(self):
@@ -9,7 +9,7 @@ class PortfolioManagerAgent:
     def update_portfolio(self):
         """Fetches the portfolio from IBKR and stores it in the GCP SQL database."""
         print("Fetching portfolio from IBKR...")
-        portfolio = ibkr_connector.get_ibkr_portfolio()
+        accounts, portfolio = ibkr_connector.get_ibkr_accounts_and_portfolio()
         print("Portfolio fetched successfully.")
 
         print("Connecting to GCP SQL database...")
@@ -18,10 +18,26 @@ class PortfolioManagerAgent:
 
         print("Creating portfolio table if it doesn't exist...")
         gcp_sql_connector.create_portfolio_table(engine)
+        gcp_sql_connector.create_portfolio_snapshots_table(engine)
         print("Portfolio table created successfully.")
 
-        print("Upserting portfolio data...")
-        gcp_sql_connector.upsert_portfolio(engine, portfolio)
-        print("Portfolio data upserted successfully.")
+        print("Syncing portfolio data...")
+        positions = ibkr_connector.portfolio_rows(portfolio)
+        stats = gcp_sql_connector.sync_portfolio(engine, positions, accounts)
+        print(
+            f"Portfolio synced: {stats.written} of {stats.positions} positions written, "
+            f"{stats.deleted} closed positions removed."
+        )
+
+        # Keep the history for P&L curves, rolling old snapshots up to hourly
+        # and daily buckets about once an hour.
+        snapshot = portfolio_snapshots.record_snapshot(engine, positions.values())
+        print(f"Recorded snapshot of {snapshot.positions} positions.")
+        rollup = portfolio_snapshots.downsample_if_due(engine)
+        if rollup is not None:
+            print(
+                f"Downsampled snapshots: {rollup.rolled_up} rows rolled up "
+                f"into {rollup.written}."
+            )
 
         return "Portfolio updated successfully."
@@ -14,4 +14,14 @@
 
 """Risk Analysis Agent for providing the final risk evaluation"""
 
-from .agent import risk_analyst_agent
+import importlib
+
+_AGENTS = {"risk_analyst_agent", "structured_risk_analyst_agent"}
+
+
+def __getattr__(name):
+    # Agents are built on first use, so importing a helper module of this
+    # package does not construct them (or import ADK).
+    if name in _AGENTS:
+        return getattr(importlib.import_module(f"{__name__}.agent"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
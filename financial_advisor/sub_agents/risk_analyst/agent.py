@@ -16,13 +16,36 @@
 
 from google.adk import Agent
 
+from financial_advisor.schemas import RiskAssessment
+from financial_advisor.stub_model import model_for
+
 from . import prompt
+from .tools import portfolio_risk, store_portfolio_risk
 
-MODEL="gemini-2.5-pro"
+MODEL = model_for("risk_analyst_agent", "gemini-2.5-pro")
 
 risk_analyst_agent = Agent(
     model=MODEL,
     name="risk_analyst_agent",
     instruction=prompt.RISK_ANALYST_PROMPT,
     output_key="final_risk_assessment_output",
+    # Risk numbers computed from the stored portfolio (risk_engine).
+    tools=[portfolio_risk],
 )
+
+# Structured-output variant: answers with RiskAssessment JSON, which ADK validates
+# and stores as a dict under the same output_key.
+structured_risk_analyst_agent = risk_analyst_agent.clone(update={
+    "instruction": (
+        prompt.RISK_ANALYST_PROMPT
+        + prompt.RISK_ANALYST_STRUCTURED_OUTPUT
+        + prompt.RISK_ANALYST_PRECOMPUTED_METRICS
+    ),
+    "output_schema": RiskAssessment,
+    # With tools ADK would not send the schema; the metrics are precomputed.
+    "tools": [],
+    "before_agent_callback": store_portfolio_risk,
+    # ADK requires this with output_schema; clone() skips its validator.
+    "disallow_transfer_to_parent": True,
+    "disallow_transfer_to_peers": True,
+})
@@ -36,6 +36,14 @@ Long-term (months to years)). This impacts timeframe relevance, review frequency
 user_execution_preferences: User-defined preferences regarding execution (e.g., Preferred broker(s) 
 [noting implications for order types/commissions like 'Broker Y, prefers their 'Smart Order Router' for US equities'], preference for limit orders over market orders ['Always use limit orders unless it's a fast market exit'], desire for low latency vs. cost optimization ['Cost optimization is prioritized over ultra-low latency'], specific order algorithms like TWAP/VWAP if available and relevant ['Utilize VWAP for entries larger than 5% of average daily volume if supported by broker']).
 
+* Portfolio Risk Metrics (tool: portfolio_risk):
+
+Call portfolio_risk once before writing (confidence 0.95, or 0.99 for conservative users; horizon_days matching the 
+user_investment_period, e.g. 1 for intraday, 10 for short-term, 21 for longer periods). It returns VaR and CVaR, volatility, 
+maximum drawdown, betas, concentration and correlation computed from the user's actual portfolio. Quote these numbers 
+where they bear on a risk (e.g. whether the new strategy adds to the largest risk contributors or to highly correlated 
+holdings). If it returns an error, say that portfolio metrics were unavailable and continue without them; never invent them.
+
 * Requested Output Structure: Comprehensive Risk Analysis Report
 
 The analysis must cover, but is not limited to, the following sections. Ensure each section directly references and integrates 
@@ -126,3 +134,20 @@ Provide critical considerations or trade-offs the user must accept if they proce
 
 
 """
+
+# Appended in structured-output mode (see financial_advisor.schemas), where the
+# answer must match the RiskAssessment JSON schema instead of a markdown report.
+RISK_ANALYST_STRUCTURED_OUTPUT = """
+Structured Output Mode: Respond only with a JSON object matching the response schema; no markdown.
+Score every identified risk category from 1 (negligible) to 10 (severe) with its rationale and mitigation,
+give an overall_score on the same scale, state whether the plan is aligned with the user's risk attitude,
+and condense the concluding discussion into the summary.
+"""
+
+# Replaces the portfolio_risk tool in structured-output mode: ADK only sends the
+# response schema to the model when the agent has no tools, so the metrics are
+# computed beforehand (tools.store_portfolio_risk) and injected here.
+RISK_ANALYST_PRECOMPUTED_METRICS = """
+Portfolio Risk Metrics: portfolio_risk has already been called for you (confidence 0.95, horizon_days 1); do not call
+any tools. Its result: {portfolio_risk_metrics?}
+"""
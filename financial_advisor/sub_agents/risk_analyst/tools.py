@@ -0,0 +1,175 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""portfolio_risk tool: risk metrics of the stored portfolio for the risk analyst"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+from financial_advisor import risk_engine
+from financial_advisor.connectors import gcp_sql_connector, portfolio_snapshots
+
+# Position whose returns are the market for betas; betas are to the
+# portfolio itself when it is not held.
+BENCHMARK_SYMBOL = os.environ.get("RISK_BENCHMARK_SYMBOL", "SPY")
+LOOKBACK_DAYS = int(os.environ.get("RISK_LOOKBACK_DAYS", 5 * 365))
+# The pipeline runs one risk analyst per ticker and risk attitude. Calls
+# with the same arguments that overlap share one computation, and its
+# result is reused for this long.
+TTL_SECONDS = float(os.environ.get("RISK_METRICS_TTL_SECONDS", 300))
+# Session state key of the metrics precomputed for the structured variant.
+STATE_KEY = "portfolio_risk_metrics"
+
+_lock = threading.Lock()
+_cache = {}
+# key -> concurrent.futures.Future of the computation in flight.
+_inflight = {}
+
+
+def load_positions(engine):
+    """{con_id: (symbol, market value)} summed over accounts, plus the account names."""
+    c = gcp_sql_connector.portfolio_table.c
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(c.account_name, c.con_id, c.symbol, c.market_value)
+        ).all()
+    positions, accounts = {}, set()
+    for account_name, con_id, symbol, market_value in rows:
+        accounts.add(account_name)
+        _, total = positions.get(con_id, (symbol, 0.0))
+        positions[con_id] = (symbol, total + (market_value or 0.0))
+    return positions, sorted(accounts)
+
+
+def load_returns(engine, accounts, con_ids, lookback_days=LOOKBACK_DAYS):
+    """(days - 1) x len(con_ids) daily returns from the portfolio snapshots.
+
+    A position held in several accounts takes its prices from the first
+    account with a snapshot that day.
+    """
+    start = time.time() - lookback_days * portfolio_snapshots.DAY
+    columns = {con_id: i for i, con_id in enumerate(con_ids)}
+    series = [portfolio_snapshots.daily_prices(engine, a, start, con_ids) for a in accounts]
+    days = np.unique(np.concatenate([s[0] for s in series])) if series else np.array([])
+    prices = np.full((len(days), len(con_ids)), np.nan)
+    for account_days, account_ids, account_prices in series:
+        rows = np.searchsorted(days, account_days)
+        for j, con_id in enumerate(account_ids.tolist()):
+            column = prices[rows, columns[con_id]]
+            prices[rows, columns[con_id]] = np.where(np.isnan(column), account_prices[:, j], column)
+    return risk_engine.returns_from_prices(prices)
+
+
+def compute_portfolio_risk(engine, confidence, horizon_days, lookback_days=LOOKBACK_DAYS):
+    """risk_engine.analyze(...).summary() for the stored portfolio, or {"error": ...}."""
+    positions, accounts = load_positions(engine)
+    positions = {con_id: p for con_id, p in positions.items() if p[1]}
+    if not positions:
+        return {"error": "The portfolio is empty; run the portfolio manager first."}
+    con_ids = list(positions)
+    returns = load_returns(engine, accounts, con_ids, lookback_days)
+    if len(returns) < 2:
+        return {"error": "Not enough daily portfolio snapshots to estimate risk yet."}
+    symbols = [positions[con_id][0] for con_id in con_ids]
+    market = None
+    if BENCHMARK_SYMBOL in symbols:
+        market = returns[:, symbols.index(BENCHMARK_SYMBOL)]
+    metrics = risk_engine.analyze(
+        [positions[con_id][1] for con_id in con_ids],
+        returns,
+        symbols=symbols,
+        market_returns=market,
+        benchmark=BENCHMARK_SYMBOL if market is not None else None,
+        confidence=confidence,
+        horizon_days=horizon_days,
+    )
+    return metrics.summary()
+
+
+async def portfolio_risk(confidence: float = 0.95, horizon_days: int = 1) -> dict:
+    """Computes risk metrics of the user's current portfolio from the stored
+    positions and their daily price history.
+
+    Returns historical and parametric VaR and CVaR (percent of gross exposure
+    and dollars), annualized volatility, maximum drawdown, betas, the
+    largest positions and risk contributors, concentration (Herfindahl
+    index, effective number of positions) and the most correlated pairs.
+
+    Args:
+      confidence: VaR/CVaR confidence level between 0.5 and 0.999, e.g. 0.95 or 0.99.
+      horizon_days: holding period in trading days for VaR/CVaR.
+    """
+    if not 0.5 <= confidence < 1:
+        return {"error": "confidence must be between 0.5 and 0.999."}
+    horizon_days = max(int(horizon_days), 1)
+    key = (round(confidence, 4), horizon_days)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < TTL_SECONDS:
+            return cached[1]
+        future = _inflight.get(key)
+        computing = future is None
+        if computing:
+            # A concurrent.futures.Future, so callers on any thread or event
+            # loop can wait for it.
+            future = _inflight[key] = concurrent.futures.Future()
+    if not computing:
+        return await asyncio.wrap_future(future)
+    try:
+        try:
+            # SQL reads and NumPy work run in a thread, off the event loop.
+            result = await asyncio.to_thread(
+                lambda: compute_portfolio_risk(
+                    gcp_sql_connector.get_gcp_sql_engine(), confidence, horizon_days
+                )
+            )
+        except Exception as e:  # missing credentials, unreachable database, ...
+            # Shared with the calls waiting on this one but not cached, so
+            # the next call retries.
+            result = {"error": f"Portfolio data unavailable ({type(e).__name__}: {e})."}
+        else:
+            with _lock:
+                _cache[key] = (time.monotonic(), result)
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        # The calls waiting on this one were not cancelled themselves.
+        future.set_result({"error": "Portfolio risk computation was interrupted; try again."})
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            del _inflight[key]
+
+
+async def store_portfolio_risk(callback_context):
+    """before_agent_callback: puts the default portfolio_risk result into
+    state under STATE_KEY, for the structured variant, which answers in a
+    single schema-constrained call instead of calling tools."""
+    callback_context.state[STATE_KEY] = json.dumps(await portfolio_risk())
+    return None
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
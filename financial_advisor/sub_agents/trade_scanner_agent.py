@@ -1,11 +1,28 @@
-
+import datetime
 import os
-from financial_advisor.connectors import web_scraper_connector, gcp_sql_connector
+from collections import Counter
+
+from financial_advisor import insider_signals
+from financial_advisor.connectors import web_scraper_connector, gcp_sql_connector, trade_records
+from financial_advisor.connectors import trade_store
+from financial_advisor.connectors.trade_watermark import TradeWatermark
+
+WATERMARK_SOURCE = "openinsider:latest-insider-buys"
 
 class TradeScannerAgent:
-    def __init__(self):
+    def __init__(self, store=None, signals=None):
         self.name = "trade_scanner"
         self.description = "Scans for insider trades and stores them in the database."
+        self.watermark = None
+        self.last_stats = None
+        # Cumulative new/skipped row counts across scans of this instance.
+        self.metrics = Counter()
+        # Optional local columnar copy of the ingested trades for offline analytics.
+        self.store = store if store is not None else trade_store.default_store()
+        # Insider buying signals over the trailing window, seeded on the first
+        # scan and updated with every batch of new trades.
+        self.signals = signals if signals is not None else insider_signals.InsiderSignalEngine()
+        self.last_signals = []
 
     def scan_and_store_trades(self):
         """Fetches insider trades and stores them in the database."""
@@ -13,13 +30,13 @@ class TradeScannerAgent:
         insider_trades = web_scraper_connector.get_insider_trades()
         print(f"Found {len(insider_trades)} insider trades.")
 
-        # Rename 'value' key to 'transaction_value' to avoid SQL keyword conflicts.
-        for trade in insider_trades:
-            if 'value' in trade:
-                trade['transaction_value'] = trade.pop('value')
+        # Parse money, share counts and dates into typed rows for the bulk insert.
+        batch = trade_records.normalize_trades(insider_trades)
+        for reject in batch.rejects:
+            print(f"Skipping malformed trade #{reject.index}: {reject.reason}")
 
         # The web scraper now only gets buys, but we can keep this filter for safety.
-        insider_buys = [trade for trade in insider_trades if trade.get('transaction_type') == 'Buy']
+        insider_buys = batch.rows(transaction_type='Buy')
 
         print("Connecting to GCP SQL database...")
         engine = gcp_sql_connector.get_gcp_sql_engine()
@@ -27,11 +44,49 @@ class TradeScannerAgent:
 
         print("Creating tables if they don't exist...")
         gcp_sql_connector.create_insider_trades_table(engine)
+        gcp_sql_connector.create_ingestion_watermarks_table(engine)
         print("Tables created successfully.")
 
-        if insider_buys:
+        if self.watermark is None:
+            self.watermark = TradeWatermark.from_stored(
+                *gcp_sql_connector.load_watermark(engine, WATERMARK_SOURCE)
+            )
+            if not len(self.signals):
+                horizon = datetime.date.today() - datetime.timedelta(
+                    days=self.signals.window_days - 1
+                )
+                self.signals.update(insider_signals.load_buys(engine, horizon, self.store))
+        new_buys, stats = self.watermark.filter_new(insider_buys)
+        self.last_stats = stats
+        self.metrics.update(stats._asdict())
+        print(
+            f"{stats.new} new insider trades, {stats.skipped_seen} already seen, "
+            f"{stats.skipped_stale} older than the high-water mark."
+        )
+
+        if new_buys:
             print("Upserting insider trades...")
-            gcp_sql_connector.upsert_insider_trades(engine, insider_buys)
-            print("Insider trades upserted successfully.")
+            upsert_stats = gcp_sql_connector.upsert_insider_trades(engine, new_buys)
+            print(
+                f"Upserted {upsert_stats.rows} insider trades in {upsert_stats.batches} batches "
+                f"({upsert_stats.rows_per_second:,.0f} rows/sec)."
+            )
+            if self.store is not None:
+                self.store.append(new_buys)
+                if self.store.segment_count() > trade_store.MAX_SEGMENTS:
+                    removed = self.store.compact()
+                    print(f"Compacted the trade store ({removed} duplicate trades removed).")
+            self.last_signals = self.signals.update(new_buys)
+            for signal in self.last_signals:
+                if signal.cluster:
+                    print(
+                        f"Cluster buy: {signal.ticker}, {signal.insiders} insiders, "
+                        f"${signal.dollars:,.0f} in {self.signals.window_days} days "
+                        f"(score {signal.score:.1f})."
+                    )
+            self.watermark.advance(new_buys)
+            gcp_sql_connector.save_watermark(
+                engine, WATERMARK_SOURCE, *self.watermark.to_stored()
+            )
 
         return "Trade scanning and storing completed successfully."
@@ -16,9 +16,12 @@
 
 from google.adk import Agent
 
+from financial_advisor.schemas import TradingStrategies
+from financial_advisor.stub_model import model_for
+
 from . import prompt
 
-MODEL="gemini-2.5-pro"
+MODEL = model_for("trading_analyst_agent", "gemini-2.5-pro")
 
 trading_analyst_agent = Agent(
     model=MODEL,
@@ -26,3 +29,13 @@ trading_analyst_agent = Agent(
     instruction=prompt.TRADING_ANALYST_PROMPT,
     output_key="proposed_trading_strategies_output",
 )
+
+# Structured-output variant: answers with TradingStrategies JSON, which ADK validates
+# and stores as a dict under the same output_key.
+structured_trading_analyst_agent = trading_analyst_agent.clone(update={
+    "instruction": prompt.TRADING_ANALYST_PROMPT + prompt.TRADING_ANALYST_STRUCTURED_OUTPUT,
+    "output_schema": TradingStrategies,
+    # ADK requires this with output_schema; clone() skips its validator.
+    "disallow_transfer_to_parent": True,
+    "disallow_transfer_to_peers": True,
+})
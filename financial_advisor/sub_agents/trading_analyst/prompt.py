@@ -108,4 +108,14 @@ Financial markets are subject to risks, and past performance is not indicative o
 You should conduct your own thorough research and consult with a qualified independent financial advisor before making any investment decisions.
 By using this tool and reviewing these strategies, you acknowledge that you understand this disclaimer and agree that 
 Google and its affiliates are not liable for any losses or damages arising from your use of or reliance on this information.
-"""
\ No newline at end of file
+"""
+
+# Appended in structured-output mode (see financial_advisor.schemas), where the
+# answer must match the TradingStrategies JSON schema instead of a markdown report.
+TRADING_ANALYST_STRUCTURED_OUTPUT = """
+Structured Output Mode: Respond only with a JSON object matching the response schema; no markdown.
+For every strategy give the direction, an entry_price with its entry_condition, a stop_loss, a take_profit
+target and the position size as a percentage of the portfolio (position_size_pct), sized for the user's risk attitude.
+For long strategies the stop_loss is below and the take_profit above the entry_price; for short strategies the reverse.
+Put the reasoning you would write in the report into each strategy's rationale.
+"""
@@ -0,0 +1,433 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-agent model/tool latency and token metrics from ADK callbacks"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+
+import numpy as np
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.tools.agent_tool import AgentTool
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+# Written into session state by the first model or tool call of a session:
+# the id of that invocation, which then identifies the session in records.
+# AgentTool copies the caller's state into the sub-agent's session, so calls
+# made by sub-agents are attributed to the user's session.
+SESSION_KEY = "telemetry_session_id"
+TRACE_FILE_ENV = "AGENT_TRACE_FILE"
+# ADK calls no after callback when a model or tool call raises; calls still
+# open after this long are ended as failed.
+IN_FLIGHT_TIMEOUT_SECONDS = float(os.environ.get("AGENT_TELEMETRY_CALL_TIMEOUT_SECONDS", 900))
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160)
+
+CallRecord = namedtuple(
+    "CallRecord",
+    [
+        "kind",  # "model" or "tool"
+        "session_id",
+        "agent",
+        "name",  # model or tool name
+        "latency",
+        "ttft",  # time to first (partial) response; model calls only
+        "prompt_tokens",
+        "output_tokens",
+        "cached_tokens",  # part of prompt_tokens served from a context cache
+    ],
+    defaults=(0,),
+)
+
+_tracer = trace.get_tracer("financial_advisor.telemetry")
+
+
+def _session_id(context):
+    state = context.state
+    session_id = state.get(SESSION_KEY)
+    if session_id is None:
+        session_id = context.invocation_id
+        state[SESSION_KEY] = session_id
+    return session_id
+
+
+def _end_failed(span, reason):
+    span.set_status(trace.Status(trace.StatusCode.ERROR, reason))
+    span.end()
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[int(np.searchsorted(LATENCY_BUCKETS, value))] += 1
+        self.total += value
+
+
+class Recorder:
+    """Collects CallRecords from the callbacks installed by `instrument`.
+
+    Keeps the last `max_records` calls for percentile reports, and
+    cumulative counters/histograms for `render_prometheus`. Every call also
+    becomes an OpenTelemetry span ("model <agent>" / "tool <name>"). A call
+    that raised gets no after callback; its span is ended with an error
+    status when the same agent starts another call in the invocation, or
+    after `call_timeout` seconds, and it is counted under "failed".
+    """
+
+    def __init__(self, max_records=10_000, call_timeout=IN_FLIGHT_TIMEOUT_SECONDS):
+        self.records = deque(maxlen=max_records)
+        self.call_timeout = call_timeout
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._counters = defaultdict(float)
+        self._histograms = defaultdict(_Histogram)
+
+    def _start(self, key, span, agent, name):
+        now = time.perf_counter()
+        with self._lock:
+            expired = [
+                k for k, call in self._in_flight.items()
+                if k == key or now - call[0] > self.call_timeout
+            ]
+            calls = [(k, self._in_flight.pop(k)) for k in expired]
+            self._in_flight[key] = [now, None, span, name, agent]
+            for k, call in calls:
+                self._counters[("failed", k[0], call[4], call[3] or "")] += 1
+        for _, call in calls:
+            _end_failed(call[2], "no response")
+
+    # --- ADK callbacks -------------------------------------------------
+
+    def before_model(self, callback_context, llm_request):
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        span = _tracer.start_span(
+            f"model {callback_context.agent_name}",
+            attributes={
+                "agent": callback_context.agent_name,
+                "model": llm_request.model or "",
+                "session_id": _session_id(callback_context),
+            },
+        )
+        self._start(key, span, callback_context.agent_name, llm_request.model)
+        return None
+
+    def after_model(self, callback_context, llm_response):
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        call = self._in_flight.get(key)
+        if call is None:
+            return None
+        now = time.perf_counter()
+        if call[1] is None:
+            call[1] = now - call[0]
+        if llm_response.partial:
+            return None
+        with self._lock:
+            self._in_flight.pop(key, None)
+        usage = llm_response.usage_metadata
+        record = CallRecord(
+            "model",
+            _session_id(callback_context),
+            callback_context.agent_name,
+            call[3] or "",
+            now - call[0],
+            call[1],
+            (usage.prompt_token_count or 0) if usage else 0,
+            (usage.candidates_token_count or 0) if usage else 0,
+            (usage.cached_content_token_count or 0) if usage else 0,
+        )
+        span = call[2]
+        span.set_attribute("latency_s", record.latency)
+        span.set_attribute("ttft_s", record.ttft)
+        span.set_attribute("prompt_tokens", record.prompt_tokens)
+        span.set_attribute("output_tokens", record.output_tokens)
+        span.set_attribute("cached_tokens", record.cached_tokens)
+        span.end()
+        self.add(record)
+        return None
+
+    def before_tool(self, tool, args, tool_context):
+        key = ("tool", tool_context.function_call_id or id(tool_context))
+        span = _tracer.start_span(
+            f"tool {tool.name}",
+            attributes={
+                "agent": tool_context.agent_name,
+                "tool": tool.name,
+                "session_id": _session_id(tool_context),
+            },
+        )
+        self._start(key, span, tool_context.agent_name, tool.name)
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        key = ("tool", tool_context.function_call_id or id(tool_context))
+        with self._lock:
+            call = self._in_flight.pop(key, None)
+        if call is None:
+            return None
+        record = CallRecord(
+            "tool", _session_id(tool_context), tool_context.agent_name,
+            tool.name, time.perf_counter() - call[0], None, 0, 0,
+        )
+        call[2].set_attribute("latency_s", record.latency)
+        call[2].end()
+        self.add(record)
+        return None
+
+    # --- aggregation ---------------------------------------------------
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+            labels = (record.kind, record.agent, record.name)
+            self._counters[("calls",) + labels] += 1
+            self._counters[("prompt_tokens",) + labels] += record.prompt_tokens
+            self._counters[("output_tokens",) + labels] += record.output_tokens
+            self._counters[("cached_tokens",) + labels] += record.cached_tokens
+            self._histograms[("latency",) + labels].observe(record.latency)
+            if record.ttft is not None:
+                self._histograms[("ttft",) + labels].observe(record.ttft)
+
+    def report(self, kind="model"):
+        """Per-agent summary rows (see `summarize`) of the retained records."""
+        with self._lock:
+            records = list(self.records)
+        return summarize(records, kind)
+
+    def sessions(self):
+        """{session_id: {agent: {"calls", "prompt_tokens", "output_tokens", "seconds"}}}."""
+        totals = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            agent = totals[record.session_id][record.agent]
+            agent["calls"] += 1
+            agent["prompt_tokens"] += record.prompt_tokens
+            agent["output_tokens"] += record.output_tokens
+            agent["seconds"] += record.latency
+        return totals
+
+    def render_prometheus(self):
+        """Prometheus text exposition of the cumulative metrics."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, list(h.counts), h.total) for key, h in self._histograms.items()
+            )
+        names = {
+            "calls": ("adk_calls_total", "Model and tool calls."),
+            "prompt_tokens": ("adk_prompt_tokens_total", "Prompt tokens sent to the model."),
+            "output_tokens": ("adk_output_tokens_total", "Tokens generated by the model."),
+            "cached_tokens": ("adk_cached_tokens_total", "Prompt tokens served from a context cache."),
+            "failed": ("adk_failed_calls_total", "Model and tool calls that raised or never returned."),
+        }
+        for metric, (name, help_text) in names.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (kind, *labels), value in counters:
+                if kind == metric:
+                    lines.append(f"{name}{{{_labels(*labels)}}} {value:g}")
+        for metric, help_text in (
+            ("latency", "Wall time of model and tool calls."),
+            ("ttft", "Time to the first model response chunk."),
+        ):
+            name = f"adk_call_{metric}_seconds"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (kind, *labels), counts, total in histograms:
+                if kind != metric:
+                    continue
+                label_text = _labels(*labels)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{label_text}}} {total:g}")
+                lines.append(f"{name}_count{{{label_text}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(kind, agent, name):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+    return f'kind="{kind}",agent="{escape(agent)}",name="{escape(name)}"'
+
+
+def summarize(records, kind="model"):
+    """Groups records by agent; returns rows with p50/p95 latency and token totals."""
+    by_agent = defaultdict(list)
+    for record in records:
+        if record.kind == kind:
+            by_agent[record.agent].append(record)
+    rows = []
+    for agent, calls in sorted(by_agent.items()):
+        latency = np.array([c.latency for c in calls])
+        ttft = np.array([c.ttft for c in calls if c.ttft is not None])
+        rows.append({
+            "agent": agent,
+            "calls": len(calls),
+            "latency_p50": float(np.percentile(latency, 50)),
+            "latency_p95": float(np.percentile(latency, 95)),
+            "ttft_p50": float(np.percentile(ttft, 50)) if len(ttft) else None,
+            "ttft_p95": float(np.percentile(ttft, 95)) if len(ttft) else None,
+            "seconds": float(latency.sum()),
+            "prompt_tokens": sum(c.prompt_tokens for c in calls),
+            "output_tokens": sum(c.output_tokens for c in calls),
+            "cached_tokens": sum(c.cached_tokens for c in calls),
+        })
+    return rows
+
+
+default_recorder = Recorder()
+
+
+def add_callback(agent, field, callback, first=False):
+    """Adds `callback` to one of `agent`'s callback fields, keeping existing ones."""
+    callbacks = getattr(agent, field) or []
+    if not isinstance(callbacks, list):
+        callbacks = [callbacks]
+    if callback not in callbacks:
+        callbacks = [callback, *callbacks] if first else [*callbacks, callback]
+        setattr(agent, field, callbacks)
+
+
+def instrument(agent, recorder=None):
+    """Adds the recorder's model/tool callbacks to every LlmAgent reachable
+    from `agent`, through sub_agents and AgentTools. Returns `agent`."""
+    recorder = recorder or default_recorder
+    if isinstance(agent, LlmAgent):
+        # Timing starts before any callback that may short-circuit the call.
+        add_callback(agent, "before_model_callback", recorder.before_model, first=True)
+        add_callback(agent, "before_tool_callback", recorder.before_tool, first=True)
+        add_callback(agent, "after_model_callback", recorder.after_model)
+        add_callback(agent, "after_tool_callback", recorder.after_tool)
+        for tool in agent.tools:
+            if isinstance(tool, AgentTool) and isinstance(tool.agent, BaseAgent):
+                instrument(tool.agent, recorder)
+    for sub_agent in agent.sub_agents:
+        instrument(sub_agent, recorder)
+    return agent
+
+
+def enabled():
+    return os.environ.get("AGENT_TELEMETRY", "1") != "0"
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Local OpenTelemetry exporter: appends one JSON object per span to `path`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = [
+            json.dumps({
+                "name": span.name,
+                "trace_id": f"{span.context.trace_id:032x}",
+                "span_id": f"{span.context.span_id:016x}",
+                "start_ns": span.start_time,
+                "end_ns": span.end_time,
+                "attributes": dict(span.attributes or {}),
+            })
+            for span in spans
+        ]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+def configure_tracing(path=None):
+    """Exports spans to a JSON lines file (AGENT_TRACE_FILE by default).
+
+    Installs an SDK TracerProvider when none is set yet; otherwise adds the
+    exporter to the existing one. Returns the exporter, or None without a path.
+    """
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    path = path or os.environ.get(TRACE_FILE_ENV)
+    if not path:
+        return None
+    exporter = JsonLinesSpanExporter(path)
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    return exporter
+
+
+def records_from_spans(path):
+    """Reads CallRecords back from a JsonLinesSpanExporter file."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            span = json.loads(line)
+            kind, _, name = span["name"].partition(" ")
+            attributes = span["attributes"]
+            if kind not in ("model", "tool") or "latency_s" not in attributes:
+                continue
+            records.append(CallRecord(
+                kind,
+                attributes.get("session_id", ""),
+                attributes.get("agent", ""),
+                attributes.get("model") or attributes.get("tool") or name,
+                attributes["latency_s"],
+                attributes.get("ttft_s"),
+                attributes.get("prompt_tokens", 0),
+                attributes.get("output_tokens", 0),
+                attributes.get("cached_tokens", 0),
+            ))
+    return records
+
+
+def format_report(rows, kind="model"):
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.0f}"
+
+    lines = [
+        f"{kind + ' calls by agent':<36} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'ttft50':>7} {'ttft95':>7} {'total s':>8} {'prompt tok':>11} {'cached tok':>11} {'output tok':>11}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['agent']:<36} {row['calls']:>6} {ms(row['latency_p50']):>8} "
+            f"{ms(row['latency_p95']):>8} {ms(row['ttft_p50']):>7} {ms(row['ttft_p95']):>7} "
+            f"{row['seconds']:>8.1f} {row['prompt_tokens']:>11,} {row['cached_tokens']:>11,} {row['output_tokens']:>11,}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="p50/p95 latency and tokens per agent.")
+    parser.add_argument("path", nargs="?", default=os.environ.get(TRACE_FILE_ENV),
+                        help=f"span file written by configure_tracing (default: ${TRACE_FILE_ENV})")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error(f"pass a span file or set {TRACE_FILE_ENV}")
+    records = records_from_spans(args.path)
+    print(format_report(summarize(records, "model"), "model"))
+    print()
+    print(format_report(summarize(records, "tool"), "tool"))
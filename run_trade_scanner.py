@@ -1,9 +1,25 @@
+import os
+import sys
+
 from financial_advisor.sub_agents.trade_scanner_agent import TradeScannerAgent
 from dotenv import load_dotenv
 
 def main():
     load_dotenv()
     agent = TradeScannerAgent()
+    if "--daemon" in sys.argv or os.environ.get("SCANNER_DAEMON") == "1":
+        # Long-running mode (the container default): scans on an adaptive
+        # schedule and serves POST /, GET /healthz and GET /metrics.
+        import uvicorn
+        from financial_advisor import scanner_daemon
+
+        daemon = scanner_daemon.ScannerDaemon(scan=scanner_daemon.agent_scan(agent))
+        uvicorn.run(
+            scanner_daemon.create_app(daemon),
+            host="0.0.0.0",
+            port=int(os.environ.get("PORT", 8080)),
+        )
+        return
     result = agent.scan_and_store_trades()
     print(result)
 
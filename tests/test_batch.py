@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from financial_advisor import batch
+from financial_advisor.batch import RateLimiter
+from financial_advisor.response_cache import ResponseCache
+from financial_advisor.stub_model import StubLlm
+from financial_advisor.sub_agents.data_analyst import cache as data_analyst_cache
+
+
+class _TrackingLlm(StubLlm):
+    active: int = 0
+    peak: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if "provided_ticker: FAIL" in str(llm_request.config.system_instruction):
+            raise RuntimeError("quota exhausted")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+        finally:
+            self.active -= 1
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_waits_for_the_sliding_window(self):
+        clock = _FakeClock()
+        limiter = RateLimiter(2, clock=clock, sleep=clock.sleep)
+
+        async def acquire(times):
+            stamps = []
+            for _ in range(times):
+                await limiter.acquire()
+                stamps.append(clock.now)
+            return stamps
+
+        self.assertEqual(asyncio.run(acquire(5)), [0, 0, 60, 60, 120])
+        self.assertEqual(limiter.waited, 120)
+
+
+class TestAnalyzeBatch(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(data_analyst_cache, "response_cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _collect(self, tickers, **kwargs):
+        async def run():
+            return [result async for result in batch.analyze_batch(tickers, **kwargs)]
+
+        return asyncio.run(run())
+
+    def test_bounded_concurrency_and_per_ticker_results(self):
+        model = _TrackingLlm(latency=0.01)
+
+        results = self._collect(["aapl", "MSFT", "NVDA", "AAPL"], concurrency=2, model=model)
+
+        self.assertEqual(sorted(r.ticker for r in results), ["AAPL", "MSFT", "NVDA"])
+        self.assertEqual(model.calls, 12)
+        self.assertEqual(model.peak, 2)
+        for result in results:
+            self.assertIsNone(result.error)
+            plan = result.outputs["plans"]["moderate"]
+            self.assertTrue(plan["final_risk_assessment_output"].startswith("Stub response"))
+
+    def test_failed_ticker_does_not_stop_the_batch(self):
+        results = self._collect(["FAIL", "AAPL"], model=_TrackingLlm())
+
+        errors = {r.ticker: r.error for r in results}
+        self.assertIsInstance(errors["FAIL"], RuntimeError)
+        self.assertIsNone(errors["AAPL"])
+
+    def test_model_calls_share_the_quota(self):
+        limiter_calls = []
+        original = RateLimiter.acquire
+
+        async def acquire(self):
+            limiter_calls.append(self.per_minute)
+            await original(self)
+
+        with patch.object(RateLimiter, "acquire", acquire):
+            self._collect(["AAPL", "MSFT"], requests_per_minute=100, model=StubLlm())
+
+        self.assertEqual(limiter_calls, [100] * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
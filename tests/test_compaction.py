@@ -0,0 +1,170 @@
+import asyncio
+import unittest
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from financial_advisor import compaction
+from financial_advisor.stub_model import StubLlm
+
+REPORT = """# AAPL market analysis
+
+Apple trades at 29x forward earnings. Revenue grew 5% year over year.
+
+## Key Levels
+- Support near $182.50 and resistance near $199.80.
+- The 200-day moving average sits at $176.
+
+## Proposed Strategies
+- **Pullback buying:** accumulate near support with a 7% stop.
+- **Covered calls:** sell 30-delta calls against the core position.
+
+## Risks
+- Concentration risk if AAPL exceeds 10% of the portfolio.
+- Regulatory risk around the App Store.
+"""
+
+
+class _RecordingLlm(StubLlm):
+    requests: list = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.requests.append(list(llm_request.contents))
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+def _call(name, **args):
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+
+class TestSummarizeReport(unittest.TestCase):
+    def test_extracts_levels_strategies_and_risks(self):
+        summary = compaction.summarize_report(REPORT, "report.md")
+
+        self.assertTrue(summary.overview.startswith("Apple trades at 29x forward earnings."))
+        self.assertEqual(summary.key_levels, [
+            "Support near $182.50 and resistance near $199.80.",
+            "The 200-day moving average sits at $176.",
+            "Pullback buying: accumulate near support with a 7% stop.",
+        ])
+        self.assertEqual(summary.strategies, [
+            "Pullback buying: accumulate near support with a 7% stop.",
+            "Covered calls: sell 30-delta calls against the core position.",
+        ])
+        self.assertEqual(len(summary.risks), 2)
+        self.assertIn("(Full report: report.md)", compaction.render_summary(summary))
+
+    def test_summary_is_bounded(self):
+        report = "\n".join(f"- Risk number {i}: " + "word " * 200 for i in range(50))
+
+        summary = compaction.summarize_report(report)
+
+        self.assertEqual(len(summary.risks), compaction.MAX_ITEMS)
+        self.assertTrue(all(len(r) <= compaction.MAX_ITEM_CHARS for r in summary.risks))
+        self.assertLess(len(compaction.render_summary(summary)), 2500)
+
+
+class TestCompactReports(unittest.TestCase):
+    def _coordinator(self, calls, reports=(REPORT,)):
+        analyst = LlmAgent(
+            name="risk_analyst_agent",
+            model=StubLlm(responses=list(reports)),
+            instruction="Assess.",
+            output_key="final_risk_assessment_output",
+        )
+        self.model = _RecordingLlm(requests=[], responses=[*calls, "Done."])
+        coordinator = compaction.compact_reports(LlmAgent(
+            name="financial_coordinator",
+            model=self.model,
+            instruction="Coordinate.",
+            tools=[AgentTool(agent=analyst)],
+        ))
+        self.runner = InMemoryRunner(agent=coordinator)
+
+    async def _run(self, artifact="final_risk_assessment_output_AAPL.md"):
+        session = await self.runner.session_service.create_session(
+            app_name=self.runner.app_name, user_id="u"
+        )
+        responses = []
+        async for event in self.runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=types.UserContent(parts=[types.Part(text="Assess AAPL")]),
+        ):
+            responses += [p.function_response for p in event.content.parts if p.function_response]
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id="u", session_id=session.id
+        )
+        artifact = await self.runner.artifact_service.load_artifact(
+            app_name=self.runner.app_name, user_id="u", session_id=session.id,
+            filename=artifact,
+        )
+        return responses, session.state, artifact
+
+    def _last_prompt_results(self):
+        return [
+            p.function_response.response for c in self.model.requests[-1] for p in c.parts or ()
+            if p.function_response and p.function_response.name == "risk_analyst_agent"
+        ]
+
+    def test_coordinator_gets_summaries_and_can_load_the_full_report(self):
+        self._coordinator([
+            _call("risk_analyst_agent", request="AAPL"),
+            _call("risk_analyst_agent", request="AAPL again"),
+            _call("load_full_report", report="final_risk_assessment_output"),
+        ])
+        responses, state, artifact = asyncio.run(self._run())
+
+        summary = responses[0].response
+        self.assertEqual(summary["full_report"], "final_risk_assessment_output_AAPL.md")
+        self.assertEqual(summary["ticker"], "AAPL")
+        self.assertEqual(len(summary["strategies"]), 2)
+        self.assertNotIn(REPORT, str(summary))
+        self.assertEqual(state["final_risk_assessment_output"].strip(), REPORT.strip())
+        self.assertIn("Key levels:", state["final_risk_assessment_output_AAPL_summary"])
+        self.assertEqual(artifact.text.strip(), REPORT.strip())
+        self.assertEqual(responses[2].response["report"].strip(), REPORT.strip())
+
+    def test_only_a_rerun_of_the_same_report_is_superseded(self):
+        self._coordinator([
+            _call("risk_analyst_agent", request="AAPL"),
+            _call("risk_analyst_agent", request="MSFT"),
+            _call("risk_analyst_agent", request="AAPL again"),
+        ])
+        asyncio.run(self._run())
+
+        results = self._last_prompt_results()
+        self.assertIn("Superseded", results[0]["result"])
+        self.assertEqual([r.get("ticker") for r in results[1:]], ["MSFT", "AAPL"])
+
+    def test_reports_of_earlier_tickers_stay_loadable(self):
+        msft_report = REPORT.replace("AAPL", "MSFT").replace("Apple", "Microsoft")
+        self._coordinator(
+            [
+                _call("risk_analyst_agent", request="AAPL"),
+                _call("risk_analyst_agent", request="MSFT"),
+                _call("load_full_report", report="final_risk_assessment_output", ticker="aapl"),
+                _call("load_full_report", report="final_risk_assessment_output_MSFT.md"),
+            ],
+            reports=(REPORT, msft_report),
+        )
+        responses, state, artifact = asyncio.run(self._run())
+
+        self.assertEqual(responses[2].response["report"].strip(), REPORT.strip())
+        self.assertEqual(responses[3].response["report"].strip(), msft_report.strip())
+        self.assertEqual(artifact.text.strip(), REPORT.strip())
+        self.assertEqual(state["final_risk_assessment_output"].strip(), msft_report.strip())
+
+    def test_empty_answers_pass_through(self):
+        self._coordinator([_call("risk_analyst_agent", request="AAPL")], reports=("",))
+        responses, state, artifact = asyncio.run(self._run())
+
+        self.assertNotIn("overview", responses[0].response)
+        self.assertIsNone(artifact)
+
+
+if __name__ == "__main__":
+    unittest.main()
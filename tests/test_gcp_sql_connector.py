@@ -0,0 +1,146 @@
+import datetime
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+
+from financial_advisor.connectors import gcp_sql_connector
+
+
+def _trade(i, value=1000):
+    return {
+        "ticker": f"T{i}",
+        "insider_name": f"Insider {i}",
+        "relationship": "CEO",
+        "transaction_date": datetime.date(2025, 8, 28),
+        "transaction_type": "Buy",
+        "transaction_value": value,
+        "shares": 100 + i,
+        "price_per_share": 10.0,
+    }
+
+
+class TestBulkUpsert(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        gcp_sql_connector.create_insider_trades_table(self.engine)
+        gcp_sql_connector.create_portfolio_table(self.engine)
+
+    def _count(self, table):
+        with self.engine.connect() as connection:
+            return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+    def test_upsert_insider_trades_batches_rows(self):
+        trades = [_trade(i) for i in range(25)]
+
+        stats = gcp_sql_connector.upsert_insider_trades(self.engine, trades, batch_size=10)
+
+        self.assertEqual(stats.rows, 25)
+        self.assertEqual(stats.batches, 3)
+        self.assertGreater(stats.rows_per_second, 0)
+        self.assertEqual(self._count("insider_trades"), 25)
+
+    def test_upsert_insider_trades_updates_existing_rows(self):
+        gcp_sql_connector.upsert_insider_trades(self.engine, [_trade(1)])
+        gcp_sql_connector.upsert_insider_trades(self.engine, [_trade(1, value=5000)])
+
+        with self.engine.connect() as connection:
+            value = connection.execute(
+                text("SELECT transaction_value FROM insider_trades")
+            ).scalar()
+        self.assertEqual(value, 5000)
+        self.assertEqual(self._count("insider_trades"), 1)
+
+    def test_upsert_portfolio(self):
+        position = {
+            "account_name": "DU123",
+            "con_id": 265598,
+            "symbol": "AAPL",
+            "quantity": 100,
+            "market_price": 200.0,
+            "market_value": 20000.0,
+            "average_cost": 150.0,
+            "unrealized_pnl": 5000.0,
+            "realized_pnl": 0.0,
+        }
+
+        gcp_sql_connector.upsert_portfolio(self.engine, [position])
+        gcp_sql_connector.upsert_portfolio(self.engine, [dict(position, quantity=150)])
+
+        with self.engine.connect() as connection:
+            quantity = connection.execute(text("SELECT quantity FROM portfolio")).scalar()
+        self.assertEqual(quantity, 150)
+
+    def test_empty_upsert_is_a_no_op(self):
+        stats = gcp_sql_connector.upsert_insider_trades(self.engine, [])
+
+        self.assertEqual((stats.rows, stats.batches), (0, 0))
+
+    def test_watermark_hashes_fit_a_busy_source(self):
+        ddl = str(CreateTable(gcp_sql_connector.ingestion_watermarks_table).compile(
+            dialect=mysql.dialect()
+        ))
+        self.assertIn("row_hashes MEDIUMTEXT", ddl)
+
+        gcp_sql_connector.create_ingestion_watermarks_table(self.engine)
+        hashes = "[" + ",".join(f'"{i:064x}"' for i in range(5000)) + "]"
+        gcp_sql_connector.save_watermark(self.engine, "openinsider", datetime.date(2025, 8, 28), hashes)
+        self.assertEqual(gcp_sql_connector.load_watermark(self.engine, "openinsider")[1], hashes)
+
+    def test_watermark_column_is_inspected_once_per_engine(self):
+        inspector = MagicMock()
+        inspector.get_columns.return_value = [{"name": "row_hashes", "type": mysql.MEDIUMTEXT()}]
+        with patch.object(self.engine.dialect, "name", "mysql"), \
+                patch.object(gcp_sql_connector.metadata, "create_all"), \
+                patch.object(gcp_sql_connector, "inspect", return_value=inspector) as inspect:
+            for _ in range(3):
+                gcp_sql_connector.create_ingestion_watermarks_table(self.engine)
+
+        inspect.assert_called_once_with(self.engine)
+
+
+class TestSharedEngine(unittest.TestCase):
+    def setUp(self):
+        gcp_sql_connector.dispose_engines()
+        gcp_sql_connector.clear_secret_cache()
+        self.secrets = {"db-password": "pw1", "db-host": "10.0.0.1"}
+        self.client = MagicMock()
+        self.client.access_secret_version.side_effect = self._access
+        patcher = patch.object(gcp_sql_connector, "_secret_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(gcp_sql_connector.dispose_engines)
+        self.addCleanup(gcp_sql_connector.clear_secret_cache)
+
+    def _access(self, name):
+        secret_id = name.split("/")[3]
+        response = MagicMock()
+        response.payload.data = self.secrets[secret_id].encode("UTF-8")
+        return response
+
+    @patch.dict(os.environ, {"GOOGLE_CLOUD_PROJECT": "test-project"})
+    def test_warm_calls_reuse_engine_without_secret_rpcs(self):
+        first = gcp_sql_connector.get_gcp_sql_engine()
+        second = gcp_sql_connector.get_gcp_sql_engine()
+
+        self.assertIs(first, second)
+        self.assertEqual(self.client.access_secret_version.call_count, 2)
+        self.assertTrue(first.pool._pre_ping)
+
+    @patch.dict(os.environ, {"GOOGLE_CLOUD_PROJECT": "test-project"})
+    def test_rotated_secret_rebuilds_engine(self):
+        first = gcp_sql_connector.get_gcp_sql_engine()
+        self.secrets["db-password"] = "pw2"
+
+        with patch.object(gcp_sql_connector, "SECRET_TTL_SECONDS", 0):
+            second = gcp_sql_connector.get_gcp_sql_engine()
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.url.password, "pw2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+import io
+import unittest
+
+from eventkit import Event
+from ib_insync import Contract, PnLSingle, PortfolioItem
+
+from financial_advisor.connectors.ibkr_stream import PortfolioStream
+
+
+def _item(symbol, con_id, position, price, account="DU1"):
+    return PortfolioItem(
+        contract=Contract(symbol=symbol, conId=con_id),
+        position=position,
+        marketPrice=price,
+        marketValue=position * price,
+        averageCost=100.0,
+        unrealizedPNL=0.0,
+        realizedPNL=0.0,
+        account=account,
+    )
+
+
+class FakeIB:
+    """Stands in for ib_insync.IB: same events, scripted portfolio."""
+
+    def __init__(self, portfolio=()):
+        self.updatePortfolioEvent = Event("updatePortfolioEvent")
+        self.pnlSingleEvent = Event("pnlSingleEvent")
+        self.disconnectedEvent = Event("disconnectedEvent")
+        self.items = list(portfolio)
+        self.connects = 0
+        self.disconnects = 0
+        self.pnl_requests = []
+        self.connect_errors = []
+
+    async def connectAsync(self, host, port, clientId):
+        self.connects += 1
+        if self.connect_errors:
+            raise self.connect_errors.pop(0)
+
+    def portfolio(self):
+        return list(self.items)
+
+    def reqPnLSingle(self, account, modelCode, conId):
+        self.pnl_requests.append((account, conId))
+
+    def disconnect(self):
+        self.disconnects += 1
+
+
+class TestPortfolioStream(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.batches = []
+        self.ib = FakeIB([_item("AAPL", 1, 10, 200.0), _item("MSFT", 2, 5, 400.0)])
+        self.stream = PortfolioStream(
+            ib=self.ib, sink=self.batches.append, debounce=0.05, reconnect_delay=0.01
+        )
+        await self.stream.start()
+
+    async def asyncTearDown(self):
+        await self.stream.stop()
+
+    async def test_seeds_book_and_subscribes_to_pnl(self):
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0]), 2)
+        self.assertEqual(sorted(self.ib.pnl_requests), [("DU1", 1), ("DU1", 2)])
+
+    async def test_only_changed_positions_are_flushed_in_one_batch(self):
+        await asyncio.sleep(0.1)
+        self.ib.updatePortfolioEvent.emit(_item("AAPL", 1, 10, 200.0))  # unchanged
+        self.ib.updatePortfolioEvent.emit(_item("MSFT", 2, 5, 401.0))
+        self.ib.updatePortfolioEvent.emit(_item("MSFT", 2, 5, 402.0))
+        self.ib.pnlSingleEvent.emit(
+            PnLSingle(account="DU1", conId=2, unrealizedPnL=12.5, realizedPnL=float("nan"))
+        )
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(self.batches), 2)
+        (row,) = self.batches[1]
+        self.assertEqual(row.symbol, "MSFT")
+        self.assertEqual(row.market_price, 402.0)
+        self.assertEqual(row.unrealized_pnl, 12.5)
+        self.assertEqual(row.realized_pnl, 0.0)
+
+    async def test_reconnects_after_disconnect(self):
+        self.ib.items.append(_item("NVDA", 3, 1, 100.0))
+
+        self.ib.disconnectedEvent.emit()
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(self.ib.connects, 2)
+        self.assertIn(("DU1", 3), self.stream.book)
+
+    async def test_position_closed_while_disconnected_is_dropped(self):
+        await asyncio.sleep(0.1)
+        del self.ib.items[1]  # MSFT sold during the outage
+
+        self.ib.disconnectedEvent.emit()
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(list(self.stream.book), [("DU1", 1)])
+        (row,) = self.batches[-1]
+        self.assertEqual((row.symbol, row.quantity, row.market_value), ("MSFT", 0.0, 0.0))
+        self.assertEqual(self.stream._closed, {})
+
+    async def test_unexpected_reconnect_errors_keep_backing_off(self):
+        self.ib.connect_errors = [RuntimeError("API error"), ValueError("bad reply")]
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.ib.disconnectedEvent.emit()
+            await asyncio.sleep(0.2)
+
+        self.assertEqual(self.ib.connects, 4)
+        self.assertIn("RuntimeError: API error", output.getvalue())
+        self.assertTrue(self.stream._reconnect_task.done())
+
+    async def test_stop_disconnects_when_the_last_flush_fails(self):
+        def failing_sink(rows):
+            raise OSError("database down")
+
+        stream = PortfolioStream(ib=FakeIB([_item("AAPL", 1, 10, 200.0)]), sink=failing_sink)
+        await stream.start()
+
+        with self.assertRaises(OSError):
+            await stream.stop()
+        self.assertEqual(stream.ib.disconnects, 1)
+        self.assertIsNone(stream._flush_handle)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import glob
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# Modules the lightweight services must not pay for at startup.
+HEAVY = ("google.adk", "google.genai", "vertexai", "google.cloud.aiplatform",
+         "google.cloud.secretmanager", "grpc", "ib_insync")
+# Lightweight entry points: modules that must stay unimported, and the
+# -X importtime budget in ms (sum of self times). They take ~0.9 s here, so
+# the budget leaves room for slow CI machines.
+BUDGETS = {
+    "run_trade_scanner.py": (HEAVY, 3000),
+    "run_portfolio_manager.py": (HEAVY, 3000),
+}
+# The analysts need ADK anyway; they only must not load the IBKR and
+# Secret Manager clients.
+ANALYSTS = ("run_data_analyst.py", "run_execution_analyst.py",
+            "run_risk_analyst.py", "run_trading_analyst.py")
+ANALYST_FORBIDDEN = ("ib_insync", "google.cloud.secretmanager")
+BUDGET_SCALE = float(os.environ.get("IMPORT_TIME_BUDGET_SCALE", 1))
+
+
+def _run(*names):
+    """Runs the entry points (without their __main__ block) in one cold
+    interpreter; returns {module: self us} from -X importtime."""
+    paths = [os.path.abspath(os.path.join(ROOT, "deployment", name)) for name in names]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import runpy\nfor path in {paths!r}: runpy.run_path(path)"],
+        capture_output=True, text=True, timeout=300,
+        env=dict(os.environ, PYTHONPATH=os.path.abspath(ROOT)),
+    )
+    if result.returncode:
+        raise AssertionError(result.stderr[-2000:])
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_us, _, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(self_us)
+    return modules
+
+
+def _loaded(modules, forbidden):
+    return sorted(m for m in modules if any(m == f or m.startswith(f + ".") for f in forbidden))
+
+
+class TestEntryPointImportTime(unittest.TestCase):
+    def test_every_entry_point_is_covered(self):
+        paths = glob.glob(os.path.join(ROOT, "deployment", "run_*.py"))
+        self.assertEqual({os.path.basename(p) for p in paths}, {*BUDGETS, *ANALYSTS})
+
+    def test_lightweight_services_stay_within_their_import_budget(self):
+        for name, (forbidden, budget_ms) in BUDGETS.items():
+            with self.subTest(name):
+                modules = _run(name)
+                self.assertEqual(_loaded(modules, forbidden)[:5], [])
+                self.assertLess(sum(modules.values()) / 1000, budget_ms * BUDGET_SCALE)
+
+    def test_analysts_do_not_load_the_ibkr_or_secret_clients(self):
+        self.assertEqual(_loaded(_run(*ANALYSTS), ANALYST_FORBIDDEN), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
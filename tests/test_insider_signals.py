@@ -0,0 +1,126 @@
+import datetime
+import random
+import unittest
+
+import numpy as np
+
+from financial_advisor import insider_signals
+from financial_advisor.insider_signals import InsiderSignalEngine, rolling_signals, score_tickers
+
+
+def _buy(ticker, insider, day, value=100_000, relationship="Dir", ownership_change=10.0):
+    return {
+        "ticker": ticker,
+        "insider_name": insider,
+        "relationship": relationship,
+        "transaction_date": datetime.date(2025, 8, 1) + datetime.timedelta(days=day),
+        "transaction_type": "Buy",
+        "transaction_value": value,
+        "shares": value // 10,
+        "price_per_share": 10.0,
+        "ownership_change": ownership_change,
+    }
+
+
+def _random_buys(count, seed=3):
+    rng = random.Random(seed)
+    return [
+        _buy(
+            f"T{rng.randrange(8)}",
+            f"Insider {rng.randrange(12)}",
+            rng.randrange(200),
+            value=rng.randint(1_000, 5_000_000),
+            relationship=rng.choice(["CEO", "Pres, CEO", "Dir", "10%", "VP", None]),
+            ownership_change=rng.choice([None, float("inf"), rng.uniform(0, 400)]),
+        )
+        for _ in range(count)
+    ]
+
+
+class TestWeights(unittest.TestCase):
+    def test_most_senior_role_wins(self):
+        self.assertEqual(insider_signals.role_weight("Pres, CEO"), 3.0)
+        self.assertEqual(insider_signals.role_weight("Dir, 10%"), 1.5)
+        self.assertEqual(insider_signals.role_weight("Chief Financial Officer"), 2.5)
+        self.assertEqual(insider_signals.role_weight("SVP"), insider_signals.OTHER_ROLE_WEIGHT)
+        self.assertEqual(insider_signals.role_weight(None), insider_signals.OTHER_ROLE_WEIGHT)
+
+    def test_holdings_factor_caps_new_positions_and_ignores_unknown(self):
+        factors = insider_signals.holdings_factors([np.nan, 0.0, 100.0, np.inf, 5000.0])
+        np.testing.assert_allclose(factors, [1, 1, 1 + np.log(2), 1 + np.log(11), 1 + np.log(11)])
+
+
+class TestSignals(unittest.TestCase):
+    def test_cluster_buy_needs_distinct_insiders_within_the_window(self):
+        buys = [
+            _buy("AAPL", "Cook", 1, relationship="CEO"),
+            _buy("AAPL", "Cook", 3, relationship="CEO"),
+            _buy("AAPL", "Levinson", 9),
+            _buy("MSFT", "Nadella", 0, relationship="CEO"),
+            _buy("MSFT", "Hood", 10, relationship="CFO"),
+        ]
+
+        signals = {s.ticker: s for s in score_tickers(buys, window_days=10)}
+
+        self.assertEqual((signals["AAPL"].trades, signals["AAPL"].insiders), (3, 2))
+        self.assertTrue(signals["AAPL"].cluster)
+        # Nadella's buy fell out of the 10-day window ending on day 10.
+        self.assertEqual((signals["MSFT"].trades, signals["MSFT"].insiders), (1, 1))
+        self.assertFalse(signals["MSFT"].cluster)
+        self.assertEqual(signals["AAPL"].dollars, 300_000)
+        self.assertEqual(list(signals), ["AAPL", "MSFT"])
+
+    def test_rolling_signals_match_a_brute_force_window(self):
+        trades = _random_buys(600)
+        buys = insider_signals.buys_from(trades)
+        weights = insider_signals.trade_weights(buys)
+
+        history = rolling_signals(trades, window_days=14)
+
+        window = np.timedelta64(14, "D")
+        for i in range(len(history["ticker"])):
+            day = history["date"][i]
+            in_window = (
+                (buys["ticker"] == history["ticker"][i])
+                & (buys["transaction_date"] <= day)
+                & (buys["transaction_date"] > day - window)
+            )
+            self.assertEqual(history["trades"][i], in_window.sum())
+            self.assertEqual(history["insiders"][i], len(set(buys["insider_name"][in_window])))
+            self.assertAlmostEqual(history["conviction"][i], weights[in_window].sum())
+
+    def test_sells_and_empty_input_are_ignored(self):
+        sell = dict(_buy("AAPL", "Cook", 0), transaction_type="Sell")
+
+        self.assertEqual(score_tickers([sell]), [])
+        self.assertEqual(len(rolling_signals([])["ticker"]), 0)
+
+
+class TestInsiderSignalEngine(unittest.TestCase):
+    def test_incremental_updates_match_a_full_rescore(self):
+        trades = sorted(_random_buys(800), key=lambda t: t["transaction_date"])
+        engine = InsiderSignalEngine(window_days=21)
+
+        for offset in range(0, len(trades), 40):
+            touched = engine.update(trades[offset:offset + 40])
+            self.assertTrue(touched)
+        engine.update(trades[-40:])
+
+        expected = score_tickers(trades, window_days=21)
+        self.assertEqual([s.ticker for s in engine.signals()], [s.ticker for s in expected])
+        for got, want in zip(engine.signals(), expected):
+            self.assertEqual((got.trades, got.insiders), (want.trades, want.insiders))
+            self.assertAlmostEqual(got.score, want.score)
+        self.assertLess(len(engine), len(trades) // 4)
+
+    def test_late_trades_outside_the_window_are_stale(self):
+        engine = InsiderSignalEngine(window_days=10)
+        engine.update([_buy("AAPL", "Cook", 30)])
+
+        self.assertEqual(engine.update([_buy("AAPL", "Levinson", 5)]), [])
+        self.assertEqual(engine.stale, 1)
+        self.assertEqual(engine.signals()[0].insiders, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
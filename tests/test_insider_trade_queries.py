@@ -0,0 +1,137 @@
+import datetime
+import unittest
+
+from sqlalchemy import create_engine, event, inspect, text
+
+from financial_advisor.connectors import gcp_sql_connector, insider_trade_queries
+from financial_advisor.connectors.insider_trade_queries import (
+    insider_history,
+    iter_rows,
+    latest_buys,
+    top_buys,
+)
+
+START = datetime.date(2025, 1, 1)
+
+
+def _trade(i, ticker=None, insider=None, transaction_type="Buy"):
+    return {
+        "ticker": ticker or f"T{i % 5}",
+        "insider_name": insider or f"Insider {i % 7}",
+        "relationship": "Dir",
+        "transaction_date": START + datetime.timedelta(days=i % 40),
+        "transaction_type": transaction_type,
+        # Few distinct values, so pages have to break ties on id.
+        "transaction_value": (i % 4) * 10_000,
+        "shares": 100 + i,
+        "price_per_share": 10.0,
+    }
+
+
+class TestInsiderTradeQueries(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        gcp_sql_connector.create_insider_trades_table(self.engine)
+        trades = [_trade(i) for i in range(300)]
+        trades.append(_trade(300, ticker="T1", transaction_type="Sell"))
+        trades.append(dict(_trade(301, ticker="T9"), transaction_value=None))
+        gcp_sql_connector.upsert_insider_trades(self.engine, trades)
+
+    def test_pages_walk_every_row_once_in_order(self):
+        rows = list(iter_rows(top_buys, self.engine, START, page_size=7))
+
+        self.assertEqual(len(rows), 300)
+        self.assertEqual(
+            [r["id"] for r in rows],
+            [r["id"] for r in sorted(rows, key=lambda r: (-r["transaction_value"], -r["id"]))],
+        )
+
+    def test_latest_buys_are_per_ticker_newest_first(self):
+        page = latest_buys(self.engine, "t1", limit=10)
+        rest = list(iter_rows(latest_buys, self.engine, "T1", page_size=10))
+
+        self.assertEqual(len(page.rows), 10)
+        self.assertEqual(page.cursor, (page.rows[-1]["transaction_date"], page.rows[-1]["id"]))
+        self.assertEqual(rest[:10], page.rows)
+        self.assertEqual(len(rest), 60)
+        self.assertEqual({r["ticker"] for r in rest}, {"T1"})
+        self.assertEqual({r["transaction_type"] for r in rest}, {"Buy"})
+        dates = [r["transaction_date"] for r in rest]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        since = latest_buys(self.engine, "T1", since=START + datetime.timedelta(days=35))
+        self.assertTrue(all(r["transaction_date"].day >= 5 for r in since.rows))
+        self.assertIsNone(since.cursor)
+
+    def test_top_buys_and_insider_history_filter_their_window(self):
+        end = START + datetime.timedelta(days=9)
+        window = list(iter_rows(top_buys, self.engine, START, end, page_size=50))
+        history = list(iter_rows(insider_history, self.engine, "Insider 3", page_size=8))
+
+        self.assertEqual(len(window), 80)
+        self.assertNotIn("T9", {r["ticker"] for r in iter_rows(top_buys, self.engine, START)})
+        self.assertTrue(all(r["transaction_date"] <= end for r in window))
+        self.assertEqual(len(history), len(range(3, 301, 7)))
+        self.assertEqual({r["insider_name"] for r in history}, {"Insider 3"})
+
+    def test_queries_use_their_index(self):
+        statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        cursor = latest_buys(self.engine, "T1", limit=5).cursor
+        latest_buys(self.engine, "T1", limit=5, cursor=cursor)
+        insider_history(self.engine, "Insider 3", limit=5)
+        cursor = top_buys(self.engine, START, START + datetime.timedelta(days=9), limit=5).cursor
+        top_buys(self.engine, START, START + datetime.timedelta(days=9), limit=5, cursor=cursor)
+        event.remove(self.engine, "before_cursor_execute", capture)
+
+        with self.engine.connect() as connection:
+            plans = [
+                " ".join(str(row[-1]) for row in connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                ))
+                for statement, parameters in statements
+            ]
+        self.assertIn(
+            "idx_trade_ticker_date (ticker=? AND transaction_type=? AND transaction_date>? "
+            "AND transaction_date<?)",
+            plans[1],
+        )
+        self.assertIn("idx_trade_insider_date", plans[2])
+        self.assertIn(
+            "idx_trade_value (transaction_type=? AND transaction_value>? AND transaction_value<?)",
+            plans[4],
+        )
+        self.assertNotIn("TEMP B-TREE", " ".join(plans))
+
+
+class TestIndexMigration(unittest.TestCase):
+    def test_indexes_are_added_to_an_existing_table(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE insider_trades (id INTEGER PRIMARY KEY, ticker VARCHAR(255), "
+                "insider_name VARCHAR(255), relationship VARCHAR(255), transaction_date DATE, "
+                "transaction_type VARCHAR(255), transaction_value BIGINT, shares BIGINT, "
+                "price_per_share FLOAT)"
+            ))
+
+        gcp_sql_connector.create_insider_trades_table(engine)
+
+        names = {index["name"] for index in inspect(engine).get_indexes("insider_trades")}
+        self.assertLessEqual(
+            {
+                "idx_trade_ticker_date",
+                "idx_trade_date",
+                "idx_trade_value",
+                "idx_trade_insider_date",
+            },
+            names,
+        )
+        self.assertEqual(insider_trade_queries.latest_buys(engine, "AAPL").rows, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
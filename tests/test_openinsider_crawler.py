@@ -0,0 +1,129 @@
+import asyncio
+import pathlib
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from financial_advisor.connectors import openinsider_crawler
+from financial_advisor.connectors.openinsider_crawler import OpenInsiderCrawler
+
+FIXTURE = (pathlib.Path(__file__).parent / "fixtures" / "openinsider_latest_buys.html").read_bytes()
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        hits = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path.startswith("/flaky") and hits == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path == "/throttled" and hits == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "3600")
+            self.end_headers()
+            return
+        if self.path == "/drifted":
+            body = FIXTURE.replace(b"Insider&nbsp;Name", b"Reporting&nbsp;Owner")
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(FIXTURE)))
+        self.end_headers()
+        self.wfile.write(FIXTURE)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOpenInsiderCrawler(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _FixtureHandler.hits.clear()
+
+    async def test_crawl_parses_and_deduplicates_pages(self):
+        urls = openinsider_crawler.latest_buys_urls(pages=3, base_url=self.base_url)
+
+        async with OpenInsiderCrawler(concurrency=3, rate_per_host=0) as crawler:
+            results = await crawler.crawl(urls)
+            trades = await crawler.crawl_trades(urls)
+
+        self.assertEqual([r.status for r in results], [200, 200, 200])
+        self.assertEqual(len(results[0].trades), 3)
+        self.assertEqual(len(trades), 3)
+
+    async def test_conditional_request_returns_cached_trades(self):
+        url = f"{self.base_url}/AAPL"
+
+        async with OpenInsiderCrawler(rate_per_host=0) as crawler:
+            first = await crawler.fetch(url)
+            second = await crawler.fetch(url)
+
+        self.assertEqual(first.status, 200)
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.trades, first.trades)
+
+    async def test_transient_errors_are_retried(self):
+        async with OpenInsiderCrawler(rate_per_host=0, backoff=0.01) as crawler:
+            result = await crawler.fetch(f"{self.base_url}/flaky")
+            missing = await crawler.fetch(f"{self.base_url}/missing")
+            drifted = await crawler.fetch(f"{self.base_url}/drifted")
+
+        self.assertEqual((result.status, result.attempts), (200, 2))
+        self.assertEqual((missing.status, missing.attempts), (404, 1))
+        self.assertEqual(drifted.trades, [])
+        self.assertIn("layout changed", drifted.error)
+
+    async def test_backoff_is_capped_and_frees_the_slot(self):
+        async with OpenInsiderCrawler(
+            concurrency=1, rate_per_host=0, max_retry_delay=0.3
+        ) as crawler:
+            throttled = asyncio.create_task(crawler.fetch(f"{self.base_url}/throttled"))
+            await asyncio.sleep(0.1)
+            # Fetched while the throttled request waits out its Retry-After.
+            other = await asyncio.wait_for(crawler.fetch(f"{self.base_url}/other"), 0.15)
+            result = await asyncio.wait_for(throttled, 1)
+
+        self.assertEqual(other.status, 200)
+        self.assertEqual((result.status, result.attempts), (200, 2))
+
+    def test_url_builders(self):
+        self.assertEqual(
+            openinsider_crawler.ticker_urls([" aapl"], base_url="http://x"),
+            ["http://x/screener?s=AAPL&cnt=100"],
+        )
+        self.assertEqual(
+            openinsider_crawler.cluster_buys_urls(base_url="http://x"),
+            ["http://x/latest-cluster-buys"],
+        )
+        self.assertEqual(
+            openinsider_crawler.latest_buys_urls(2, base_url="http://x"),
+            ["http://x/latest-insider-buys", "http://x/latest-insider-buys?page=2"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
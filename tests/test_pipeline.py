@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from google.adk.agents import ParallelAgent, SequentialAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from financial_advisor import pipeline
+from financial_advisor.response_cache import ResponseCache
+from financial_advisor.sub_agents.data_analyst import cache as data_analyst_cache
+from financial_advisor.sub_agents.risk_analyst import tools as risk_tools
+
+
+class _CountingLlm(BaseLlm):
+    """Answers every request with a unique marker and tracks concurrency."""
+
+    # A Gemini-style name keeps google_search (a Gemini built-in) usable.
+    model: str = "gemini-counting-stub"
+    instructions: list = []
+    active: int = 0
+    peak: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.instructions.append(llm_request.config.system_instruction)
+        marker = f"<response-{len(self.instructions)}>"
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=marker)]))
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(data_analyst_cache, "response_cache", ResponseCache())
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_graph_fans_out_per_ticker_and_risk_attitude(self):
+        graph = pipeline.build_pipeline(["aapl", "BRK-B", "AAPL"], ["moderate", "aggressive"])
+
+        self.assertIsInstance(graph, ParallelAgent)
+        self.assertEqual([b.name for b in graph.sub_agents], ["analysis_AAPL", "analysis_BRK_B"])
+        data, plans = graph.sub_agents[1].sub_agents
+        self.assertEqual(data.output_key, "market_data_analysis_output_BRK_B")
+        self.assertIn("provided_ticker: BRK.B", data.instruction)
+        self.assertIsInstance(plans, ParallelAgent)
+        chain = plans.sub_agents[1]
+        self.assertIsInstance(chain, SequentialAgent)
+        self.assertEqual(
+            [stage.output_key for stage in chain.sub_agents],
+            [
+                "proposed_trading_strategies_output_BRK_B_aggressive",
+                "execution_plan_output_BRK_B_aggressive",
+                "final_risk_assessment_output_BRK_B_aggressive",
+            ],
+        )
+        risk = chain.sub_agents[2]
+        self.assertIn("{execution_plan_output_BRK_B_aggressive_summary}", risk.instruction)
+        self.assertTrue(risk.disallow_transfer_to_parent)
+
+    def test_compaction_keeps_the_structured_risk_callback(self):
+        graph = pipeline.build_pipeline(["AAPL"], structured=True, compact=True)
+
+        risk = graph.sub_agents[1].sub_agents[-1]
+        self.assertEqual(len(risk.before_agent_callback), 2)
+        self.assertIn(risk_tools.store_portfolio_risk, risk.before_agent_callback)
+        self.assertIs(
+            pipeline.structured_risk_analyst_agent.before_agent_callback,
+            risk_tools.store_portfolio_risk,
+        )
+
+    def test_stages_hand_off_through_state_and_run_concurrently(self):
+        model = _CountingLlm()
+
+        outputs = asyncio.run(pipeline.run_pipeline(
+            ["AAPL", "MSFT"], ["conservative", "aggressive"], model=model
+        ))
+
+        # 2 data analyses + 2 tickers x 2 attitudes x 3 stages.
+        self.assertEqual(len(model.instructions), 14)
+        self.assertGreater(model.peak, 1)
+        for ticker, result in outputs.items():
+            report = result["market_data_analysis_output"]
+            for plan in result["plans"].values():
+                strategies = plan["proposed_trading_strategies_output"]
+                execution = plan["execution_plan_output"]
+                risk_instruction = next(i for i in model.instructions if execution in i)
+                self.assertIn(report, risk_instruction)
+                self.assertIn(strategies, risk_instruction)
+                self.assertTrue(plan["final_risk_assessment_output"].startswith("<response-"))
+        # The data analyses were cached for the next run.
+        self.assertEqual(self.cache.metrics["stores"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
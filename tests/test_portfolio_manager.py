@@ -1,17 +1,39 @@
-
 import unittest
 from unittest.mock import MagicMock, patch
 
+from ib_insync import Contract, PortfolioItem
+from sqlalchemy import create_engine, text
+
+from financial_advisor.connectors import gcp_sql_connector, ibkr_connector
 from financial_advisor.sub_agents.portfolio_manager.agent import PortfolioManagerAgent
 
+
+def _item(symbol, con_id, position, price=100.0, account="DU1"):
+    return PortfolioItem(
+        contract=Contract(symbol=symbol, conId=con_id),
+        position=position,
+        marketPrice=price,
+        marketValue=position * price,
+        averageCost=90.0,
+        unrealizedPNL=position * 10.0,
+        realizedPNL=0.0,
+        account=account,
+    )
+
+
 class TestPortfolioManagerAgent(unittest.TestCase):
-    @patch("financial_advisor.connectors.ibkr_connector.get_ibkr_portfolio")
+    @patch("financial_advisor.connectors.ibkr_connector.get_ibkr_accounts_and_portfolio")
     @patch("financial_advisor.connectors.gcp_sql_connector.get_gcp_sql_engine")
     @patch("financial_advisor.connectors.gcp_sql_connector.create_portfolio_table")
-    @patch("financial_advisor.connectors.gcp_sql_connector.upsert_portfolio")
-    def test_update_portfolio(self, mock_upsert_portfolio, mock_create_portfolio_table, mock_get_gcp_sql_engine, mock_get_ibkr_portfolio):
+    @patch("financial_advisor.connectors.gcp_sql_connector.sync_portfolio")
+    @patch("financial_advisor.connectors.gcp_sql_connector.create_portfolio_snapshots_table")
+    @patch("financial_advisor.connectors.portfolio_snapshots.downsample_if_due")
+    @patch("financial_advisor.connectors.portfolio_snapshots.record_snapshot")
+    def test_update_portfolio(self, mock_record_snapshot, mock_downsample_if_due, mock_create_snapshots_table, mock_sync_portfolio, mock_create_portfolio_table, mock_get_gcp_sql_engine, mock_get_ibkr_accounts_and_portfolio):
         # Arrange
-        mock_get_ibkr_portfolio.return_value = [{"symbol": "AAPL", "quantity": 100}]
+        mock_get_ibkr_accounts_and_portfolio.return_value = (
+            ["DU1", "DU2"], [_item("AAPL", 265598, 100)]
+        )
         mock_engine = MagicMock()
         mock_get_gcp_sql_engine.return_value = mock_engine
         agent = PortfolioManagerAgent()
@@ -20,11 +42,111 @@ class TestPortfolioManagerAgent(unittest.TestCase):
         result = agent.update_portfolio()
 
         # Assert
-        mock_get_ibkr_portfolio.assert_called_once()
+        mock_get_ibkr_accounts_and_portfolio.assert_called_once()
         mock_get_gcp_sql_engine.assert_called_once()
         mock_create_portfolio_table.assert_called_once_with(mock_engine)
-        mock_upsert_portfolio.assert_called_once_with(mock_engine, [{"symbol": "AAPL", "quantity": 100}])
+        mock_sync_portfolio.assert_called_once_with(
+            mock_engine,
+            {("DU1", 265598): ibkr_connector.PositionRow(
+                "DU1", 265598, "AAPL", 100, 100.0, 10000.0, 90.0, 1000.0, 0.0
+            )},
+            ["DU1", "DU2"],
+        )
+        mock_create_snapshots_table.assert_called_once_with(mock_engine)
+        mock_record_snapshot.assert_called_once()
+        mock_downsample_if_due.assert_called_once_with(mock_engine)
         self.assertEqual(result, "Portfolio updated successfully.")
 
+
+class TestSyncPortfolio(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        gcp_sql_connector.create_portfolio_table(self.engine)
+
+    def _stored(self):
+        with self.engine.connect() as connection:
+            return connection.execute(
+                text("SELECT account_name, con_id, quantity FROM portfolio ORDER BY con_id")
+            ).all()
+
+    def test_only_changed_positions_are_rewritten(self):
+        portfolio = [_item("AAPL", 1, 10), _item("MSFT", 2, 5), _item("AAPL", 1, 3, account="DU2")]
+        first = gcp_sql_connector.sync_portfolio(self.engine, ibkr_connector.portfolio_rows(portfolio))
+        unchanged = gcp_sql_connector.sync_portfolio(self.engine, ibkr_connector.portfolio_rows(portfolio))
+        moved = gcp_sql_connector.sync_portfolio(
+            self.engine,
+            ibkr_connector.portfolio_rows([_item("AAPL", 1, 12), _item("MSFT", 2, 5)]),
+        )
+
+        self.assertEqual((first.positions, first.written), (3, 3))
+        self.assertEqual((unchanged.written, unchanged.deleted), (0, 0))
+        self.assertEqual((moved.written, moved.deleted), (1, 0))
+        self.assertEqual(
+            sorted(self._stored()), [("DU1", 1, 12.0), ("DU1", 2, 5.0), ("DU2", 1, 3.0)]
+        )
+
+    def test_closed_positions_are_deleted(self):
+        gcp_sql_connector.sync_portfolio(
+            self.engine, ibkr_connector.portfolio_rows([_item("AAPL", 1, 10), _item("MSFT", 2, 5)])
+        )
+
+        stats = gcp_sql_connector.sync_portfolio(
+            self.engine, ibkr_connector.portfolio_rows([_item("AAPL", 1, 10)])
+        )
+
+        self.assertEqual(stats.deleted, 1)
+        self.assertEqual(self._stored(), [("DU1", 1, 10.0)])
+
+    def test_an_account_with_every_position_closed_is_cleared(self):
+        gcp_sql_connector.sync_portfolio(
+            self.engine,
+            ibkr_connector.portfolio_rows([_item("AAPL", 1, 10), _item("MSFT", 2, 5, account="DU2")]),
+        )
+
+        stats = gcp_sql_connector.sync_portfolio(
+            self.engine, ibkr_connector.portfolio_rows([_item("AAPL", 1, 10)]), ["DU1", "DU2"]
+        )
+
+        self.assertEqual(stats.deleted, 1)
+        self.assertEqual(self._stored(), [("DU1", 1, 10.0)])
+
+    def test_nan_prices_are_stored_as_null(self):
+        row = ibkr_connector.position_row(_item("XYZ", 9, 1, price=float("nan")))
+
+        self.assertIsNone(row.market_price)
+
+
+class TestPortfolioTableMigration(unittest.TestCase):
+    def test_symbol_keyed_table_is_moved_aside(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE portfolio (symbol VARCHAR(255) PRIMARY KEY, quantity INTEGER, "
+                "market_price FLOAT, market_value FLOAT, average_cost FLOAT, "
+                "unrealized_pnl FLOAT, realized_pnl FLOAT, account_name VARCHAR(255))"
+            ))
+            connection.execute(text(
+                "INSERT INTO portfolio (symbol, quantity, account_name) VALUES ('AAPL', 10, 'DU1')"
+            ))
+
+        gcp_sql_connector.create_portfolio_table(engine)
+        stats = gcp_sql_connector.sync_portfolio(
+            engine, ibkr_connector.portfolio_rows([_item("AAPL", 1, 12)])
+        )
+
+        self.assertEqual(stats.written, 1)
+        with engine.connect() as connection:
+            self.assertEqual(
+                connection.execute(text("SELECT con_id, quantity FROM portfolio")).all(),
+                [(1, 12.0)],
+            )
+            self.assertEqual(
+                connection.execute(text(
+                    f"SELECT symbol, quantity FROM {gcp_sql_connector.LEGACY_PORTFOLIO_TABLE}"
+                )).all(),
+                [("AAPL", 10)],
+            )
+
+
 if __name__ == "__main__":
     unittest.main()
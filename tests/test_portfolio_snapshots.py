@@ -0,0 +1,136 @@
+import datetime
+import unittest
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from financial_advisor.connectors import gcp_sql_connector, portfolio_snapshots
+from financial_advisor.connectors.ibkr_connector import PositionRow
+
+T0 = datetime.datetime(2025, 1, 6, 14, 30)
+
+
+def _position(con_id, pnl, account="DU1", value=1000.0):
+    return PositionRow(account, con_id, f"S{con_id}", 10, value / 10, value, 90.0, pnl, 0.0)
+
+
+class TestPortfolioSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        gcp_sql_connector.create_portfolio_snapshots_table(self.engine)
+
+    def _record_minutes(self, start, minutes):
+        for minute in range(minutes):
+            portfolio_snapshots.record_snapshot(
+                self.engine,
+                [_position(1, float(minute)), _position(2, 2.0 * minute)],
+                taken_at=start + datetime.timedelta(minutes=minute, seconds=17),
+            )
+
+    def _count(self, table, bucket_seconds):
+        with self.engine.connect() as connection:
+            return connection.execute(
+                text(f"SELECT COUNT(*) FROM {table} WHERE bucket_seconds = :b"),
+                {"b": bucket_seconds},
+            ).scalar()
+
+    def test_records_positions_and_account_totals(self):
+        stats = portfolio_snapshots.record_snapshot(
+            self.engine,
+            [_position(1, 5.0), _position(2, 7.0), _position(3, 1.0, account="DU2")],
+            taken_at=T0 + datetime.timedelta(seconds=42),
+        )
+        curve = portfolio_snapshots.pnl_curve(self.engine, "DU1")
+
+        self.assertEqual((stats.positions, stats.accounts), (3, 2))
+        self.assertEqual(stats.taken_at, portfolio_snapshots.to_epoch(T0))
+        self.assertEqual(curve["taken_at"].tolist(), [T0])
+        self.assertEqual(curve["unrealized_pnl"].tolist(), [12.0])
+        self.assertEqual(curve["positions"].tolist(), [2])
+
+    def test_downsample_keeps_last_value_per_bucket(self):
+        self._record_minutes(T0, 90)
+
+        # Nothing is old enough yet.
+        stats = portfolio_snapshots.downsample(self.engine, now=T0 + datetime.timedelta(days=1))
+        self.assertEqual(stats.rolled_up, 0)
+
+        stats = portfolio_snapshots.downsample(self.engine, now=T0 + datetime.timedelta(days=8))
+        hourly = portfolio_snapshots.position_history(self.engine, "DU1", 1)
+
+        self.assertEqual(self._count("portfolio_snapshots", portfolio_snapshots.MINUTE), 0)
+        self.assertEqual(self._count("portfolio_pnl_snapshots", portfolio_snapshots.HOUR), 2)
+        self.assertEqual(stats.rolled_up, 90 * 3)
+        self.assertEqual(
+            hourly["taken_at"].tolist(),
+            [datetime.datetime(2025, 1, 6, 14), datetime.datetime(2025, 1, 6, 15)],
+        )
+        # 14:59 and 15:59 are the last minutes of their hours.
+        self.assertEqual(hourly["unrealized_pnl"].tolist(), [29.0, 89.0])
+
+        portfolio_snapshots.downsample(self.engine, now=T0 + datetime.timedelta(days=100))
+        daily = portfolio_snapshots.pnl_curve(self.engine, "DU1")
+
+        self.assertEqual(self._count("portfolio_snapshots", portfolio_snapshots.HOUR), 0)
+        self.assertEqual(daily["taken_at"].tolist(), [datetime.datetime(2025, 1, 6)])
+        self.assertEqual(daily["unrealized_pnl"].tolist(), [89.0 * 3])
+
+    def test_downsample_runs_at_most_once_per_interval(self):
+        self._record_minutes(T0, 5)
+        now = T0 + datetime.timedelta(days=8)
+
+        first = portfolio_snapshots.downsample_if_due(self.engine, now=now)
+        self._record_minutes(T0 + datetime.timedelta(hours=1), 5)
+        skipped = portfolio_snapshots.downsample_if_due(
+            self.engine, now=now + datetime.timedelta(minutes=59)
+        )
+        later = portfolio_snapshots.downsample_if_due(
+            self.engine, now=now + datetime.timedelta(hours=1)
+        )
+
+        self.assertEqual(first.rolled_up, 5 * 3)
+        self.assertIsNone(skipped)
+        self.assertEqual(later.rolled_up, 5 * 3)
+        self.assertEqual(self._count("portfolio_snapshots", portfolio_snapshots.MINUTE), 0)
+
+    def test_range_query_and_resolution(self):
+        self._record_minutes(T0, 120)
+
+        window = portfolio_snapshots.pnl_curve(
+            self.engine, "DU1",
+            start=T0 + datetime.timedelta(minutes=10),
+            end=T0 + datetime.timedelta(minutes=19),
+        )
+        quarter_hours = portfolio_snapshots.pnl_curve(self.engine, "DU1", resolution=900)
+
+        self.assertEqual(len(window["taken_at"]), 10)
+        self.assertEqual(len(quarter_hours["taken_at"]), 8)
+        self.assertEqual(quarter_hours["taken_at"][0], np.datetime64("2025-01-06T14:30:00"))
+        self.assertEqual(quarter_hours["unrealized_pnl"][0], 14.0 * 3)
+        self.assertEqual(len(portfolio_snapshots.pnl_curve(self.engine, "DU9")["taken_at"]), 0)
+
+    def test_daily_prices_take_the_last_price_of_each_day(self):
+        self._record_minutes(T0, 3)
+        portfolio_snapshots.downsample(self.engine, now=T0 + datetime.timedelta(days=100))
+        for day, price in ((1, 110.0), (2, 120.0)):
+            for minute, offset in ((0, -5.0), (30, 0.0)):
+                portfolio_snapshots.record_snapshot(
+                    self.engine,
+                    [_position(1, 0.0, value=10 * (price + offset))],
+                    taken_at=T0 + datetime.timedelta(days=day, minutes=minute),
+                )
+
+        days, con_ids, prices = portfolio_snapshots.daily_prices(self.engine, "DU1")
+        recent = portfolio_snapshots.daily_prices(
+            self.engine, "DU1", start=T0 + datetime.timedelta(days=1), con_ids=[1]
+        )
+
+        self.assertEqual(days.tolist(), [datetime.date(2025, 1, d) for d in (6, 7, 8)])
+        self.assertEqual(con_ids.tolist(), [1, 2])
+        np.testing.assert_array_equal(prices, [[100.0, 100.0], [110.0, np.nan], [120.0, np.nan]])
+        self.assertEqual(recent[2].tolist(), [[110.0], [120.0]])
+        self.assertEqual(portfolio_snapshots.daily_prices(self.engine, "DU9")[2].shape, (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
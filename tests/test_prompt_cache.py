@@ -0,0 +1,190 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import google_search
+from google.genai import types
+
+from financial_advisor import prompt_cache
+from financial_advisor.stub_model import StubLlm
+from financial_advisor.telemetry import CallRecord
+
+STATIC_PROMPT = "You are a risk analyst. " * 50
+
+
+class _RecordingLlm(StubLlm):
+    requests: list = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.requests.append(SimpleNamespace(
+            cached_content=llm_request.config.cached_content,
+            system_instruction=llm_request.config.system_instruction,
+            tools=llm_request.config.tools,
+            first_turn=llm_request.contents[0].parts[0].text,
+        ))
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+class _FakeCaches:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.created = []
+        self.updated = []
+        self.deleted = []
+
+    def create(self, model, config):
+        if self.fail:
+            raise ValueError("Cached content is too small.")
+        self.created.append((model, config))
+        return types.CachedContent(
+            name=f"cachedContents/{len(self.created)}",
+            usage_metadata=types.CachedContentUsageMetadata(total_token_count=250),
+        )
+
+    def delete(self, name):
+        self.deleted.append(name)
+
+
+class _FakeAsyncCaches:
+    def __init__(self, caches):
+        self.caches = caches
+
+    async def create(self, model, config):
+        return self.caches.create(model, config)
+
+    async def update(self, name, config):
+        self.caches.updated.append((name, config.ttl))
+
+
+def _client(fail=False):
+    caches = _FakeCaches(fail)
+    return SimpleNamespace(caches=caches, aio=SimpleNamespace(caches=_FakeAsyncCaches(caches)))
+
+
+async def _run(agent, message="Assess AAPL"):
+    runner = InMemoryRunner(agent=agent)
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="advisor"
+    )
+    async for _ in runner.run_async(
+        user_id="advisor",
+        session_id=session.id,
+        new_message=types.UserContent(parts=[types.Part(text=message)]),
+    ):
+        pass
+    # Let background refreshes finish.
+    await asyncio.sleep(0)
+
+
+class TestPromptCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1_000_000.0
+        self.model = _RecordingLlm(requests=[])
+        self.agent = LlmAgent(
+            name="risk_analyst_agent", model=self.model, instruction=STATIC_PROMPT
+        )
+        self.client = _client()
+        self.cache = prompt_cache.PromptCache(
+            client=self.client, ttl=3600, clock=lambda: self.now
+        )
+
+    def test_requests_reference_the_cache_created_at_startup(self):
+        entries = self.cache.setup(self.agent)
+        asyncio.run(_run(self.agent))
+
+        [(model, config)] = self.client.caches.created
+        self.assertEqual(model, "gemini-stub")
+        self.assertEqual(config.system_instruction, STATIC_PROMPT)
+        self.assertEqual(config.ttl, "3600s")
+        self.assertEqual(entries[0].tokens, 250)
+        [request] = self.model.requests
+        self.assertEqual(request.cached_content, entries[0].name)
+        self.assertIsNone(request.system_instruction)
+        # ADK's identity line followed the static prompt.
+        self.assertIn('internal name is "risk_analyst_agent"', request.first_turn)
+
+    def test_clones_with_appended_inputs_share_the_cache(self):
+        self.cache.setup(self.agent)
+        clone = self.agent.clone(update={
+            "name": "risk_analyst_AAPL",
+            "instruction": STATIC_PROMPT + "\n\nprovided_ticker: {ticker?}",
+        })
+        asyncio.run(_run(clone))
+
+        self.assertEqual(len(self.client.caches.created), 1)
+        [request] = self.model.requests
+        self.assertEqual(request.cached_content, "cachedContents/1")
+        self.assertTrue(request.first_turn.startswith("provided_ticker:"))
+
+    def test_tools_are_cached_with_the_instruction(self):
+        agent = LlmAgent(
+            name="data_analyst_agent", model=self.model, instruction=STATIC_PROMPT,
+            tools=[google_search],
+        )
+        self.cache.setup(agent)
+        asyncio.run(_run(agent))
+
+        [(_, config)] = self.client.caches.created
+        self.assertEqual(config.tools, [types.Tool(google_search=types.GoogleSearch())])
+        [request] = self.model.requests
+        self.assertEqual(request.cached_content, "cachedContents/1")
+        self.assertIsNone(request.tools)
+
+    def test_cache_is_extended_before_it_expires(self):
+        [entry] = self.cache.setup(self.agent)
+        self.now += 3600 - 100
+        asyncio.run(_run(self.agent))
+
+        self.assertEqual(self.client.caches.updated, [(entry.name, "3600s")])
+        self.assertEqual(entry.expires_at, self.now + 3600)
+        self.assertEqual(self.model.requests[0].cached_content, entry.name)
+
+    def test_expired_cache_is_recreated_and_not_used_meanwhile(self):
+        [entry] = self.cache.setup(self.agent)
+        self.now += 3600
+        asyncio.run(_run(self.agent))
+
+        self.assertIsNone(self.model.requests[0].cached_content)
+        self.assertEqual(self.model.requests[0].system_instruction.split("\n\n")[0], STATIC_PROMPT)
+        self.assertEqual(entry.name, "cachedContents/2")
+        self.assertEqual(self.cache.metrics["expired"], 1)
+
+    def test_failed_creation_leaves_requests_unchanged(self):
+        cache = prompt_cache.PromptCache(client=_client(fail=True))
+        self.assertEqual(cache.setup(self.agent), [])
+        asyncio.run(_run(self.agent))
+
+        self.assertEqual(len(cache.skipped), 1)
+        self.assertIsNone(self.model.requests[0].cached_content)
+
+    def test_close_deletes_the_caches(self):
+        self.cache.setup(self.agent)
+        self.cache.close()
+
+        self.assertEqual(self.client.caches.deleted, ["cachedContents/1"])
+
+
+class TestSavings(unittest.TestCase):
+    def test_compares_cached_and_uncached_calls(self):
+        records = [
+            CallRecord("model", "s", "risk", "gemini", 4.0, 1.0, 3000, 500, 0),
+            CallRecord("model", "s", "risk", "gemini", 3.0, 0.6, 3000, 500, 2400),
+            CallRecord("model", "s", "risk", "gemini", 3.2, 0.8, 3000, 500, 2400),
+            CallRecord("tool", "s", "risk", "search", 9.0, None, 0, 0),
+        ]
+
+        [row] = prompt_cache.savings(records)
+
+        self.assertEqual((row["calls"], row["cached_calls"]), (3, 2))
+        self.assertEqual(row["cached_tokens_per_call"], 2400)
+        self.assertEqual(row["billed_tokens_saved_per_call"], 1800)
+        self.assertAlmostEqual(row["latency_saved_p50"], 0.9)
+        self.assertAlmostEqual(row["ttft_saved_p50"], 0.3)
+        self.assertIn("risk", prompt_cache.format_savings([row]))
+
+
+if __name__ == "__main__":
+    unittest.main()
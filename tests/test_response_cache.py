@@ -0,0 +1,174 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from google.adk.runners import InMemoryRunner
+from google.genai.types import Part, UserContent
+
+from financial_advisor import response_cache
+from financial_advisor.response_cache import DiskBackend, MemoryBackend, ResponseCache
+from financial_advisor.sub_agents.data_analyst import cache as data_analyst_cache
+from financial_advisor.sub_agents.data_analyst import data_analyst_agent
+
+
+class _State(dict):
+    def to_dict(self):
+        return dict(self)
+
+
+def _callback_context(request, state=None, invocation_id="inv-1"):
+    return SimpleNamespace(
+        user_content=UserContent(parts=[Part(text=request)]),
+        state=_State(state or {}),
+        invocation_id=invocation_id,
+        agent_name="data_analyst_agent",
+    )
+
+
+class TestBackends(unittest.TestCase):
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", "1", ttl=60)
+        backend.set("b", "2", ttl=60)
+        backend.get("a")
+        backend.set("c", "3", ttl=60)
+
+        self.assertEqual((backend.get("a"), backend.get("b"), backend.get("c")), ("1", None, "3"))
+
+    def test_expired_entries_are_dropped(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for backend in (MemoryBackend(), DiskBackend(os.path.join(tmp.name, "cache.db"))):
+            backend.set("k", "v", ttl=10)
+            self.assertEqual(backend.get("k"), "v")
+            with patch.object(response_cache.time, "time", return_value=response_cache.time.time() + 11):
+                self.assertIsNone(backend.get("k"))
+
+    def test_backend_from_url(self):
+        self.assertIsInstance(response_cache.backend_from_url("memory"), MemoryBackend)
+        with self.assertRaises(ValueError):
+            response_cache.backend_from_url("memcached://localhost")
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_fresh_then_stale_then_gone(self):
+        cache = ResponseCache(ttl=10, stale_ttl=20)
+        cache.store("AAPL", {"report": "up"})
+        now = response_cache.time.time()
+
+        self.assertEqual(cache.lookup("AAPL").status, response_cache.FRESH)
+        with patch.object(response_cache.time, "time", return_value=now + 15):
+            lookup = cache.lookup("AAPL")
+            self.assertEqual((lookup.status, lookup.value), (response_cache.STALE, {"report": "up"}))
+        with patch.object(response_cache.time, "time", return_value=now + 31):
+            self.assertEqual(cache.lookup("AAPL").status, response_cache.MISS)
+        self.assertAlmostEqual(cache.hit_rate(), 2 / 3)
+
+    def test_revalidate_runs_one_refresh_per_key(self):
+        cache = ResponseCache()
+        calls = []
+
+        async def refresh():
+            calls.append(1)
+            await asyncio.sleep(0)
+            cache.store("AAPL", "new")
+
+        async def scenario():
+            first = cache.revalidate("AAPL", refresh)
+            second = cache.revalidate("AAPL", refresh)
+            self.assertIs(first, second)
+            await first
+
+        asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.lookup("AAPL").value, "new")
+
+
+class TestDataAnalystCache(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(data_analyst_cache, "response_cache", ResponseCache())
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_key_normalizes_ticker_and_window(self):
+        key = data_analyst_cache.cache_key
+        self.assertEqual(key("Please analyze the market for aapl, ticker: aapl"), "data_analyst:AAPL:7d")
+        self.assertEqual(key("What does the SEC say about $brk-b? News no older than 3 days."),
+                         "data_analyst:BRK.B:3d")
+        self.assertEqual(key("Analyze NVDA using news from the past 30 days"), "data_analyst:NVDA:30d")
+        self.assertEqual(key("Analyze NVDA, I plan for 30 days"), "data_analyst:NVDA:7d")
+        self.assertEqual(key("anything", {"provided_ticker": "msft", "max_data_age_days": 14}),
+                         "data_analyst:MSFT:14d")
+        self.assertIsNone(key("Compare AAPL and MSFT"))
+        self.assertIsNone(key("who are you"))
+
+    def test_stores_new_report_after_run(self):
+        context = _callback_context("Analyze NVDA", {"market_data_analysis_output": "old report"})
+
+        self.assertIsNone(data_analyst_cache.serve_cached_report(context))
+        context.state["market_data_analysis_output"] = "NVDA report"
+        data_analyst_cache.store_report(context)
+
+        self.assertEqual(self.cache.lookup("data_analyst:NVDA:7d").value, "NVDA report")
+
+    def test_unchanged_report_is_not_stored(self):
+        context = _callback_context("Analyze NVDA", {"market_data_analysis_output": "old report"})
+
+        data_analyst_cache.serve_cached_report(context)
+        data_analyst_cache.store_report(context)
+
+        self.assertEqual(self.cache.metrics["stores"], 0)
+
+    def test_failed_runs_do_not_leak_pending_entries(self):
+        context = _callback_context("Analyze NVDA")
+        data_analyst_cache.serve_cached_report(context)  # the run then raises
+        self.assertIn((context.invocation_id, context.agent_name), data_analyst_cache._pending)
+
+        later = time.monotonic() + data_analyst_cache._PENDING_TTL_SECONDS + 1
+        with patch.object(data_analyst_cache.time, "monotonic", return_value=later):
+            data_analyst_cache.serve_cached_report(_callback_context("Analyze AMD", invocation_id="2"))
+
+        self.assertNotIn((context.invocation_id, context.agent_name), data_analyst_cache._pending)
+
+    def test_fixed_ticker_callbacks_use_their_own_key_and_output(self):
+        serve, store = data_analyst_cache.report_callbacks("tsla", "market_data_analysis_output_TSLA")
+        self.cache.store("data_analyst:TSLA:7d", "Cached TSLA report")
+        context = _callback_context("Analyze AAPL and MSFT")
+
+        content = serve(context)
+
+        self.assertEqual(content.parts[0].text, "Cached TSLA report")
+        self.assertEqual(context.state, {"market_data_analysis_output_TSLA": "Cached TSLA report"})
+
+    def test_cache_hit_skips_the_model(self):
+        self.cache.store("data_analyst:AAPL:7d", "Cached AAPL report")
+
+        async def run():
+            runner = InMemoryRunner(agent=data_analyst_agent)
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id="test_user"
+            )
+            texts = []
+            async for event in runner.run_async(
+                user_id=session.user_id,
+                session_id=session.id,
+                new_message=UserContent(parts=[Part(text="Analyze AAPL")]),
+            ):
+                texts.extend(p.text for p in event.content.parts if p.text)
+            session = await runner.session_service.get_session(
+                app_name=runner.app_name, user_id="test_user", session_id=session.id
+            )
+            return texts, session.state
+
+        texts, state = asyncio.run(run())
+
+        self.assertEqual(texts, ["Cached AAPL report"])
+        self.assertEqual(state["market_data_analysis_output"], "Cached AAPL report")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import asyncio
+import datetime
+import json
+import time
+import unittest
+from statistics import NormalDist
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from financial_advisor import risk_engine
+from financial_advisor.connectors import gcp_sql_connector, portfolio_snapshots
+from financial_advisor.connectors.ibkr_connector import PositionRow
+from financial_advisor.sub_agents.risk_analyst import tools
+
+
+def _returns(days, positions, seed=1):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0004, 0.01, days)
+    betas = np.linspace(0.5, 1.5, positions)
+    return market, np.outer(market, betas) + rng.normal(0, 0.012, (days, positions))
+
+
+class TestRiskEngine(unittest.TestCase):
+    def test_metrics_match_the_textbook_formulas(self):
+        market, returns = _returns(750, 6)
+        values = np.array([40_000, 25_000, 15_000, 10_000, 10_000, -20_000.0])
+
+        metrics = risk_engine.analyze(values, returns, market_returns=market, horizon_days=5)
+
+        weights = values / np.abs(values).sum()
+        portfolio = returns @ weights
+        np.testing.assert_allclose(metrics.covariance, np.cov(returns, rowvar=False))
+        np.testing.assert_allclose(metrics.correlation, np.corrcoef(returns, rowvar=False))
+        slopes = [np.polyfit(market, returns[:, i], 1)[0] for i in range(6)]
+        np.testing.assert_allclose(metrics.betas, slopes)
+        self.assertAlmostEqual(metrics.risk_contributions.sum(), 1.0)
+        self.assertAlmostEqual(metrics.herfindahl, np.square(weights).sum())
+
+        five_day = np.convolve(portfolio, np.ones(5), mode="valid")
+        self.assertAlmostEqual(metrics.historical_var, -np.quantile(five_day, 0.05))
+        self.assertGreater(metrics.historical_cvar, metrics.historical_var)
+        sigma = np.sqrt(weights @ np.cov(returns, rowvar=False) @ weights * 5)
+        self.assertAlmostEqual(
+            metrics.parametric_var, NormalDist().inv_cdf(0.95) * sigma - portfolio.mean() * 5
+        )
+        self.assertGreater(metrics.parametric_cvar, metrics.parametric_var)
+
+    def test_drawdown_compounds_from_the_running_peak(self):
+        self.assertAlmostEqual(risk_engine.max_drawdown(np.array([0.1, -0.5, 0.2, 0.1])), 0.5)
+        self.assertAlmostEqual(risk_engine.max_drawdown(np.array([-0.1, -0.1, 0.5])), 0.19)
+        self.assertEqual(risk_engine.max_drawdown(np.array([0.01, 0.02])), 0.0)
+
+    def test_thousand_positions_over_five_years_in_under_a_second(self):
+        market, returns = _returns(5 * 252, 1000)
+        values = np.random.default_rng(2).uniform(1_000, 100_000, 1000)
+
+        start = time.perf_counter()
+        summary = risk_engine.analyze(values, returns, market_returns=market).summary()
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(summary["positions"], 1000)
+        self.assertEqual(len(summary["most_correlated_pairs"]), 5)
+        json.dumps(summary)
+
+
+class TestPortfolioRiskTool(unittest.TestCase):
+    def setUp(self):
+        # One shared connection: the tool reads from a worker thread.
+        self.engine = create_engine(
+            "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+        gcp_sql_connector.create_portfolio_table(self.engine)
+        gcp_sql_connector.create_portfolio_snapshots_table(self.engine)
+        patcher = patch.object(gcp_sql_connector, "get_gcp_sql_engine", return_value=self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tools.clear_cache()
+        self.addCleanup(tools.clear_cache)
+
+    def _hold(self, days):
+        market, returns = _returns(days, 3)
+        prices = 100 * np.cumprod(1 + returns, axis=0)
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        for day in range(days):
+            rows = [
+                PositionRow("DU1", con_id, symbol, 10, price, 10 * price, 90.0, 0.0, 0.0)
+                for con_id, symbol, price in zip((1, 2, 3), ("SPY", "AAPL", "MSFT"), prices[day])
+            ]
+            portfolio_snapshots.record_snapshot(
+                self.engine, rows, taken_at=now - datetime.timedelta(days=days - day)
+            )
+        gcp_sql_connector.sync_portfolio(self.engine, {(r.account_name, r.con_id): r for r in rows})
+
+    def test_reports_metrics_of_the_stored_portfolio(self):
+        self._hold(120)
+
+        result = asyncio.run(tools.portfolio_risk(confidence=0.99, horizon_days=10))
+
+        self.assertEqual(result["positions"], 3)
+        self.assertEqual(result["observations_days"], 119)
+        self.assertEqual(result["beta_benchmark"], "SPY")
+        self.assertEqual(result["highest_betas"][0][0], "SPY")
+        self.assertGreater(result["historical_var_usd"], 0)
+        with patch.object(tools, "compute_portfolio_risk") as compute:
+            self.assertEqual(asyncio.run(tools.portfolio_risk(0.99, 10)), result)
+        compute.assert_not_called()
+
+    def test_missing_data_is_reported_not_raised(self):
+        self.assertIn("empty", asyncio.run(tools.portfolio_risk())["error"])
+        self.assertIn("confidence", asyncio.run(tools.portfolio_risk(confidence=1.5))["error"])
+        with patch.object(gcp_sql_connector, "get_gcp_sql_engine", side_effect=KeyError("PROJECT")):
+            self.assertIn("KeyError", asyncio.run(tools.portfolio_risk(0.9))["error"])
+
+    def test_overlapping_calls_share_one_computation(self):
+        calls = []
+
+        def compute(engine, confidence, horizon_days):
+            calls.append(confidence)
+            time.sleep(0.05)
+            if len(calls) == 1:
+                raise ConnectionError("database down")
+            return {"positions": 3}
+
+        async def stages(confidence):
+            return await asyncio.gather(*(tools.portfolio_risk(confidence) for _ in range(4)))
+
+        with patch.object(tools, "compute_portfolio_risk", side_effect=compute):
+            failed = asyncio.run(stages(0.95))
+            results = asyncio.run(stages(0.95)) + asyncio.run(stages(0.95))
+
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all("ConnectionError" in r["error"] for r in failed))
+        self.assertEqual(results, [{"positions": 3}] * 8)
+        self.assertEqual(tools._inflight, {})
+
+    def test_cancelled_computation_does_not_cancel_the_waiting_calls(self):
+        def compute(engine, confidence, horizon_days):
+            time.sleep(0.1)
+            return {"positions": 3}
+
+        async def stages():
+            first = asyncio.ensure_future(tools.portfolio_risk(0.95))
+            await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(tools.portfolio_risk(0.95))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await asyncio.gather(first, second, return_exceptions=True)
+
+        with patch.object(tools, "compute_portfolio_risk", side_effect=compute):
+            first, second = asyncio.run(stages())
+
+        self.assertIsInstance(first, asyncio.CancelledError)
+        self.assertIn("interrupted", second["error"])
+        self.assertEqual(tools._inflight, {})
+
+    def test_structured_variant_gets_the_metrics_in_state(self):
+        from financial_advisor.sub_agents.risk_analyst import (
+            risk_analyst_agent,
+            structured_risk_analyst_agent,
+        )
+
+        self._hold(30)
+        context = SimpleNamespace(state={})
+        asyncio.run(structured_risk_analyst_agent.before_agent_callback(context))
+
+        self.assertEqual(json.loads(context.state[tools.STATE_KEY])["positions"], 3)
+        self.assertIn(tools.portfolio_risk, risk_analyst_agent.tools)
+        self.assertEqual(structured_risk_analyst_agent.tools, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import datetime
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from financial_advisor import scanner_daemon
+from financial_advisor.scanner_daemon import AdaptiveSchedule, ScannerDaemon
+
+# Wednesday 2025-09-03, 10:00 in New York (EDT).
+MARKET_OPEN = datetime.datetime(2025, 9, 3, 14, 0, tzinfo=datetime.timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now=MARKET_OPEN):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class ScriptedScan:
+    """Returns the scripted new-trade counts (exceptions are raised), then stops the daemon."""
+
+    def __init__(self, clock, script):
+        self.clock = clock
+        self.script = list(script)
+        self.times = []
+        self.daemon = None
+
+    def __call__(self):
+        self.times.append(self.clock.now - MARKET_OPEN)
+        outcome = self.script.pop(0)
+        if not self.script:
+            self.daemon.stop()
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome, datetime.date(2025, 9, 2)
+
+
+def _daemon(script, now=MARKET_OPEN):
+    clock = FakeClock(now)
+    scan = ScriptedScan(clock, script)
+    daemon = ScannerDaemon(scan=scan, schedule=AdaptiveSchedule(), clock=clock, sleep=clock.sleep)
+    scan.daemon = daemon
+    return daemon, scan, clock
+
+
+class TestMarketSession(unittest.TestCase):
+    def test_sessions_follow_new_york_time_with_or_without_tz_database(self):
+        def at(*args):
+            return datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp()
+
+        cases = {
+            at(2025, 9, 3, 14, 0): "regular",  # 10:00 EDT
+            at(2025, 9, 3, 9, 0): "extended",  # 5:00 EDT
+            at(2025, 9, 3, 2, 0): "closed",  # 22:00 EDT the day before
+            at(2025, 9, 6, 15, 0): "closed",  # Saturday
+            at(2025, 12, 3, 14, 0): "extended",  # 9:00 EST
+            at(2025, 12, 3, 15, 0): "regular",  # 10:00 EST
+        }
+        for zone in (scanner_daemon._NEW_YORK, None):
+            with patch.object(scanner_daemon, "_NEW_YORK", zone):
+                self.assertEqual(
+                    {t: scanner_daemon.market_session(t) for t in cases}, cases, zone
+                )
+
+
+class TestScannerDaemon(unittest.TestCase):
+    def test_bursts_poll_faster_then_decay_to_the_session_interval(self):
+        daemon, scan, _ = _daemon([0, 8, 0, 0, 0, 0])
+
+        asyncio.run(daemon.run_forever())
+
+        # 300s base; a burst of 8 filings drops to 60s, then 120, 240, 300.
+        self.assertEqual(scan.times, [0, 300, 360, 480, 720, 1020])
+        self.assertEqual(daemon.metrics["new_trades"], 8)
+
+    def test_failures_back_off_and_recover(self):
+        daemon, scan, _ = _daemon([OSError("timeout"), OSError("timeout"), 0, 0])
+
+        asyncio.run(daemon.run_forever())
+
+        self.assertEqual(scan.times, [0, 60, 180, 480])
+        self.assertEqual(daemon.metrics["failures"], 2)
+        self.assertIsNone(daemon.last_error)
+
+    def test_sleep_ends_at_the_session_boundary(self):
+        # 15:58 EDT: the regular session closes in two minutes.
+        daemon, scan, clock = _daemon([0, 0, 0], now=MARKET_OPEN + (5 * 60 + 58) * 60)
+
+        asyncio.run(daemon.run_forever())
+
+        # After the close the interval doubles toward the 900s extended-hours base.
+        self.assertEqual(clock.sleeps, [120, 600])
+
+    def test_health_reports_lag(self):
+        daemon, _, clock = _daemon([3])
+        asyncio.run(daemon.run_forever())
+
+        health = daemon.health()
+        self.assertTrue(health["healthy"])
+        self.assertEqual(health["data_lag_days"], 1)
+        self.assertEqual(health["interval_seconds"], 300)
+        clock.now += 3600
+        self.assertFalse(daemon.health()["healthy"])
+        self.assertIn("trade_scanner_scan_lag_seconds 3600", daemon.render_prometheus())
+
+
+class TestScannerApp(unittest.TestCase):
+    def test_trigger_scans_now(self):
+        scans = []
+
+        def scan():
+            scans.append(1)
+            return 0, None
+
+        daemon = ScannerDaemon(scan=scan)
+        with TestClient(scanner_daemon.create_app(daemon)) as client:
+            for _ in range(100):
+                if scans:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(client.get("/healthz").status_code, 200)
+            client.post("/")
+            for _ in range(100):
+                if len(scans) == 2:
+                    break
+                time.sleep(0.01)
+            metrics = client.get("/metrics").text
+
+        self.assertEqual(len(scans), 2)
+        self.assertIn("trade_scanner_triggered_total 1", metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
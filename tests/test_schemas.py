@@ -0,0 +1,133 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+from pydantic import ValidationError
+from sqlalchemy import create_engine, text
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from financial_advisor import pipeline, schemas
+from financial_advisor.connectors import gcp_sql_connector
+from financial_advisor.response_cache import ResponseCache
+from financial_advisor.sub_agents.data_analyst import cache as data_analyst_cache
+
+STRATEGIES = {
+    "ticker": "AAPL",
+    "risk_attitude": "moderate",
+    "investment_period": "long-term",
+    "strategies": [
+        {
+            "name": "Pullback buy",
+            "direction": "long",
+            "entry_price": 185.0,
+            "entry_condition": "Daily close above the 50-day average after a pullback.",
+            "stop_loss": 172.0,
+            "take_profit": 211.0,
+            "position_size_pct": 5,
+            "time_horizon": "2-6 months",
+            "rationale": "Trend intact; buy weakness.",
+        },
+        {
+            "name": "Breakdown short",
+            "direction": "short",
+            "entry_price": 170.0,
+            "entry_condition": "Close below the 200-day average.",
+            "stop_loss": 178.0,
+            "take_profit": 150.0,
+            "position_size_pct": 2,
+            "time_horizon": "2-4 weeks",
+            "rationale": "Hedge against a trend break.",
+        },
+    ],
+}
+
+ASSESSMENT = {
+    "ticker": "AAPL",
+    "risk_attitude": "moderate",
+    "overall_score": 4,
+    "aligned_with_risk_attitude": True,
+    "scores": [
+        {"category": "market", "score": 5, "rationale": "Beta near 1.2.", "mitigation": "Stops."},
+        {"category": "liquidity", "score": 1, "rationale": "Deep book.", "mitigation": "None."},
+    ],
+    "summary": "Moderate risk, in line with the profile.",
+}
+
+
+class _SchemaLlm(BaseLlm):
+    """Answers structured requests with fixed JSON and others with markdown."""
+
+    model: str = "gemini-schema-stub"
+
+    async def generate_content_async(self, llm_request, stream=False):
+        schema = llm_request.config.response_schema
+        answer = {
+            schemas.TradingStrategies: json.dumps(STRATEGIES),
+            schemas.RiskAssessment: json.dumps(ASSESSMENT),
+        }.get(schema, "# Report\n- Support near $180.")
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=answer)]))
+
+
+class TestSchemas(unittest.TestCase):
+    def test_rows_follow_the_table_columns(self):
+        strategies = schemas.TradingStrategies.model_validate(STRATEGIES)
+        assessment = schemas.RiskAssessment.model_validate(ASSESSMENT)
+
+        self.assertEqual(
+            dict(zip(gcp_sql_connector.TRADING_STRATEGY_COLUMNS, strategies.rows()[0]))["stop_loss"],
+            172.0,
+        )
+        self.assertAlmostEqual(strategies.strategies[0].reward_to_risk, 2.0)
+        self.assertEqual([row[2] for row in assessment.rows()], ["overall", "market", "liquidity"])
+
+    def test_levels_must_match_the_direction(self):
+        bad = json.loads(json.dumps(STRATEGIES))
+        bad["strategies"][1]["stop_loss"] = 160.0
+
+        with self.assertRaisesRegex(ValidationError, "Breakdown short: stop_loss"):
+            schemas.TradingStrategies.model_validate(bad)
+
+    def test_scores_are_bounded(self):
+        bad = dict(ASSESSMENT, overall_score=11)
+
+        with self.assertRaises(ValidationError):
+            schemas.RiskAssessment.model_validate(bad)
+
+
+class TestStructuredPipeline(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(data_analyst_cache, "response_cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_structured_stages_store_dicts_and_feed_the_database(self):
+        outputs = asyncio.run(pipeline.run_pipeline(
+            ["AAPL"], ["moderate"], model=_SchemaLlm(), structured=True, compact=True
+        ))
+        plan = outputs["AAPL"]["plans"]["moderate"]
+
+        self.assertEqual(plan["proposed_trading_strategies_output"]["strategies"][1]["name"],
+                         "Breakdown short")
+        self.assertEqual(plan["final_risk_assessment_output"]["overall_score"], 4)
+        self.assertIsInstance(plan["execution_plan_output"], str)
+
+        engine = create_engine("sqlite://")
+        self.assertEqual(pipeline.store_structured_outputs(engine, outputs), (2, 3))
+        # A rerun with fewer strategies replaces the earlier ones.
+        plan["proposed_trading_strategies_output"]["strategies"].pop()
+        pipeline.store_structured_outputs(engine, outputs)
+        with engine.connect() as connection:
+            names = connection.execute(text("SELECT name FROM trading_strategies")).scalars().all()
+            scores = connection.execute(text(
+                "SELECT score FROM risk_scores WHERE category = 'overall'"
+            )).scalars().all()
+        self.assertEqual(names, ["Pullback buy"])
+        self.assertEqual(scores, [4])
+
+
+if __name__ == "__main__":
+    unittest.main()
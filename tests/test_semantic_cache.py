@@ -0,0 +1,254 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from financial_advisor import batch, compaction, pipeline, semantic_cache
+from financial_advisor.response_cache import ResponseCache
+from financial_advisor.semantic_cache import SemanticCache, normalize_request, parse_request
+from financial_advisor.stub_model import StubLlm
+from financial_advisor.sub_agents.data_analyst import cache as data_analyst_cache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestParseRequest(unittest.TestCase):
+    def test_paraphrases_normalize_to_the_same_request(self):
+        first = parse_request("moderate risk, long term, AAPL")
+        second = parse_request("I'm a balanced investor looking at $aapl with a long-term horizon")
+
+        self.assertEqual(first, ("AAPL", "moderate", "long-term", ""))
+        self.assertEqual(first, second)
+
+    def test_incomplete_requests_are_not_cached(self):
+        self.assertIsNone(parse_request("What do you think about AAPL?"))
+        self.assertEqual(
+            parse_request("AAPL please", {"risk_attitude": "Aggressive", "investment_period": "3 years"}),
+            ("AAPL", "aggressive", "3 years", ""),
+        )
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.cache = SemanticCache(ttl=60, max_entries=2, clock=self.clock)
+        self.request = normalize_request("AAPL", "moderate", "long term", "limit orders, low cost")
+
+    def test_similar_requests_hit_and_different_ones_miss(self):
+        self.cache.store(self.request, {"plan": 1})
+
+        hit = self.cache.lookup(
+            normalize_request("aapl", "Moderate", "long-term", "Limit orders and low costs")
+        )
+        self.assertEqual(hit.value, {"plan": 1})
+        self.assertGreater(hit.score, self.cache.threshold)
+        for other in (
+            normalize_request("MSFT", "moderate", "long term", "limit orders, low cost"),
+            normalize_request("AAPL", "aggressive", "long term", "limit orders, low cost"),
+            normalize_request("AAPL", "moderate", "short term", "limit orders, low cost"),
+            normalize_request("AAPL", "moderate", "long term", "market orders, speed matters most"),
+        ):
+            self.assertIsNone(self.cache.lookup(other), other)
+        self.assertEqual(self.cache.metrics["hits"], 1)
+        self.assertEqual(self.cache.metrics["misses"], 4)
+        self.assertAlmostEqual(self.cache.hit_rate(), 0.2)
+
+    def test_entries_expire_after_the_freshness_window(self):
+        self.cache.store(self.request, "plan")
+        self.clock.now += 61
+
+        self.assertIsNone(self.cache.lookup(self.request))
+        self.assertEqual(self.cache.metrics["expired"], 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_entry_is_evicted_when_full(self):
+        msft = normalize_request("MSFT", "moderate", "long term")
+        nvda = normalize_request("NVDA", "moderate", "long term")
+        self.cache.store(self.request, "aapl")
+        self.clock.now += 1
+        self.cache.store(msft, "msft")
+        self.clock.now += 1
+        self.cache.lookup(self.request)
+        self.cache.store(nvda, "nvda")
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.metrics["evictions"], 1)
+        self.assertIsNone(self.cache.lookup(msft))
+        self.assertEqual(self.cache.lookup(self.request).value, "aapl")
+        self.cache.store(self.request, "aapl v2")
+        self.assertEqual((len(self.cache), self.cache.lookup(self.request).value), (2, "aapl v2"))
+
+
+class TestCoordinatorCallbacks(unittest.TestCase):
+    def setUp(self):
+        self.model = StubLlm(responses=["Full analysis of AAPL.", "Shall we plan trades?"])
+        analyst = LlmAgent(
+            name="data_analyst", model=self.model, instruction="Analyze.",
+            output_key="market_data_analysis_output",
+        )
+        coordinator = LlmAgent(
+            name="financial_coordinator", model=self.model, instruction="Advise.",
+            output_key="financial_coordinator_output",
+        )
+        self.cache = SemanticCache()
+        before, after = semantic_cache.agent_callbacks(
+            self.cache, coordinator.output_key, report_keys=(analyst.output_key,)
+        )
+        root = SequentialAgent(
+            name="advisor", sub_agents=[analyst, coordinator],
+            before_agent_callback=before, after_agent_callback=after,
+        )
+        self.runner = InMemoryRunner(agent=root)
+
+    async def _ask(self, text):
+        session = await self.runner.session_service.create_session(
+            app_name=self.runner.app_name, user_id="u"
+        )
+        answers = []
+        async for event in self.runner.run_async(
+            user_id="u", session_id=session.id,
+            new_message=types.UserContent(parts=[types.Part(text=text)]),
+        ):
+            if event.content:
+                answers += [p.text for p in event.content.parts if p.text]
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id="u", session_id=session.id
+        )
+        return answers, session.state
+
+    def test_repeated_question_replays_the_reports_not_the_last_turn(self):
+        asyncio.run(self._ask("moderate risk, long term, AAPL"))
+        answers, state = asyncio.run(self._ask("AAPL: balanced risk, long-term investor"))
+
+        self.assertEqual(self.model.calls, 2)
+        self.assertEqual(len(answers), 1)
+        self.assertIn("Full analysis of AAPL.", answers[0])
+        self.assertNotIn("Shall we plan trades?", answers[0])
+        self.assertEqual(state["market_data_analysis_output"], "Full analysis of AAPL.")
+
+    def test_an_incomplete_run_stores_nothing(self):
+        before, after = semantic_cache.agent_callbacks(
+            self.cache, "financial_coordinator_output",
+            report_keys=("market_data_analysis_output", "execution_plan_output"),
+        )
+        self.runner.agent.before_agent_callback = before
+        self.runner.agent.after_agent_callback = after
+
+        answers, state = asyncio.run(self._ask("moderate risk, long term, AAPL"))
+
+        self.assertEqual(self.cache.metrics["stores"], 0)
+        self.assertEqual(state[semantic_cache.PENDING_KEY]["request"][0], "AAPL")
+
+
+class TestSharedCache(unittest.TestCase):
+    """The coordinator and the batch API answer from each other's entries."""
+
+    def setUp(self):
+        patcher = patch.object(data_analyst_cache, "response_cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = SemanticCache()
+        self.request = normalize_request(
+            "AAPL", "moderate", pipeline.DEFAULT_INVESTMENT_PERIOD,
+            pipeline.DEFAULT_EXECUTION_PREFERENCES,
+        )
+
+    def _batch(self, ticker="AAPL"):
+        async def run():
+            return [r async for r in batch.analyze_batch([ticker], cache=self.cache, model=StubLlm())]
+
+        return asyncio.run(run())[0]
+
+    def test_batch_entries_answer_the_coordinator(self):
+        stored = self._batch()
+        model = StubLlm(responses=["Coordinator turn."])
+        coordinator = LlmAgent(
+            name="financial_coordinator", model=model, instruction="Advise.",
+            output_key="financial_coordinator_output",
+        )
+        before, after = semantic_cache.agent_callbacks(self.cache, coordinator.output_key)
+        coordinator.before_agent_callback, coordinator.after_agent_callback = before, after
+        runner = InMemoryRunner(agent=coordinator)
+
+        async def ask(text):
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id="u"
+            )
+            answers = []
+            async for event in runner.run_async(
+                user_id="u", session_id=session.id,
+                new_message=types.UserContent(parts=[types.Part(text=text)]),
+            ):
+                if event.content:
+                    answers += [p.text for p in event.content.parts if p.text]
+            session = await runner.session_service.get_session(
+                app_name=runner.app_name, user_id="u", session_id=session.id
+            )
+            return answers, session.state
+
+        answers, state = asyncio.run(ask(
+            "AAPL, moderate risk, long-term. "
+            f"Execution preferences: {pipeline.DEFAULT_EXECUTION_PREFERENCES}"
+        ))
+
+        self.assertEqual(model.calls, 0)
+        risk_report = stored.outputs["plans"]["moderate"]["final_risk_assessment_output"]
+        self.assertIn(risk_report, answers[0])
+        self.assertEqual(state["final_risk_assessment_output"], risk_report)
+        self.assertNotIn("plans", state)
+
+    def test_coordinator_entries_answer_batch_and_other_values_miss(self):
+        reports = {key: f"{key} for AAPL" for key in compaction.REPORT_KEYS}
+        self.cache.store(self.request, reports)
+        self.cache.store(self.request._replace(ticker="MSFT"), {"plans": {}})
+
+        aapl = self._batch("AAPL")
+        msft = self._batch("MSFT")
+
+        self.assertTrue(aapl.cached)
+        self.assertEqual(
+            aapl.outputs["plans"]["moderate"]["execution_plan_output"],
+            "execution_plan_output for AAPL",
+        )
+        self.assertEqual(aapl.outputs["market_data_analysis_output"],
+                         "market_data_analysis_output for AAPL")
+        self.assertEqual((msft.cached, msft.error), (False, None))
+        self.assertTrue(semantic_cache.is_report_set(
+            self.cache.lookup(self.request._replace(ticker="MSFT")).value
+        ))
+
+
+class TestBatchCache(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(data_analyst_cache, "response_cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_second_batch_is_served_from_the_cache(self):
+        cache = SemanticCache()
+        model = StubLlm()
+
+        async def run(tickers):
+            return [r async for r in batch.analyze_batch(tickers, cache=cache, model=model)]
+
+        asyncio.run(run(["AAPL", "MSFT"]))
+        calls = model.calls
+        results = asyncio.run(run(["MSFT", "NVDA"]))
+
+        cached = {r.ticker: r.cached for r in results}
+        self.assertEqual(cached, {"MSFT": True, "NVDA": False})
+        self.assertEqual(model.calls - calls, 4)
+        self.assertEqual(cache.metrics["stores"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+from google.adk.agents import LlmAgent
+
+from financial_advisor import service
+from financial_advisor.stub_model import StubLlm
+
+
+def _agent(latency=0.0):
+    return LlmAgent(
+        name="data_analyst_agent",
+        model=StubLlm(responses=["AAPL looks fine."], latency=latency),
+        instruction="Analyze.",
+        output_key="market_data_analysis_output",
+    )
+
+
+class TestAgentService(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(service.create_app("data_analyst", service.agent_job(_agent(0.3))))
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+
+    def test_submit_returns_at_once_and_result_can_be_polled(self):
+        start = time.perf_counter()
+        submitted = self.client.post("/", params={"prompt": "Analyze AAPL"})
+        self.assertLess(time.perf_counter() - start, 0.3)
+
+        self.assertEqual(submitted.status_code, 202)
+        self.assertIn(submitted.json()["status"], ("queued", "running"))
+        job = self.client.get(f"/jobs/{submitted.json()['job_id']}", params={"wait": 5}).json()
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"], {
+            "text": "AAPL looks fine.", "output": "AAPL looks fine.",
+        })
+        self.assertEqual(self.client.get("/jobs/nope").status_code, 404)
+
+    def test_events_stream_as_server_sent_events(self):
+        job_id = self.client.post("/", params={"prompt": "Analyze AAPL"}).json()["job_id"]
+
+        with self.client.stream("GET", f"/jobs/{job_id}/events") as response:
+            self.assertEqual(response.headers["content-type"], "text/event-stream; charset=utf-8")
+            messages = [m for m in response.read().decode().split("\n\n") if m]
+
+        names = [m.split("\n")[1] for m in messages]
+        self.assertEqual(names, ["event: message", "event: done"])
+        event = json.loads(messages[0].split("data: ", 1)[1])
+        self.assertEqual(event["author"], "data_analyst_agent")
+        self.assertEqual(json.loads(messages[1].split("data: ", 1)[1])["status"], "succeeded")
+
+
+    def test_metrics_export_the_agent_telemetry(self):
+        job_id = self.client.post("/", params={"prompt": "Analyze AAPL"}).json()["job_id"]
+        self.client.get(f"/jobs/{job_id}", params={"wait": 5})
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE adk_calls_total counter", response.text)
+        self.assertIn('agent="data_analyst_agent"', response.text)
+
+
+class TestJobQueue(unittest.TestCase):
+    def test_sync_jobs_run_in_threads_and_coalesce(self):
+        release = threading.Event()
+        threads = []
+
+        def scan():
+            threads.append(threading.current_thread())
+            asyncio.get_event_loop()  # available, as ib_insync expects
+            release.wait(5)
+            return "Trade scanning and storing completed successfully."
+
+        async def run():
+            jobs = service.JobQueue(workers=1)
+            first = jobs.submit("scan", scan, coalesce=True)
+            await asyncio.sleep(0.05)
+            second = jobs.submit("scan", scan, coalesce=True)
+            third = jobs.submit("scan", scan, coalesce=True)
+            release.set()
+            await asyncio.wait_for(third.wait(), 5)
+            await jobs.stop()
+            return first, second, third, jobs
+
+        first, second, third, jobs = asyncio.run(run())
+
+        self.assertIs(second, third)
+        self.assertEqual((first.status, third.status), ("succeeded", "succeeded"))
+        self.assertNotIn(threading.main_thread(), threads)
+        self.assertEqual(jobs.metrics["coalesced"], 1)
+
+    def test_failures_and_backpressure(self):
+        async def boom(job):
+            raise RuntimeError("IBKR unreachable")
+
+        async def run():
+            jobs = service.JobQueue(workers=1, max_pending=1)
+            failed = jobs.submit("sync", boom)
+            with self.assertRaises(service.QueueFull):
+                jobs.submit("sync", boom)
+            await asyncio.wait_for(failed.wait(), 5)
+            await jobs.stop()
+            return failed, jobs
+
+        failed, jobs = asyncio.run(run())
+
+        self.assertEqual(failed.to_dict()["error"], "RuntimeError: IBKR unreachable")
+        self.assertEqual(jobs.stats()["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
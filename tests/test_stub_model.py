@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from financial_advisor import stub_model
+from financial_advisor.stub_model import ReplayLlm, StubLlm
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "advisor_session.jsonl")
+
+
+def _graph(coordinator_model, analyst_model):
+    analyst = LlmAgent(name="risk_analyst_agent", model=analyst_model, instruction="Assess.")
+    return LlmAgent(
+        name="financial_coordinator",
+        model=coordinator_model,
+        instruction="Coordinate.",
+        tools=[AgentTool(agent=analyst)],
+    )
+
+
+async def _run(runner, message="Analyze AAPL"):
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="advisor"
+    )
+    texts = []
+    async for event in runner.run_async(
+        user_id="advisor",
+        session_id=session.id,
+        new_message=types.UserContent(parts=[types.Part(text=message)]),
+    ):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            texts.append((event.author, event.content.parts[0].text))
+    return texts
+
+
+class TestModelFor(unittest.TestCase):
+    def test_defaults_to_gemini(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(stub_model.model_for("risk_analyst_agent", "gemini-2.5-pro"),
+                             "gemini-2.5-pro")
+
+    def test_stub_with_latency(self):
+        env = {stub_model.MODEL_ENV: "stub", stub_model.LATENCY_ENV: "0.25"}
+        with patch.dict(os.environ, env, clear=True):
+            model = stub_model.model_for("risk_analyst_agent", "gemini-2.5-pro")
+        self.assertIsInstance(model, StubLlm)
+        self.assertEqual(model.latency, 0.25)
+
+    def test_replay_reads_the_agent_and_its_pipeline_clones(self):
+        env = {stub_model.MODEL_ENV: "replay", stub_model.REPLAY_FILE_ENV: FIXTURE}
+        with patch.dict(os.environ, env, clear=True):
+            coordinator = stub_model.model_for("financial_coordinator", "gemini-2.5-pro")
+            risk = stub_model.model_for("risk_analyst_agent", "gemini-2.5-pro")
+        self.assertIsInstance(coordinator, ReplayLlm)
+        self.assertEqual(len(coordinator.responses), 5)
+        self.assertEqual(coordinator.responses[0][0].function_call.name, "data_analyst_agent")
+        self.assertEqual(len(risk.responses), 1)
+
+    def test_rejects_unknown_backends(self):
+        with patch.dict(os.environ, {stub_model.MODEL_ENV: "gpt"}, clear=True):
+            with self.assertRaises(ValueError):
+                stub_model.model_for("risk_analyst_agent", "gemini-2.5-pro")
+
+
+class TestRecordAndReplay(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "session.jsonl")
+
+    def test_replays_a_recorded_session(self):
+        call = types.Part(function_call=types.FunctionCall(
+            name="risk_analyst_agent", args={"request": "AAPL"}
+        ))
+        live = _graph(StubLlm(responses=[call, "AAPL is a moderate risk."]),
+                      StubLlm(responses=["Concentration risk is high."]))
+        stub_model.record_responses(live, self.path)
+        recorded = asyncio.run(_run(InMemoryRunner(agent=live)))
+
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["agent"] for line in lines],
+                         ["financial_coordinator", "risk_analyst_agent", "financial_coordinator"])
+        self.assertNotIn("id", lines[0]["parts"][0]["function_call"])
+
+        replay = _graph(ReplayLlm.from_file(self.path, "financial_coordinator"),
+                        ReplayLlm.from_file(self.path, "risk_analyst_agent"))
+        self.assertEqual(asyncio.run(_run(InMemoryRunner(agent=replay))), recorded)
+
+    def test_concurrent_sessions_each_follow_the_script(self):
+        coordinator = ReplayLlm.from_file(FIXTURE, "financial_coordinator", latency=0.01)
+        analysts = [
+            LlmAgent(name=name, model=ReplayLlm.from_file(FIXTURE, name), instruction="Analyse.")
+            for name in ("data_analyst_agent", "trading_analyst_agent",
+                         "execution_analyst_agent", "risk_analyst_agent")
+        ]
+        runner = InMemoryRunner(agent=LlmAgent(
+            name="financial_coordinator",
+            model=coordinator,
+            instruction="Coordinate.",
+            tools=[AgentTool(agent=analyst) for analyst in analysts],
+        ))
+        script = [part.text for part in coordinator.responses[-1]]
+
+        async def run_many():
+            return await asyncio.gather(*(_run(runner) for _ in range(5)))
+
+        for texts in asyncio.run(run_many()):
+            self.assertEqual(texts[-1], ("financial_coordinator", script[0]))
+        self.assertEqual(coordinator.calls, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
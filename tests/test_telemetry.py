@@ -0,0 +1,130 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from financial_advisor import telemetry
+from financial_advisor.stub_model import StubLlm
+
+
+def _agents():
+    analyst = LlmAgent(
+        name="analyst",
+        model=StubLlm(latency=0.01, responses=["four word analyst report"]),
+        instruction="Analyse.",
+    )
+    coordinator = LlmAgent(
+        name="coordinator",
+        model=StubLlm(responses=[
+            types.Part(function_call=types.FunctionCall(
+                name="analyst", args={"request": "AAPL"}
+            )),
+            "done",
+        ]),
+        instruction="Coordinate.",
+        tools=[AgentTool(agent=analyst)],
+    )
+    return coordinator
+
+
+async def _run(agent):
+    runner = InMemoryRunner(agent=agent)
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="advisor"
+    )
+    async for _ in runner.run_async(
+        user_id="advisor",
+        session_id=session.id,
+        new_message=types.UserContent(parts=[types.Part(text="Analyze AAPL")]),
+    ):
+        pass
+    return session.id
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.span_file = os.path.join(tmp.name, "spans.jsonl")
+        provider = TracerProvider()
+        provider.add_span_processor(
+            SimpleSpanProcessor(telemetry.JsonLinesSpanExporter(self.span_file))
+        )
+        patcher = patch.object(telemetry, "_tracer", provider.get_tracer("test"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.recorder = telemetry.Recorder()
+        self.session_id = asyncio.run(_run(telemetry.instrument(_agents(), self.recorder)))
+
+    def test_records_model_and_tool_calls_per_agent(self):
+        model_rows = {row["agent"]: row for row in self.recorder.report("model")}
+        tool_rows = self.recorder.report("tool")
+
+        self.assertEqual(model_rows["coordinator"]["calls"], 2)
+        self.assertEqual(model_rows["analyst"]["calls"], 1)
+        self.assertEqual(model_rows["analyst"]["output_tokens"], 4)
+        self.assertGreater(model_rows["analyst"]["prompt_tokens"], 0)
+        self.assertGreaterEqual(model_rows["analyst"]["latency_p50"], 0.01)
+        self.assertIsNotNone(model_rows["analyst"]["ttft_p50"])
+        self.assertEqual([(r["agent"], r["calls"]) for r in tool_rows], [("coordinator", 1)])
+        # The tool call wraps the analyst's model call.
+        self.assertGreaterEqual(tool_rows[0]["latency_p50"], model_rows["analyst"]["latency_p50"])
+
+    def test_sub_agent_calls_count_towards_the_user_session(self):
+        sessions = self.recorder.sessions()
+
+        (session,) = sessions.values()
+        self.assertEqual(session["analyst"]["calls"], 1)
+
+    def test_calls_that_raise_do_not_stay_in_flight(self):
+        class FailingLlm(StubLlm):
+            async def generate_content_async(self, llm_request, stream=False):
+                raise RuntimeError("quota exceeded")
+                yield
+
+        agent = LlmAgent(name="flaky", model=FailingLlm(), instruction="Fail.")
+        recorder = telemetry.Recorder(call_timeout=0.05)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(_run(telemetry.instrument(agent, recorder)))
+        self.assertEqual(len(recorder._in_flight), 1)
+
+        time.sleep(0.1)
+        asyncio.run(_run(telemetry.instrument(_agents(), recorder)))
+
+        self.assertEqual(recorder._in_flight, {})
+        self.assertEqual(len(recorder.records), 4)
+        self.assertIn(
+            'adk_failed_calls_total{kind="model",agent="flaky",name="gemini-stub"} 1',
+            recorder.render_prometheus(),
+        )
+        with open(self.span_file, encoding="utf-8") as f:
+            self.assertIn('"name": "model flaky"', f.read())
+
+    def test_prometheus_exposition(self):
+        text = self.recorder.render_prometheus()
+
+        self.assertIn('adk_calls_total{kind="model",agent="analyst",name="gemini-stub"} 1', text)
+        self.assertIn('adk_call_latency_seconds_count{kind="tool",agent="coordinator",name="analyst"} 1', text)
+        self.assertIn("# TYPE adk_call_ttft_seconds histogram", text)
+
+    def test_span_file_round_trips_into_the_report(self):
+        records = telemetry.records_from_spans(self.span_file)
+        report = telemetry.format_report(telemetry.summarize(records))
+
+        self.assertEqual(sorted(r.agent for r in records if r.kind == "model"),
+                         ["analyst", "coordinator", "coordinator"])
+        self.assertIn("analyst", report)
+        self.assertIn("p95 ms", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
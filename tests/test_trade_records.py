@@ -0,0 +1,57 @@
+import datetime
+import math
+import pathlib
+import unittest
+
+from financial_advisor.connectors import trade_records, web_scraper_connector
+
+FIXTURE = (pathlib.Path(__file__).parent / "fixtures" / "openinsider_latest_buys.html").read_bytes()
+
+
+class TestNormalizeTrades(unittest.TestCase):
+    def test_scraped_rows_become_typed_records(self):
+        raw = web_scraper_connector.parse_insider_trades(FIXTURE)
+
+        batch = trade_records.normalize_trades(raw)
+
+        self.assertEqual(batch.rejects, [])
+        acme = batch.trades[1]
+        self.assertEqual(acme.ticker, "ACME")
+        self.assertEqual(acme.transaction_date, datetime.date(2025, 8, 27))
+        self.assertEqual(acme.transaction_type, "Buy")
+        self.assertEqual(acme.transaction_value, 617000)
+        self.assertEqual(acme.shares, 50000)
+        self.assertAlmostEqual(acme.price_per_share, 12.34)
+        self.assertEqual(acme.ownership_change, 4.0)
+        self.assertTrue(math.isinf(batch.trades[2].ownership_change))
+        self.assertEqual(len(batch.rows(transaction_type="Buy")), 3)
+
+    def test_malformed_rows_are_rejected_with_reasons(self):
+        good = {
+            "ticker": "abc",
+            "transaction_date": "2025-08-28",
+            "transaction_type": "S - Sale",
+            "value": "-$1,000",
+            "shares": "-100",
+            "price_per_share": "$10",
+        }
+        raw = [
+            good,
+            dict(good, transaction_date="2025-02-30"),
+            dict(good, shares="n/a", ticker=""),
+            dict(good, value=""),
+        ]
+
+        batch = trade_records.normalize_trades(raw)
+
+        self.assertEqual([t.ticker for t in batch.trades], ["ABC", "ABC"])
+        self.assertEqual(batch.trades[0].transaction_type, "Sell")
+        self.assertEqual(batch.trades[0].transaction_value, -1000)
+        self.assertEqual(batch.trades[1].transaction_value, -1000)
+        self.assertEqual([r.index for r in batch.rejects], [1, 2])
+        self.assertEqual(batch.rejects[0].reason, "invalid transaction_date")
+        self.assertEqual(batch.rejects[1].reason, "missing ticker; invalid shares")
+
+
+if __name__ == "__main__":
+    unittest.main()
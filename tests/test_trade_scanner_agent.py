@@ -0,0 +1,126 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+
+from financial_advisor.connectors import gcp_sql_connector, trade_store
+from financial_advisor.connectors.trade_store import ColumnarTradeStore
+from financial_advisor.connectors.trade_watermark import TradeWatermark
+from financial_advisor.sub_agents.trade_scanner_agent import TradeScannerAgent
+
+
+def _scraped(ticker, date, shares="1000"):
+    return {
+        "ticker": ticker,
+        "insider_name": f"{ticker} Insider",
+        "relationship": "CEO",
+        "transaction_date": date,
+        "transaction_type": "P - Purchase",
+        "value": "+$50000",
+        "shares": shares,
+        "price_per_share": "$50.00",
+        "delta_own": "+5%",
+    }
+
+
+class TestTradeScannerAgent(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        patcher = patch(
+            "financial_advisor.connectors.gcp_sql_connector.get_gcp_sql_engine",
+            return_value=self.engine,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("financial_advisor.connectors.web_scraper_connector.get_insider_trades")
+    def test_quiet_poll_writes_nothing(self, mock_get_insider_trades):
+        mock_get_insider_trades.side_effect = lambda: [
+            _scraped("AAPL", "2025-08-28"),
+            _scraped("MSFT", "2025-08-27"),
+        ]
+        agent = TradeScannerAgent()
+        agent.scan_and_store_trades()
+        self.assertEqual(agent.last_stats.new, 2)
+
+        with patch.object(gcp_sql_connector, "upsert_insider_trades") as mock_upsert:
+            TradeScannerAgent().scan_and_store_trades()
+            agent.scan_and_store_trades()
+
+        mock_upsert.assert_not_called()
+        self.assertEqual(agent.last_stats.skipped_seen, 2)
+        self.assertEqual(agent.metrics["new"], 2)
+        self.assertEqual(agent.metrics["skipped_seen"], 2)
+
+    @patch("financial_advisor.connectors.web_scraper_connector.get_insider_trades")
+    def test_only_new_rows_are_upserted(self, mock_get_insider_trades):
+        mock_get_insider_trades.return_value = [_scraped("AAPL", "2025-08-28")]
+        TradeScannerAgent().scan_and_store_trades()
+
+        mock_get_insider_trades.return_value = [
+            _scraped("AAPL", "2025-08-28"),
+            _scraped("NVDA", "2025-08-29"),
+        ]
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        agent = TradeScannerAgent(store=ColumnarTradeStore(tmp.name))
+        agent.scan_and_store_trades()
+
+        self.assertEqual(agent.last_stats.new, 1)
+        self.assertEqual(agent.store.read()["ticker"].tolist(), ["NVDA"])
+        with self.engine.connect() as connection:
+            count = connection.execute(text("SELECT COUNT(*) FROM insider_trades")).scalar()
+        self.assertEqual(count, 2)
+
+    @patch("financial_advisor.connectors.web_scraper_connector.get_insider_trades")
+    def test_store_is_compacted_past_the_segment_limit(self, mock_get_insider_trades):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        agent = TradeScannerAgent(store=ColumnarTradeStore(tmp.name))
+
+        with patch.object(trade_store, "MAX_SEGMENTS", 2):
+            for day in ("2025-08-27", "2025-08-28", "2025-08-29"):
+                mock_get_insider_trades.return_value = [_scraped("AAPL", day)]
+                agent.scan_and_store_trades()
+
+        self.assertEqual(agent.store.segment_count(), 1)
+        self.assertEqual(len(agent.store.read(ticker="AAPL")["ticker"]), 3)
+
+    @patch("financial_advisor.connectors.web_scraper_connector.get_insider_trades")
+    def test_new_trades_update_the_insider_signals(self, mock_get_insider_trades):
+        second_insider = dict(_scraped("AAPL", "2025-08-29"), insider_name="AAPL Director")
+        mock_get_insider_trades.return_value = [_scraped("AAPL", "2025-08-28"), second_insider]
+        agent = TradeScannerAgent()
+        agent.scan_and_store_trades()
+
+        (signal,) = agent.last_signals
+        self.assertEqual((signal.ticker, signal.insiders, signal.dollars), ("AAPL", 2, 100000))
+        self.assertTrue(signal.cluster)
+
+
+class TestTradeWatermark(unittest.TestCase):
+    def test_rows_older_than_lookback_are_stale(self):
+        watermark = TradeWatermark("2025-08-28", lookback_days=7)
+
+        new, stats = watermark.filter_new([
+            _scraped("OLD", "2025-08-01"),
+            _scraped("LATE", "2025-08-25"),
+        ])
+
+        self.assertEqual([trade["ticker"] for trade in new], ["LATE"])
+        self.assertEqual(stats.skipped_stale, 1)
+
+    def test_advance_moves_mark_and_prunes_hashes(self):
+        watermark = TradeWatermark(lookback_days=7)
+        watermark.advance([_scraped("A", "2025-08-01")])
+        watermark.advance([_scraped("B", "2025-08-28")])
+
+        self.assertEqual(watermark.high_water_date.isoformat(), "2025-08-28")
+        self.assertEqual(len(watermark.hashes), 1)
+        restored = TradeWatermark.from_stored(*watermark.to_stored())
+        self.assertEqual(restored.hashes, watermark.hashes)
+
+
+if __name__ == "__main__":
+    unittest.main()
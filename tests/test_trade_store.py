@@ -0,0 +1,57 @@
+import datetime
+import tempfile
+import unittest
+
+from financial_advisor.connectors.trade_store import ColumnarTradeStore
+
+
+def _row(ticker, day, value=1000, shares=100):
+    return {
+        "ticker": ticker,
+        "insider_name": f"{ticker} Insider",
+        "relationship": "CEO",
+        "transaction_date": day,
+        "transaction_type": "Buy",
+        "transaction_value": value,
+        "shares": shares,
+        "price_per_share": value / shares,
+        "ownership_change": None,
+    }
+
+
+class TestColumnarTradeStore(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = ColumnarTradeStore(tmp.name)
+        self.store.append([
+            _row("MSFT", datetime.date(2025, 7, 3)),
+            _row("AAPL", datetime.date(2025, 8, 1)),
+        ])
+        self.store.append([_row("AAPL", "2025-08-20"), _row("NVDA", "2025-08-21")])
+
+    def test_filters_by_ticker_and_date_range(self):
+        aapl = self.store.read(ticker="aapl")
+        august = self.store.read(start=datetime.date(2025, 8, 1), end=datetime.date(2025, 8, 20))
+
+        self.assertEqual(len(aapl["ticker"]), 2)
+        self.assertEqual(sorted(august["ticker"].tolist()), ["AAPL", "AAPL"])
+        self.assertEqual(len(self.store.read(ticker="TSLA")["ticker"]), 0)
+        self.assertEqual(len(self.store.read(ticker=[])["ticker"]), 0)
+
+    def test_compaction_deduplicates_and_keeps_latest(self):
+        self.store.append([_row("AAPL", "2025-08-20", value=5000)])
+
+        removed = self.store.compact()
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(self.store.segment_count(), 2)  # one per month
+        aapl = self.store.read(ticker="AAPL", start=datetime.date(2025, 8, 20))
+        self.assertEqual(aapl["transaction_value"].tolist(), [5000])
+        self.assertEqual(self.store.read(start=datetime.date(2025, 8, 1))["ticker"].tolist(),
+                         ["AAPL", "AAPL", "NVDA"])
+        self.assertEqual(self.store.compact(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import pathlib
+import re
+import unittest
+
+from financial_advisor.connectors import web_scraper_connector
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+FIXTURE = (FIXTURES / "openinsider_latest_buys.html").read_bytes()
+
+
+_CELL = re.compile(rb"<t([hd])\b[^>]*>.*?</t\1>", re.DOTALL)
+
+
+def _swap_columns(page, a, b):
+    """`page` with columns `a` and `b` of every table row swapped."""
+
+    def swap(row):
+        cells = [cell.group(0) for cell in _CELL.finditer(row.group(0))]
+        cells[a], cells[b] = cells[b], cells[a]
+        return b"<tr>" + b"".join(cells) + b"</tr>"
+
+    return re.sub(rb"<tr\b[^>]*>.*?</tr>", swap, page, flags=re.DOTALL)
+
+
+class TestParseInsiderTrades(unittest.TestCase):
+    def test_fast_parser_matches_beautifulsoup(self):
+        fast = web_scraper_connector.parse_insider_trades_fast(FIXTURE)
+        bs4 = web_scraper_connector.parse_insider_trades_bs4(FIXTURE)
+
+        self.assertEqual(fast, bs4)
+        self.assertEqual(len(fast), 3)
+        self.assertEqual(fast[1]["insider_name"], "O'Brien Patrick")
+        self.assertEqual(fast[1]["transaction_date"], "2025-08-27")
+
+    def test_layout_drift_falls_back_to_beautifulsoup(self):
+        drifted = _swap_columns(FIXTURE, 3, 4)
+        self.assertIn(b"Name</h3></th><th><h3>Ticker", drifted)
+
+        with self.assertRaises(web_scraper_connector.LayoutChanged):
+            web_scraper_connector.parse_insider_trades_fast(drifted)
+        self.assertEqual(
+            web_scraper_connector.parse_insider_trades(drifted, mode="fast"),
+            web_scraper_connector.parse_insider_trades_fast(FIXTURE),
+        )
+
+    def test_missing_column_raises_instead_of_guessing(self):
+        drifted = FIXTURE.replace(b"Insider&nbsp;Name", b"Reporting&nbsp;Owner")
+
+        with self.assertRaises(web_scraper_connector.LayoutChanged):
+            web_scraper_connector.parse_insider_trades(drifted)
+
+    def test_ticker_screener_is_parsed_by_header(self):
+        page = (FIXTURES / "openinsider_ticker_screener.html").read_bytes()
+
+        with self.assertRaises(web_scraper_connector.LayoutChanged):
+            web_scraper_connector.parse_insider_trades_fast(page)
+        trades = web_scraper_connector.parse_insider_trades(page)
+
+        self.assertEqual(len(trades), 3)
+        self.assertEqual({t["ticker"] for t in trades}, {"AAPL"})
+        self.assertEqual(
+            (trades[2]["insider_name"], trades[2]["relationship"], trades[2]["transaction_type"]),
+            ("Adams Katherine L.", "SVP, GC", "S - Sale+OE"),
+        )
+        self.assertEqual((trades[2]["shares"], trades[2]["value"]), ("-25000", "-$5320000"))
+        self.assertEqual(trades[2]["delta_own"], "-7%")
+
+    def test_cluster_buys_use_their_own_columns(self):
+        page = (FIXTURES / "openinsider_cluster_buys.html").read_bytes()
+
+        trades = web_scraper_connector.parse_insider_trades(page)
+
+        self.assertEqual(len(trades), 2)
+        self.assertEqual(trades[0], {
+            "ticker": "KRMD",
+            "insider_name": "4 insiders",
+            "relationship": "Cluster",
+            "transaction_date": "2025-08-26",
+            "transaction_type": "P - Purchase",
+            "value": "+$698828",
+            "shares": "+231400",
+            "price_per_share": "$3.02",
+            "delta_own": "+3%",
+        })
+        self.assertEqual(trades[1]["insider_name"], "3 insiders")
+
+    def test_missing_table_yields_no_trades(self):
+        self.assertEqual(web_scraper_connector.parse_insider_trades(b"<html></html>"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()